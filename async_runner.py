@@ -0,0 +1,118 @@
+# fuzzer/async_runner.py
+# 基于asyncio的执行后端：多个JVM进程同时在途，重叠各自的启动延迟
+import asyncio
+import os
+import signal
+import time
+from typing import Any, List, Optional, Tuple
+
+
+class AsyncJavaRunner:
+    """
+    异步执行后端。每个并发槽位对应一个 JavaRunner（私有的shm/map/perEdge文件），
+    这里只复用其命令构建、位图与轨迹读取，进程由 asyncio.create_subprocess_exec 启动。
+    超时时杀掉整个进程组（JVM可能派生子进程），不会阻塞其他在途执行。
+    给定 verify_timeout 时，超时的输入在同一槽位上以该超时异步复核（挂起判定），同样不阻塞事件循环。
+    """
+    FLUSH_GRACE_S = 2.0  # 复核超时时 SIGTERM 之后等待agent关闭钩子写出位图的时间
+
+    def __init__(self, slots: List, timeout: float, verify_timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.verify_timeout = verify_timeout
+        self.slots = slots
+        self._idle: Optional[asyncio.Queue] = None
+        self.timeout_count = 0
+
+    @property
+    def concurrency(self) -> int:
+        return len(self.slots)
+
+    async def _acquire(self):
+        if self._idle is None:
+            # 队列必须在事件循环内创建
+            self._idle = asyncio.Queue()
+            for slot in self.slots:
+                self._idle.put_nowait(slot)
+        return await self._idle.get()
+
+    async def run(self, input_data: Any) -> Tuple[Any, bytes, Optional[List[int]], Optional[str], float, bool,
+                                                  Optional[Tuple[bool, Optional[bytes]]]]:
+        """
+        执行一个输入。
+        :return: (输入, 位图快照, 执行轨迹, 错误信息, 执行耗时ms, 是否超时, 挂起复核结果)；
+            复核结果为 (是否确认挂起, 挂起执行被终止前的位图)，未超时或未启用复核时为None
+        """
+        runner = await self._acquire()
+        try:
+            command = runner.build_command(input_data)
+            runner.prepare_run()
+            if runner.config.verbose >= 2:
+                print(f"========executed java command is: {command}========")
+
+            t0 = time.perf_counter()
+            trace, error_msg, timed_out = await self._execute(runner, command, self.timeout)
+            exec_time_ms = (time.perf_counter() - t0) * 1000
+
+            # 槽位归还后位图会被下一次执行清零，这里拷贝一份快照
+            run_map = bytes(runner.bitmap.view)
+            hang = None
+            if timed_out and self.verify_timeout:
+                hang = await self._verify(runner, command)
+            return input_data, run_map, trace, error_msg, exec_time_ms, timed_out, hang
+        finally:
+            self._idle.put_nowait(runner)
+
+    async def _verify(self, runner, command: List[str]) -> Tuple[bool, Optional[bytes]]:
+        """以 verify_timeout 重新执行；仍然超时时先让agent写出位图再终止，返回 (是否确认挂起, 位图快照)"""
+        runner.prepare_run()
+        _, _, timed_out = await self._execute(runner, command, self.verify_timeout, flush=True)
+        return timed_out, bytes(runner.bitmap.view) if timed_out else None
+
+    async def _execute(self, runner, command: List[str], timeout: float, flush: bool = False):
+        try:
+            with runner.profiler.stage("spawn"):
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True,  # 独立进程组，超时时整组杀掉
+                )
+        except Exception as e:
+            return None, f"调用Java程序失败: {str(e)}", False
+
+        with runner.profiler.stage("jvm_run"):
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if flush:
+                    # SIGTERM 触发agent的关闭钩子写出位图，宽限期后仍未退出再强杀
+                    self._kill_group(process, signal.SIGTERM)
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=self.FLUSH_GRACE_S)
+                    except asyncio.TimeoutError:
+                        pass
+                self._kill_group(process)
+                await process.wait()
+                self.timeout_count += 1
+                return None, f"Java程序执行超时 (超过 {timeout} 秒)", True
+            except asyncio.CancelledError:
+                self._kill_group(process)
+                raise
+
+        error_msg = None
+        if process.returncode != 0:
+            error_msg = f"Java执行异常 (返回码: {process.returncode}): {stderr.decode('utf-8', errors='replace').strip()}"
+        with runner.profiler.stage("coverage_read"):
+            trace = runner.read_trace()
+        return trace, error_msg, False
+
+    @staticmethod
+    def _kill_group(process, sig=signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def close(self):
+        for runner in self.slots:
+            runner.close()
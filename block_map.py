@@ -0,0 +1,153 @@
+# fuzzer/block_map.py
+# bytescribe 插桩块映射（map= 参数输出的 bytescribe-map.csv）与覆盖率位图大小的确定
+import csv
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+MIN_MAP_SIZE = 256
+MAX_MAP_SIZE = 1 << 20
+EDGES_PER_BLOCK = 2             # 估算边数：平均每个块约两条出边（分支）
+TARGET_COLLISION_RATE = 0.05    # 自动确定位图大小时允许的估算边冲突率
+
+
+@dataclass
+class Block:
+    """一个插桩块：所在类、方法、源码行与agent分配的块ID"""
+    class_name: str
+    method: str
+    line: int
+    block_id: int
+
+
+class BlockMap:
+    """
+    bytescribe-map.csv 的内容，格式为 class:method:sourceLine:blockId（带表头）。
+    加载后建立块ID索引。agent 以块ID调用 Coverage.bump，位图槽位是AFL的边哈希
+    (blockId ^ (prevBlock >>> 1)) & (size - 1)，不能由槽位反推块；命中的块ID见 per-edge 文件。
+    """
+    def __init__(self, blocks: List[Block]):
+        self.blocks = blocks
+        self.by_id: Dict[int, Block] = {block.block_id: block for block in blocks}
+
+    def lookup(self, block_id: int) -> Optional[Block]:
+        return self.by_id.get(block_id)
+
+    @classmethod
+    def load(cls, path: str) -> "BlockMap":
+        blocks = []
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f, delimiter=":", quotechar='"')
+            next(reader, None)  # 表头
+            for row in reader:
+                if len(row) < 4:
+                    continue
+                try:
+                    blocks.append(Block(row[0], row[1], int(row[2]), int(row[3])))
+                except ValueError:
+                    continue
+        return cls(blocks)
+
+    def block_count(self) -> int:
+        return len(self.by_id)
+
+    def for_class(self, class_name: str) -> "BlockMap":
+        """只含指定类（内部名，如 jpamb/cases/Simple）的块"""
+        return BlockMap([block for block in self.blocks if block.class_name == class_name])
+
+
+def target_class(target_method: str) -> str:
+    """目标方法所在类的内部名："jpamb.cases.Simple.divideByN:(I)I" -> "jpamb/cases/Simple" """
+    return target_method.split(":", 1)[0].rsplit(".", 1)[0].replace(".", "/")
+
+
+def estimated_collision_rate(block_count: int, map_size: int) -> float:
+    """
+    估算的边冲突率：一条边与至少一条其他边落在同一个位图槽位的概率。
+    agent 按 AFL 的边哈希 (blockId ^ (prevBlock >>> 1)) & (size - 1) 计入槽位，这里把边哈希视为均匀分布，
+    边数按块数估算（实际执行到的块对无法从块映射得知）
+    """
+    edges = max(block_count * EDGES_PER_BLOCK, 1)
+    return 1.0 - (1.0 - 1.0 / map_size) ** (edges - 1)
+
+
+def auto_map_size(block_count: int) -> int:
+    """按插桩块数选取估算冲突率不超过 TARGET_COLLISION_RATE 的最小2的幂"""
+    size = MIN_MAP_SIZE
+    while size < MAX_MAP_SIZE and estimated_collision_rate(block_count, size) > TARGET_COLLISION_RATE:
+        size <<= 1
+    return size
+
+
+def collision_report(block_map: BlockMap, map_size: int) -> Dict:
+    """位图大小的冲突情况（估算值；运行中实际的位图密度见 fuzzer_stats 的 map_density）"""
+    return {
+        "map_size": map_size,
+        "blocks": block_map.block_count(),
+        "estimated_edge_collision_rate": estimated_collision_rate(block_map.block_count(), map_size),
+    }
+
+
+def format_report(report: Dict) -> str:
+    return (f"覆盖率位图：{report['map_size']} 字节，插桩块 {report['blocks']} 个，"
+            f"估算边冲突率 {report['estimated_edge_collision_rate']:.2%}")
+
+
+def probe_block_map(config, target_method: str) -> Optional[BlockMap]:
+    """
+    执行一次目标方法，让agent写出其所在类的块映射并读取（先删除工作目录中残留的、可能属于其他目标的映射）。
+    :return: 块映射；agent 没有写出映射时为 None
+    """
+    from input_generator import InputGenerator
+    from java_runner import JavaRunner
+    if os.path.exists(config.map_output_path):
+        os.remove(config.map_output_path)
+    probe = JavaRunner(java_class_path=config.java_class_path, target_method=target_method, config=config)
+    try:
+        # 与种子相同的参数形式（多参数方法需要完整的参数列表）
+        probe.run_java_program2(InputGenerator.for_method(target_method).generate_seeds(1)[0])
+    finally:
+        probe.close()
+    if not os.path.exists(config.map_output_path):
+        return None
+    return BlockMap.load(config.map_output_path)
+
+
+def probe_campaign_block_map(config, target_methods: List[str]) -> BlockMap:
+    """
+    多目标模式：每个目标所在的类探测一次，合并为整个测试活动共用的块映射。
+    agent 按 类/方法/描述符/块序号 哈希得到块ID，与类的加载顺序及所在JVM无关，各次探测的结果可以直接合并。
+    """
+    probes: Dict[str, str] = {}
+    for method in target_methods:
+        probes.setdefault(target_class(method), method)
+    blocks: Dict[int, Block] = {}
+    for method in probes.values():
+        block_map = probe_block_map(config, method)
+        if block_map is None:
+            print(f"警告：探测 {method} 时未找到插桩块映射 {config.map_output_path}", file=sys.stderr)
+            continue
+        for block in block_map.blocks:
+            blocks.setdefault(block.block_id, block)
+    return BlockMap(list(blocks.values()))
+
+
+def resolve_map_size(config) -> int:
+    """
+    自动模式：用插桩块映射确定位图大小。先以默认大小执行一次目标方法，让agent写出当前目标的映射。
+    结果写回 config.coverage_map_size（唯一的位图大小来源，agent 的 size= 参数同样取自它）。
+    """
+    config.coverage_map_size = 65536
+    block_map = probe_block_map(config, config.target_method)
+    if block_map is None:
+        print(f"警告：未找到插桩块映射 {config.map_output_path}，位图大小使用 65536", file=sys.stderr)
+        return config.coverage_map_size
+
+    config.coverage_map_size = auto_map_size(block_map.block_count())
+    print(format_report(collision_report(block_map, config.coverage_map_size)), file=sys.stderr)
+    return config.coverage_map_size
+
+
+def is_power_of_two(n: int) -> bool:
+    return n > 0 and n & (n - 1) == 0
@@ -0,0 +1,257 @@
+# fuzzer/campaign.py
+# 多目标测试活动：一个进程内对多个方法（显式列表、整个类或整个包）做模糊测试。
+# 每个目标有独立的语料库与覆盖率状态（各自一个 FuzzerEngine），共用同一个执行器（常驻JVM模式下同一个JVM），
+# 按时间片轮转调度：近期仍有覆盖增长的目标分到更多时间片，连续若干个时间片没有新覆盖的目标提前退役
+import copy
+import math
+import os
+import re
+import time
+import zipfile
+from typing import List, Optional
+
+from block_map import probe_campaign_block_map, target_class
+from campaign_store import atomic_write
+from class_constants import ClassFileParser, find_class_files
+from driver import create_runner
+from fuzzer_engine import FuzzerEngine
+from input_generator import INT_BITS, parse_descriptor
+
+ACC_STATIC = 0x0008
+ACC_BRIDGE = 0x0040
+ACC_SYNTHETIC = 0x1000
+# 输入生成器支持的参数类型
+_SUPPORTED_PARAMS = set(INT_BITS) | {"Z", "C", "F", "D", "Ljava/lang/String;"}
+
+
+def _supported(descriptor: str) -> bool:
+    params = parse_descriptor(descriptor)
+    return params is not None and all(t.lstrip("[") in _SUPPORTED_PARAMS for t in params)
+
+
+def class_methods(class_name: str, data: bytes) -> List[str]:
+    """类中可作为目标的方法：静态、非合成、参数类型均可生成，格式为 "包.类.方法:描述符" """
+    parser = ClassFileParser(data)
+    parser.parse()
+    targets = []
+    for access, name, descriptor in parser.methods:
+        if not access & ACC_STATIC or access & (ACC_BRIDGE | ACC_SYNTHETIC):
+            continue
+        if name.startswith("<") or name.startswith("lambda$") or not _supported(descriptor):
+            continue
+        targets.append(f"{class_name}.{name}:{descriptor}")
+    return targets
+
+
+def _package_classes(java_class_path: str, package: str) -> List[str]:
+    """包中直接包含的顶层类（不含嵌套类与子包）"""
+    rel = package.replace(".", "/")
+    classes = []
+    for entry in java_class_path.split(os.pathsep):
+        if os.path.isdir(entry):
+            directory = os.path.join(entry, rel)
+            if os.path.isdir(directory):
+                classes += [name[:-6] for name in os.listdir(directory) if name.endswith(".class")]
+        elif zipfile.is_zipfile(entry):
+            with zipfile.ZipFile(entry) as jar:
+                for name in jar.namelist():
+                    if name.startswith(rel + "/") and name.endswith(".class") and "/" not in name[len(rel) + 1:]:
+                        classes.append(name[len(rel) + 1:-6])
+    return sorted(f"{package}.{name}" for name in set(classes) if "$" not in name)
+
+
+def resolve_targets(java_class_path: str, methods: Optional[List[str]] = None, classes: Optional[List[str]] = None,
+                    packages: Optional[List[str]] = None) -> List[str]:
+    """汇总显式给出的方法、类中的方法与包中各类的方法（去重，保持顺序）"""
+    targets = list(methods or [])
+    class_names = list(classes or [])
+    for package in packages or []:
+        class_names += _package_classes(java_class_path, package)
+    for class_name in class_names:
+        top = class_name.rsplit(".", 1)[-1] + ".class"
+        for location, data in find_class_files(java_class_path, class_name):
+            if os.path.basename(location.split("!")[-1]) == top:  # 跳过嵌套类
+                try:
+                    targets += class_methods(class_name, data)
+                except (ValueError, IndexError) as e:
+                    print(f"警告：解析 {location} 失败：{e}")
+    return list(dict.fromkeys(targets))
+
+
+def _slug(method: str) -> str:
+    """目标方法 -> 可作目录名的字符串"""
+    return re.sub(r"[^\w.$-]+", "_", method).strip("_")
+
+
+class TargetState:
+    """一个目标在调度器中的状态"""
+    def __init__(self, engine: FuzzerEngine):
+        self.engine = engine
+        self.initialized = False
+        self.retired = False
+        self.slices = 0
+        self.time_s = 0.0
+        self.gain_rate = 0.0  # 每秒新增覆盖边数的指数滑动平均
+        self.idle_slices = 0  # 连续没有新覆盖的时间片数
+
+    @property
+    def method(self) -> str:
+        return self.engine.config.target_method
+
+    def covered(self) -> int:
+        return self.engine.coverage_tracker.covered_edge_count
+
+
+class CampaignScheduler:
+    """
+    时间片调度（UCB1）：每次选择 gain_rate + c * sqrt(ln(总时间片数) / 该目标时间片数) 最大的目标，
+    兼顾覆盖增长快的目标与尚未充分尝试的目标；从未运行过的目标优先。
+    """
+    EXPLORATION = 0.5  # UCB 探索项系数（相对于当前最大 gain_rate 缩放）
+    DECAY = 0.5        # gain_rate 滑动平均中最新时间片的权重
+
+    def __init__(self, config, targets: List[str], total_time: float = 3600.0, slice_time: float = 10.0,
+                 retire_after: int = 5):
+        if not targets:
+            raise ValueError("多目标测试活动没有可用的目标方法")
+        self.config = config
+        self.total_time = total_time
+        self.slice_time = slice_time
+        self.retire_after = retire_after
+        # 所有目标共用一个执行器；执行器的配置只在切换目标时被改写超时
+        runner_config = copy.copy(config)
+        runner_config.target_method = targets[0]
+        # 块映射在开始时按目标所在的类统一探测一次，各目标共用（常驻JVM只在启动时写映射，不能按目标重新写出）
+        self.block_map = probe_campaign_block_map(runner_config, targets)
+        self.java_runner = create_runner(runner_config)
+        self.java_runner.collect_trace = False
+        self.java_runner.write_block_map = False
+        self.targets = []
+        for method in targets:
+            engine = FuzzerEngine(self._target_config(method, len(targets)), self.java_runner)
+            engine.block_map = self.block_map.for_class(target_class(method))
+            self.targets.append(TargetState(engine))
+        self.total_slices = 0
+
+    def _target_config(self, method: str, count: int):
+        """
+        每个目标的配置副本：独立的输出目录，执行结果缓存的内存上限按目标数均分。
+        各目标只在共用的执行器上串行执行，不创建并行或异步执行器（--workers、--executor 在多目标模式下不生效）
+        """
+        target_config = copy.copy(self.config)
+        target_config.target_method = method
+        target_config.workers = 1
+        target_config.executor = "thread"
+        slug = _slug(method)
+        target_config.output_dir = os.path.join(self.config.output_dir, slug)
+        if self.config.handoff_dir:
+            target_config.handoff_dir = os.path.join(self.config.handoff_dir, slug)
+        if self.config.sync_dir:
+            target_config.sync_dir = os.path.join(self.config.sync_dir, slug)
+            os.makedirs(target_config.sync_dir, exist_ok=True)
+        target_config.exec_cache_mb = max(1, self.config.exec_cache_mb // count)
+        return target_config
+
+    def pick(self) -> Optional[TargetState]:
+        active = [t for t in self.targets if not t.retired]
+        if not active:
+            return None
+        fresh = [t for t in active if not t.slices]
+        if fresh:
+            return fresh[0]
+        scale = max(max(t.gain_rate for t in active), 1e-3)
+        log_total = math.log(max(self.total_slices, 1))
+        return max(active, key=lambda t: t.gain_rate + self.EXPLORATION * scale * math.sqrt(log_total / t.slices))
+
+    def run(self):
+        start = time.time()
+        print(f"多目标测试活动：{len(self.targets)} 个目标，总时长 {self.total_time:.0f} 秒，时间片 {self.slice_time:.0f} 秒")
+        try:
+            while time.time() - start < self.total_time:
+                target = self.pick()
+                if target is None:
+                    break
+                self._run_slice(target, min(self.slice_time, self.total_time - (time.time() - start)))
+        finally:
+            self.java_runner.close()
+        for target in self.targets:
+            if target.initialized:
+                target.engine.finalize()
+        self._print_summary(time.time() - start)
+        self._write_stats(time.time() - start)
+
+    def _run_slice(self, target: TargetState, budget: float):
+        engine = target.engine
+        t0 = time.time()
+        engine.activate()
+        covered_before = target.covered()
+        try:
+            if not target.initialized:
+                engine.initialize()
+                target.initialized = True
+                covered_before = 0
+            engine.run_slice(t0 + budget)
+        finally:
+            engine.deactivate()
+        elapsed = time.time() - t0
+        gained = target.covered() - covered_before
+
+        target.slices += 1
+        self.total_slices += 1
+        target.time_s += elapsed
+        rate = gained / max(elapsed, 1e-3)
+        target.gain_rate = rate if target.slices == 1 else self.DECAY * rate + (1 - self.DECAY) * target.gain_rate
+        target.idle_slices = 0 if gained else target.idle_slices + 1
+        if target.idle_slices >= self.retire_after or not engine.corpus_manager.size():
+            target.retired = True
+            if self.config.verbose >= 1:
+                print(f"目标退役：{target.method}（连续 {target.idle_slices} 个时间片无新覆盖，覆盖边 {target.covered()} 个）")
+        elif self.config.verbose >= 2:
+            print(f"时间片：{target.method} +{gained} 边，{elapsed:.1f} 秒")
+
+    def _print_summary(self, wall_time_s: float):
+        print("\n" + "=" * 50)
+        print("多目标测试活动结束")
+        print("=" * 50)
+        total_edges = total_execs = total_errors = covered_lines = total_lines = 0
+        for target in sorted(self.targets, key=lambda t: t.method):
+            engine = target.engine
+            status = "退役" if target.retired else ("进行中" if target.initialized else "未运行")
+            line = (f"{target.method}: 覆盖边 {target.covered()}，执行 {engine.total_execs} 次，"
+                    f"错误 {engine.error_detector.error_count()} 类，时间 {target.time_s:.1f} 秒（{status}）")
+            if engine.source_coverage:
+                totals = engine.source_coverage.totals()
+                covered_lines += totals["covered_lines"]
+                total_lines += totals["lines"]
+                line += f"，行 {totals['covered_lines']}/{totals['lines']}"
+            print(line)
+            total_edges += target.covered()
+            total_execs += engine.total_execs
+            total_errors += engine.error_detector.error_count()
+        cpu_hours = max(wall_time_s, 1e-9) / 3600
+        print(f"\n合计：覆盖边 {total_edges}（每CPU小时 {total_edges / cpu_hours:.0f}），执行 {total_execs} 次，"
+              f"错误 {total_errors} 类，退役 {sum(t.retired for t in self.targets)}/{len(self.targets)} 个目标，"
+              f"用时 {wall_time_s:.1f} 秒")
+        if total_lines:
+            print(f"源码覆盖：行 {covered_lines}/{total_lines}")
+
+    def _write_stats(self, wall_time_s: float):
+        """在基础输出目录写出 campaign_stats（格式同 fuzzer_stats，每个目标一组以目录名为前缀的字段）"""
+        values = {
+            "run_time": int(wall_time_s),
+            "targets": len(self.targets),
+            "targets_retired": sum(t.retired for t in self.targets),
+            "total_slices": self.total_slices,
+            "edges_covered": sum(t.covered() for t in self.targets),
+            "execs_done": sum(t.engine.total_execs for t in self.targets),
+        }
+        for target in self.targets:
+            slug = _slug(target.method)
+            values[f"{slug}.edges_covered"] = target.covered()
+            values[f"{slug}.execs_done"] = target.engine.total_execs
+            values[f"{slug}.slices"] = target.slices
+            values[f"{slug}.time_s"] = round(target.time_s, 1)
+            values[f"{slug}.retired"] = int(target.retired)
+        os.makedirs(self.config.output_dir, exist_ok=True)
+        atomic_write(os.path.join(self.config.output_dir, "campaign_stats"),
+                     "".join(f"{key:<28}: {value}\n" for key, value in values.items()))
@@ -0,0 +1,190 @@
+# fuzzer/campaign_store.py
+# 测试活动的持久化：output_dir/queue 下每个语料库条目一个文件（只追加），
+# 错误日志 errors.jsonl（只追加，由 ErrorDetector 写出），以及定期原子写出的 checkpoint.json
+# （全局位图、调度器状态、随机数状态；编码与落盘在后台线程中进行），重启后无需重新执行语料库即可继续测试活动
+import base64
+import json
+import os
+import random
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+CHECKPOINT_VERSION = 1
+
+
+def to_hashable(value: Any) -> Any:
+    """JSON读回的列表还原为元组（多参数输入与数组参数在语料库中以元组表示）"""
+    if isinstance(value, list):
+        return tuple(to_hashable(v) for v in value)
+    return value
+
+
+def atomic_write(path: str, text: str):
+    """先写临时文件再原子替换，崩溃时不会留下写了一半的文件"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CampaignStore:
+    """
+    语料库条目与错误在产生时立即追加写出（新条目很少出现，写一个小文件几乎没有开销）；
+    检查点只包含会被覆盖更新的状态，按 interval 定期写出。
+    """
+    def __init__(self, output_dir: str, interval: float = 60.0):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.queue_dir = os.path.join(output_dir, "queue")
+        self.errors_path = os.path.join(output_dir, "errors.jsonl")
+        self.checkpoint_path = os.path.join(output_dir, "checkpoint.json")
+        self._last_checkpoint = time.time()
+        self._writer: Optional[threading.Thread] = None
+
+    def has_checkpoint(self) -> bool:
+        return os.path.exists(self.checkpoint_path)
+
+    def reset(self):
+        """开始新的测试活动：清理上一次的语料库、错误日志与检查点"""
+        if os.path.isdir(self.queue_dir):
+            shutil.rmtree(self.queue_dir)
+        for path in (self.errors_path, self.checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.makedirs(self.queue_dir, exist_ok=True)
+
+    # ---------- 只追加的部分 ----------
+    def append_entry(self, index: int, seed) -> None:
+        """写出一个语料库条目（queue/id_000123.json）"""
+        entry = {
+            "id": index,
+            "input": seed.input,
+            "exec_time_ms": seed.exec_time_ms,
+            "bitmap_size": seed.bitmap_size,
+            "depth": seed.depth,
+            "signature": seed.signature,
+            "edges": list(seed.edges),
+        }
+        atomic_write(os.path.join(self.queue_dir, f"id_{index:06d}.json"), json.dumps(entry, ensure_ascii=False))
+
+    def load_entries(self, start: int = 0) -> List[Dict]:
+        """按ID顺序读取队列中的条目；start 之前的条目跳过（增量读取其他实例的队列时使用）"""
+        entries = []
+        if not os.path.isdir(self.queue_dir):
+            return entries
+        for name in sorted(os.listdir(self.queue_dir)):
+            if name.startswith("id_") and name.endswith(".json") and int(name[3:-5]) >= start:
+                with open(os.path.join(self.queue_dir, name), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                entry["input"] = to_hashable(entry["input"])
+                entry["edges"] = tuple(entry["edges"])
+                entries.append(entry)
+        return entries
+
+    # ---------- 检查点 ----------
+    def maybe_checkpoint(self, engine):
+        """距上次检查点超过 interval 秒、且上一次写出已完成时写出一次（在主循环中频繁调用，开销很小）"""
+        if time.time() - self._last_checkpoint >= self.interval and not self.writing():
+            self.checkpoint(engine, background=True)
+
+    def checkpoint(self, engine, background: bool = False):
+        """
+        主循环上只拷贝内存中的状态；JSON/base64 编码与 fsync 在 background 时交给后台线程，不阻塞模糊测试。
+        同一时刻最多一个写出线程，新的检查点会先等待上一次写出完成。
+        """
+        state = self._snapshot(engine)
+        self._last_checkpoint = time.time()
+        self.wait()
+        if background:
+            self._writer = threading.Thread(target=self._write, args=(state,), name="checkpoint", daemon=True)
+            self._writer.start()
+        else:
+            self._write(state)
+
+    def writing(self) -> bool:
+        return self._writer is not None and self._writer.is_alive()
+
+    def wait(self):
+        """等待后台写出完成"""
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    @staticmethod
+    def _snapshot(engine) -> Dict:
+        """检查点状态的内存拷贝（位图拷贝为 bytes，反向位图是不可变的大整数）"""
+        tracker = engine.coverage_tracker
+        hangs = engine.hang_detector
+        generator = engine.input_generator
+        return {
+            "version": CHECKPOINT_VERSION,
+            "time": time.time(),
+            "start_time": engine.stats.start_time,
+            "target_method": engine.config.target_method,
+            "map_size": engine.config.coverage_map_size,
+            "queue_len": len(engine.corpus_manager.entries),
+            "global_map": bytes(tracker.global_coverage_map),
+            "virgin_bits": tracker.virgin_bits,
+            "covered_edge_count": tracker.covered_edge_count,
+            "covered_blocks": sorted(tracker.covered_blocks),
+            "total_execs": engine.total_execs,
+            "det_execs": engine.det_execs,
+            "timeout": engine.config.timeout,
+            "scheduler": engine.corpus_manager.scheduler_state(),
+            "hangs": list(hangs.hangs),
+            "hang_virgin_bits": hangs.virgin_bits,
+            "hang_counts": [hangs.suspected, hangs.confirmed, hangs.slow_inputs],
+            "crash_counts": engine.error_detector.triage.counts_state(),
+            # 语料库调度使用全局 random，变异器使用自己的 Random 实例（以及可选的 numpy 生成器）
+            "rng": random.getstate(),
+            "mutator_rng": generator.random.getstate(),
+            "np_rng": generator.np_random.bit_generator.state if generator.np_random is not None else None,
+        }
+
+    def _write(self, state: Dict):
+        map_size = state["map_size"]
+        state["global_map"] = base64.b64encode(state["global_map"]).decode("ascii")
+        state["virgin_bits"] = _encode_bits(state["virgin_bits"], map_size)
+        state["hang_virgin_bits"] = _encode_bits(state["hang_virgin_bits"], map_size)
+        state["rng"] = _encode_random_state(state["rng"])
+        state["mutator_rng"] = _encode_random_state(state["mutator_rng"])
+        atomic_write(self.checkpoint_path, json.dumps(state))
+
+    def load_checkpoint(self) -> Optional[Dict]:
+        if not self.has_checkpoint():
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"不支持的检查点版本: {state.get('version')}")
+        state["global_map"] = base64.b64decode(state["global_map"])
+        state["virgin_bits"] = _decode_bits(state["virgin_bits"])
+        state["hang_virgin_bits"] = _decode_bits(state["hang_virgin_bits"])
+        for hang in state["hangs"]:
+            hang["input"] = to_hashable(hang["input"])
+        state["rng"] = _decode_random_state(state["rng"])
+        state["mutator_rng"] = _decode_random_state(state["mutator_rng"])
+        return state
+
+
+def _encode_bits(bits: int, map_size: int) -> str:
+    """反向位图（大整数）按位图字节序写为base64"""
+    return base64.b64encode(bits.to_bytes(map_size, "little")).decode("ascii")
+
+
+def _decode_bits(data: str) -> int:
+    return int.from_bytes(base64.b64decode(data), "little")
+
+
+def _encode_random_state(state) -> List:
+    version, internal, gauss = state
+    return [version, list(internal), gauss]
+
+
+def _decode_random_state(state: List):
+    version, internal, gauss = state
+    return version, tuple(internal), gauss
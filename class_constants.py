@@ -0,0 +1,239 @@
+# fuzzer/class_constants.py
+# 常量收集：解析目标类的 .class 文件，提取常量池与字节码立即数中的整数/长整数/字符串常量，
+# 作为变异字典（魔数比较、switch分支值等很难靠算术变异碰到）
+import hashlib
+import json
+import os
+import struct
+import zipfile
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Set, Tuple
+
+# 常量池条目：tag -> 数据长度（Utf8 为变长，单独处理）
+_CP_SIZES = {3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4, 15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2}
+MAX_STRING_LEN = 64
+
+
+def _opcode_lengths() -> List[int]:
+    """定长指令的长度（含操作码）；0 表示变长（tableswitch / lookupswitch / wide）"""
+    lengths = [1] * 256
+    for op in (0x10, 0x12, 0xa9, 0xbc) + tuple(range(0x15, 0x1a)) + tuple(range(0x36, 0x3b)):
+        lengths[op] = 2  # bipush / ldc / ret / newarray / load / store
+    for op in (0x11, 0x13, 0x14, 0x84, 0xbb, 0xbd, 0xc0, 0xc1, 0xc6, 0xc7) + tuple(range(0x99, 0xa9)) + tuple(range(0xb2, 0xb9)):
+        lengths[op] = 3  # sipush / ldc_w / ldc2_w / iinc / 类型指令 / 跳转 / 字段与方法调用
+    lengths[0xc5] = 4    # multianewarray
+    for op in (0xb9, 0xba, 0xc8, 0xc9):
+        lengths[op] = 5  # invokeinterface / invokedynamic / goto_w / jsr_w
+    for op in (0xaa, 0xab, 0xc4):
+        lengths[op] = 0
+    return lengths
+
+
+_OPCODE_LENGTHS = _opcode_lengths()
+
+
+@dataclass
+class ConstantDictionary:
+    """从类文件收集到的常量"""
+    ints: List[int] = field(default_factory=list)
+    longs: List[int] = field(default_factory=list)
+    strings: List[str] = field(default_factory=list)
+
+    def merge(self, other: "ConstantDictionary"):
+        self.ints = sorted(set(self.ints) | set(other.ints))
+        self.longs = sorted(set(self.longs) | set(other.longs))
+        self.strings = sorted(set(self.strings) | set(other.strings))
+
+    def size(self) -> int:
+        return len(self.ints) + len(self.longs) + len(self.strings)
+
+
+class ClassFileParser:
+    """最小的 class 文件解析器：只解析常量池、方法列表和方法的 Code 属性"""
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.pool: Dict[int, Tuple[int, object]] = {}
+        self.methods: List[Tuple[int, str, str]] = []  # parse 之后为 [(access_flags, 方法名, 描述符), ...]
+
+    def _u1(self) -> int:
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def _u2(self) -> int:
+        self.pos += 2
+        return struct.unpack_from(">H", self.data, self.pos - 2)[0]
+
+    def _u4(self) -> int:
+        self.pos += 4
+        return struct.unpack_from(">I", self.data, self.pos - 4)[0]
+
+    def parse(self) -> ConstantDictionary:
+        if self._u4() != 0xCAFEBABE:
+            raise ValueError("不是有效的 class 文件")
+        self.pos += 4  # minor / major version
+        self._parse_constant_pool()
+        ints: Set[int] = set()
+        longs: Set[int] = set()
+        strings: Set[str] = set()
+        # 常量池中的数值与字符串常量（ldc / ldc_w / ldc2_w 引用的就是这些）
+        for tag, value in self.pool.values():
+            if tag == 3:
+                ints.add(value)
+            elif tag == 5:
+                longs.add(value)
+            elif tag == 8:
+                string = self.pool.get(value, (1, ""))[1]
+                if 0 < len(string) <= MAX_STRING_LEN:
+                    strings.add(string)
+
+        self.pos += 6  # access_flags / this_class / super_class
+        interfaces = self._u2()
+        self.pos += 2 * interfaces
+        self._skip_members()  # fields
+        for code in self._method_codes():
+            ints.update(self._scan_code(code))
+        return ConstantDictionary(sorted(ints), sorted(longs), sorted(strings))
+
+    def _parse_constant_pool(self):
+        count = self._u2()
+        index = 1
+        while index < count:
+            tag = self._u1()
+            if tag == 1:
+                length = self._u2()
+                value = self.data[self.pos:self.pos + length].decode("utf-8", errors="replace")
+                self.pos += length
+            elif tag in _CP_SIZES:
+                size = _CP_SIZES[tag]
+                if tag == 3:
+                    value = struct.unpack_from(">i", self.data, self.pos)[0]
+                elif tag == 5:
+                    value = struct.unpack_from(">q", self.data, self.pos)[0]
+                elif tag == 8:
+                    value = struct.unpack_from(">H", self.data, self.pos)[0]
+                else:
+                    value = None
+                self.pos += size
+            else:
+                raise ValueError(f"未知的常量池tag: {tag}")
+            self.pool[index] = (tag, value)
+            # long / double 占两个常量池槽位
+            index += 2 if tag in (5, 6) else 1
+
+    def _skip_attributes(self):
+        for _ in range(self._u2()):
+            self.pos += 2
+            length = self._u4()
+            self.pos += length
+
+    def _skip_members(self):
+        for _ in range(self._u2()):
+            self.pos += 6
+            self._skip_attributes()
+
+    def _method_codes(self) -> List[bytes]:
+        codes = []
+        for _ in range(self._u2()):
+            access = self._u2()
+            method_name = self.pool.get(self._u2(), (1, ""))[1]
+            descriptor = self.pool.get(self._u2(), (1, ""))[1]
+            self.methods.append((access, method_name, descriptor))
+            for _ in range(self._u2()):
+                name = self.pool.get(self._u2(), (1, ""))[1]
+                length = self._u4()
+                end = self.pos + length
+                if name == "Code":
+                    code_length = struct.unpack_from(">I", self.data, self.pos + 4)[0]
+                    codes.append(self.data[self.pos + 8:self.pos + 8 + code_length])
+                self.pos = end
+        return codes
+
+    @staticmethod
+    def _scan_code(code: bytes) -> Set[int]:
+        """扫描字节码立即数：iconst_m1..iconst_5、bipush、sipush，以及 switch 的分支值"""
+        ints: Set[int] = set()
+        pc = 0
+        while pc < len(code):
+            op = code[pc]
+            if 0x02 <= op <= 0x08:
+                ints.add(op - 0x03)
+            elif op == 0x10:
+                ints.add(struct.unpack_from(">b", code, pc + 1)[0])
+            elif op == 0x11:
+                ints.add(struct.unpack_from(">h", code, pc + 1)[0])
+            length = _OPCODE_LENGTHS[op]
+            if length:
+                pc += length
+                continue
+            if op == 0xc4:  # wide
+                pc += 6 if code[pc + 1] == 0x84 else 4
+                continue
+            # tableswitch / lookupswitch：操作码后按4字节对齐
+            base = pc + 1 + (-(pc + 1) % 4)
+            if op == 0xaa:
+                low, high = struct.unpack_from(">ii", code, base + 4)
+                ints.update((low, high))
+                pc = base + 12 + 4 * (high - low + 1)
+            else:
+                npairs = struct.unpack_from(">i", code, base + 4)[0]
+                for i in range(npairs):
+                    ints.add(struct.unpack_from(">i", code, base + 8 + 8 * i)[0])
+                pc = base + 8 + 8 * npairs
+        return ints
+
+
+def find_class_files(java_class_path: str, class_name: str) -> List[Tuple[str, bytes]]:
+    """在类路径（目录或jar）中查找目标类及其嵌套类的 class 文件，返回 [(位置, 内容), ...]"""
+    rel = class_name.replace(".", "/")
+    found = []
+    for entry in java_class_path.split(os.pathsep):
+        if os.path.isdir(entry):
+            directory = os.path.join(entry, os.path.dirname(rel))
+            base = os.path.basename(rel)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if name == base + ".class" or (name.startswith(base + "$") and name.endswith(".class")):
+                    path = os.path.join(directory, name)
+                    with open(path, "rb") as f:
+                        found.append((path, f.read()))
+        elif zipfile.is_zipfile(entry):
+            with zipfile.ZipFile(entry) as jar:
+                for name in jar.namelist():
+                    if name == rel + ".class" or (name.startswith(rel + "$") and name.endswith(".class")):
+                        found.append((f"{entry}!{name}", jar.read(name)))
+        if found:
+            break  # 与JVM一致：类路径中第一个包含该类的条目生效
+    return found
+
+
+def harvest_constants(java_class_path: str, target_method: str, cache_dir: str) -> ConstantDictionary:
+    """
+    收集目标方法所在类的常量。每个 class 文件的结果按内容哈希缓存到 cache_dir，类文件不变时不重复解析。
+    :param target_method: 如 "jpamb.cases.Simple.divideByN:(I)I"
+    """
+    class_name = target_method.split(":", 1)[0].rsplit(".", 1)[0]
+    dictionary = ConstantDictionary()
+    os.makedirs(cache_dir, exist_ok=True)
+    for location, data in find_class_files(java_class_path, class_name):
+        cache_path = os.path.join(cache_dir, hashlib.sha256(data).hexdigest()[:16] + ".json")
+        constants = _load_cached(cache_path)
+        if constants is None:
+            try:
+                constants = ClassFileParser(data).parse()
+            except (ValueError, IndexError, struct.error) as e:
+                print(f"警告：解析 {location} 失败：{e}")
+                continue
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(constants), f, ensure_ascii=False)
+        dictionary.merge(constants)
+    return dictionary
+
+
+def _load_cached(path: str) -> Optional[ConstantDictionary]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return ConstantDictionary(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
@@ -0,0 +1,75 @@
+# fuzzer/cmin.py
+# 离线语料库精简（类似 afl-cmin）：重放语料库，输出保持全局覆盖率位图不变的最小子集
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from coverage_tracker import CoverageTracker
+from driver import create_runner
+
+
+def load_inputs(path: str) -> List[Any]:
+    """读取语料库文件（JSONL，每行一个输入）"""
+    inputs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                inputs.append(json.loads(line))
+    return inputs
+
+
+def save_inputs(path: str, inputs: List[Any]):
+    with open(path, "w", encoding="utf-8") as f:
+        for input_data in inputs:
+            f.write(json.dumps(input_data, ensure_ascii=False) + "\n")
+
+
+def minimize_corpus(config, inputs: List[Any]) -> List[Any]:
+    """
+    重放每个输入，收集其覆盖的(边, 桶)组合；对每个组合保留最优（最小、最快）的输入，
+    再按组合的稀有程度贪心选取，直到覆盖全部组合。
+    """
+    java_runner = create_runner(config)
+    java_runner.collect_trace = False  # 精简只需要覆盖率位图
+    tracker = CoverageTracker(config=config)
+
+    # (边, 桶) -> 覆盖它的最优输入下标；以及每个组合被多少输入覆盖
+    best: Dict[Tuple[int, int], int] = {}
+    frequency: Dict[Tuple[int, int], int] = {}
+    input_tuples: List[set] = []
+    scores: List[Tuple[int, float]] = []
+    try:
+        for idx, input_data in enumerate(inputs):
+            t0 = time.perf_counter()
+            java_runner.run_java_program2(input_data)
+            exec_time_ms = (time.perf_counter() - t0) * 1000
+            classified = tracker.classify(tracker.read_run_map(java_runner))
+            tuples = {(edge, classified[edge]) for edge in tracker.edges_of(classified)}
+            input_tuples.append(tuples)
+            scores.append((len(json.dumps(input_data)), exec_time_ms))
+            for t in tuples:
+                frequency[t] = frequency.get(t, 0) + 1
+                if t not in best or scores[idx] < scores[best[t]]:
+                    best[t] = idx
+    finally:
+        java_runner.close()
+
+    # 最稀有的组合优先，它们往往只有少数输入能覆盖
+    kept: List[int] = []
+    covered = set()
+    for t in sorted(best, key=lambda t: frequency[t]):
+        if t in covered:
+            continue
+        idx = best[t]
+        kept.append(idx)
+        covered.update(input_tuples[idx])
+
+    return [inputs[idx] for idx in sorted(kept)]
+
+
+def run_cmin(config, input_path: str, output_path: str):
+    inputs = load_inputs(input_path)
+    minimized = minimize_corpus(config, inputs)
+    save_inputs(output_path, minimized)
+    print(f"语料库精简完成：{len(inputs)} -> {len(minimized)} 个输入，已写入 {output_path}")
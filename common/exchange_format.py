@@ -1,27 +1,139 @@
+import base64
+import io
 import json
-from dataclasses import dataclass, asdict
-from typing import List
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence
+
+# 二进制帧：魔数 + 方法名长度(u32) + inputs JSON长度(u32) + 轨迹元素类型(1字节) + 轨迹长度(u32)，均为小端
+_MAGIC = b"ER1"
+_HEADER = struct.Struct("<3sIIcI")
+# 轨迹按取值范围选用最窄的元素类型
+_TRACE_TYPES = (("H", 0, 0xFFFF), ("i", -(1 << 31), (1 << 31) - 1), ("q", -(1 << 63), (1 << 63) - 1))
+
+
+def to_trace_array(trace: Sequence[int]) -> array:
+    """把轨迹转为最窄的定长数组（已是该类型的数组时原样返回）"""
+    if not trace:
+        return array("H")
+    low, high = min(trace), max(trace)
+    for typecode, type_min, type_max in _TRACE_TYPES:
+        if type_min <= low and high <= type_max:
+            if isinstance(trace, array) and trace.typecode == typecode:
+                return trace
+            return array(typecode, trace)
+    raise OverflowError("轨迹中的边ID超出64位整数范围")
+
+
+def _little_endian(trace: array) -> array:
+    """传输统一使用小端字节序"""
+    if sys.byteorder == "little":
+        return trace
+    swapped = array(trace.typecode, trace)
+    swapped.byteswap()
+    return swapped
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """读取恰好 size 个字节，流提前结束（帧被截断）时抛出 EOFError"""
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError("二进制帧不完整")
+    return data
+
 
 @dataclass
 class ExecutionRecord:
     """
     一个标准化的数据类，用于封装单次程序执行的关键信息。
     它作为模糊器、Java运行器和符号执行引擎之间的数据交换格式。
+    trace 可以是 List[int] 或 array（执行器读取的轨迹是 array，避免逐个创建Python整数列表）。
     """
     method: str
     inputs: List[int]
-    trace: List[int]
+    trace: Sequence[int]
 
-    def to_json(self) -> str:
-        """将 ExecutionRecord 对象序列化为 JSON 字符串"""
-        return json.dumps(asdict(self), indent=2)
+    def to_dict(self, trace_encoding: str = "json") -> Dict[str, Any]:
+        """
+        转为可JSON序列化的字典。
+        :param trace_encoding: json（轨迹为整数列表，兼容格式）或 b64（轨迹为小端定长数组的base64，
+                               元素类型记录在 trace_type 中）
+        """
+        if trace_encoding == "b64":
+            trace = to_trace_array(self.trace)
+            return {
+                "method": self.method,
+                "inputs": self.inputs,
+                "trace": base64.b64encode(_little_endian(trace).tobytes()).decode("ascii"),
+                "trace_encoding": "b64",
+                "trace_type": trace.typecode,
+            }
+        return {
+            "method": self.method,
+            "inputs": self.inputs,
+            "trace": self.trace.tolist() if isinstance(self.trace, array) else self.trace,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "ExecutionRecord":
+        """从 to_dict 的结果还原（两种轨迹编码均可）"""
+        trace = data["trace"]
+        if data.get("trace_encoding") == "b64":
+            trace = array(data["trace_type"], base64.b64decode(trace))
+            if sys.byteorder != "little":
+                trace.byteswap()
+        return ExecutionRecord(method=data["method"], inputs=data["inputs"], trace=trace)
+
+    def to_json(self, trace_encoding: str = "json", indent: Optional[int] = None) -> str:
+        """将 ExecutionRecord 对象序列化为 JSON 字符串（默认紧凑格式）"""
+        return json.dumps(self.to_dict(trace_encoding), indent=indent, separators=None if indent else (",", ":"))
 
     @staticmethod
     def from_json(json_str: str) -> "ExecutionRecord":
         """从 JSON 字符串反序列化为 ExecutionRecord 对象"""
-        data = json.loads(json_str)
-        return ExecutionRecord(
-            method=data["method"],
-            inputs=data["inputs"],
-            trace=data["trace"]
-        )
\ No newline at end of file
+        return ExecutionRecord.from_dict(json.loads(json_str))
+
+    def write_to(self, stream: BinaryIO) -> int:
+        """
+        以长度前缀的二进制帧写入流（轨迹数组的内存直接写出，不拼接中间字符串）。
+        :return: 写入的字节数
+        """
+        method = self.method.encode("utf-8")
+        inputs = json.dumps(self.inputs, separators=(",", ":")).encode("utf-8")
+        trace = _little_endian(to_trace_array(self.trace))
+        stream.write(_HEADER.pack(_MAGIC, len(method), len(inputs), trace.typecode.encode("ascii"), len(trace)))
+        stream.write(method)
+        stream.write(inputs)
+        stream.write(memoryview(trace).cast("B"))
+        return _HEADER.size + len(method) + len(inputs) + len(trace) * trace.itemsize
+
+    @staticmethod
+    def read_from(stream: BinaryIO) -> Optional["ExecutionRecord"]:
+        """从流中读取一个二进制帧；流结束时返回None"""
+        header = stream.read(_HEADER.size)
+        if not header:
+            return None
+        if len(header) < _HEADER.size:
+            raise EOFError("二进制帧头不完整")
+        magic, method_len, inputs_len, typecode, count = _HEADER.unpack(header)
+        if magic != _MAGIC:
+            raise ValueError("无效的 ExecutionRecord 二进制帧")
+        method = _read_exact(stream, method_len).decode("utf-8")
+        inputs = json.loads(_read_exact(stream, inputs_len))
+        trace = array(typecode.decode("ascii"))
+        trace.frombytes(_read_exact(stream, count * trace.itemsize))
+        if sys.byteorder != "little":
+            trace.byteswap()
+        return ExecutionRecord(method=method, inputs=inputs, trace=trace)
+
+    def to_bytes(self) -> bytes:
+        """序列化为二进制帧"""
+        buf = io.BytesIO()
+        self.write_to(buf)
+        return buf.getvalue()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "ExecutionRecord":
+        return ExecutionRecord.read_from(io.BytesIO(data))
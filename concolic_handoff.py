@@ -0,0 +1,145 @@
+# fuzzer/concolic_handoff.py
+# 与符号执行引擎的交接：覆盖率停滞超过 plateau_window 秒时，把变异次数最少的一批语料库条目连同执行轨迹
+# 以 ExecutionRecord 导出到 handoff_dir/requests；求解器把解出的输入写到 handoff_dir/solutions，
+# 模糊器轮询该目录，每个输入验证执行一次后直接加入语料库
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from campaign_store import atomic_write, to_hashable
+from common.exchange_format import ExecutionRecord
+
+
+class ConcolicHandoff:
+    """
+    目录布局：
+        handoff_dir/requests/batch_0001_03.json   导出的 ExecutionRecord（轨迹编码由 trace_encoding 决定）
+        handoff_dir/solutions/*.json              求解器写出的 ExecutionRecord（或只有 method/inputs 的JSON），轨迹可为空
+        handoff_dir/solutions/done/               已导入的解
+    求解器应先写临时文件再改名为 .json，模糊器只读取 .json 文件。
+    """
+    POLL_INTERVAL = 2.0  # 轮询 solutions 目录的间隔（秒）
+
+    def __init__(self, handoff_dir: str, method: str, plateau_window: float = 300.0, batch_size: int = 8,
+                 trace_encoding: str = "json"):
+        self.method = method
+        self.plateau_window = plateau_window
+        self.batch_size = batch_size
+        self.trace_encoding = trace_encoding
+        self.requests_dir = os.path.join(handoff_dir, "requests")
+        self.solutions_dir = os.path.join(handoff_dir, "solutions")
+        self.done_dir = os.path.join(self.solutions_dir, "done")
+        for directory in (self.requests_dir, self.done_dir):
+            os.makedirs(directory, exist_ok=True)
+        self.last_progress = time.time()  # 最近一次发现新覆盖的时间
+        self._last_export = 0.0
+        self._last_poll = 0.0
+        self._exported_ids = set()        # 已导出过的条目（按对象id，条目在语料库中不会被替换）
+        self.batches = 0
+        self.exported = 0
+        self.execs = 0     # 导出时重新执行的次数（同时计入引擎的总执行数）
+        self.imported = 0
+        self.rejected = 0
+
+    def note_progress(self):
+        """发现新覆盖时调用"""
+        self.last_progress = time.time()
+
+    def plateaued(self, now: float) -> bool:
+        """距最近一次新覆盖（以及上一批导出）都已超过停滞窗口"""
+        return now - max(self.last_progress, self._last_export) >= self.plateau_window
+
+    def due(self) -> bool:
+        """maybe_handoff 是否会导出或导入（会在主执行器上执行输入）"""
+        now = time.time()
+        return self.plateaued(now) or now - self._last_poll >= self.POLL_INTERVAL
+
+    def maybe_handoff(self, engine):
+        """在主循环中频繁调用：停滞时导出一批条目，并按间隔导入求解器的结果"""
+        now = time.time()
+        if self.plateaued(now):
+            self.export_batch(engine)
+            self._last_export = now
+        if now - self._last_poll >= self.POLL_INTERVAL:
+            self.poll_solutions(engine)
+            self._last_poll = now
+
+    def select_entries(self, engine) -> List:
+        """变异次数最少、所在路径命中最少的条目优先（最少被探索）"""
+        corpus = engine.corpus_manager
+        candidates = [seed for seed in corpus.entries if id(seed) not in self._exported_ids]
+        candidates.sort(key=lambda seed: (seed.times_fuzzed, corpus.path_hits.get(seed.signature, 0)))
+        return candidates[:self.batch_size]
+
+    def export_batch(self, engine) -> int:
+        """
+        重新执行选出的条目以收集执行轨迹（模糊测试本身不解析轨迹），写出 ExecutionRecord。
+        :return: 导出的条目数
+        """
+        entries = self.select_entries(engine)
+        if not entries:
+            return 0
+        self.batches += 1
+        runner = engine.java_runner
+        runner.collect_trace = True
+        try:
+            for n, seed in enumerate(entries):
+                trace, _ = runner.run_java_program2(seed.input)
+                engine.total_execs += 1  # 导出时的重新执行同样是一次真实的JVM执行
+                self.execs += 1
+                record = ExecutionRecord(method=self.method, inputs=self._args(engine, seed.input), trace=trace or [])
+                path = os.path.join(self.requests_dir, f"batch_{self.batches:04d}_{n:02d}.json")
+                atomic_write(path, record.to_json(self.trace_encoding))
+                self._exported_ids.add(id(seed))
+        finally:
+            runner.collect_trace = False
+        self.exported += len(entries)
+        if engine.config.verbose >= 1:
+            print(f"覆盖率已停滞 {time.time() - self.last_progress:.0f} 秒，导出 {len(entries)} 个条目交给符号执行："
+                  f"{self.requests_dir}")
+        return len(entries)
+
+    def poll_solutions(self, engine):
+        """导入求解器写出的输入：每个输入验证执行一次后加入语料库，文件移到 done/"""
+        try:
+            names = sorted(name for name in os.listdir(self.solutions_dir) if name.endswith(".json"))
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.solutions_dir, name)
+            input_data = self._load_solution(engine, path)
+            if input_data is None:
+                self.rejected += 1
+            elif engine.import_solution(input_data):
+                self.imported += 1
+                if engine.config.verbose >= 1:
+                    print(f"导入求解器输入：{input_data}")
+            else:
+                self.rejected += 1
+            os.replace(path, os.path.join(self.done_dir, name))
+
+    def _load_solution(self, engine, path: str) -> Optional[Any]:
+        """读取一个解并转为语料库中的输入表示；方法不符或参数个数不符时返回None"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data.setdefault("trace", [])
+            record = ExecutionRecord.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"警告：无法读取求解结果 {path}：{e}")
+            return None
+        params = engine.input_generator.params
+        if record.method != self.method or len(record.inputs) != len(params):
+            return None
+        values = [to_hashable(v) for v in record.inputs]
+        return values[0] if len(params) == 1 else tuple(values)
+
+    @staticmethod
+    def _args(engine, input_data: Any) -> List[Any]:
+        """语料库输入 -> ExecutionRecord.inputs（参数列表）"""
+        return [input_data] if len(engine.input_generator.params) == 1 else list(input_data)
+
+    def report(self) -> Dict[str, int]:
+        return {"batches": self.batches, "exported": self.exported, "execs": self.execs,
+                "imported": self.imported, "rejected": self.rejected}
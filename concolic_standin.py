@@ -0,0 +1,83 @@
+# fuzzer/concolic_standin.py
+# 符号执行求解器的本地替身（用于测试交接流程）：读取 handoff_dir/requests 中的 ExecutionRecord，
+# 把整数参数逐个替换为目标类中的常量（及±1）——即求解器对“与魔数比较”的分支会给出的解，写到 handoff_dir/solutions
+import argparse
+import json
+import os
+import time
+from typing import Any, List
+
+from campaign_store import atomic_write
+from class_constants import harvest_constants
+from common.exchange_format import ExecutionRecord
+from input_generator import INT_BITS, parse_descriptor
+
+
+def solve(record: ExecutionRecord, params: List[str], constants: List[int]) -> List[List[Any]]:
+    """对每个整数参数，用每个常量及其±1替换，得到候选输入（参数列表）"""
+    solutions = []
+    for i, t in enumerate(params):
+        if t not in INT_BITS or i >= len(record.inputs):
+            continue
+        bits = INT_BITS[t]
+        for value in constants:
+            for candidate in (value - 1, value, value + 1):
+                if -(1 << (bits - 1)) <= candidate < (1 << (bits - 1)) and candidate != record.inputs[i]:
+                    inputs = list(record.inputs)
+                    inputs[i] = candidate
+                    solutions.append(inputs)
+    return solutions
+
+
+def process_requests(handoff_dir: str, params: List[str], constants: List[int]) -> int:
+    """处理一遍 requests/ 中的请求，已处理的请求移到 requests/done/；返回写出的解的个数"""
+    requests_dir = os.path.join(handoff_dir, "requests")
+    solutions_dir = os.path.join(handoff_dir, "solutions")
+    done_dir = os.path.join(requests_dir, "done")
+    os.makedirs(done_dir, exist_ok=True)
+    os.makedirs(solutions_dir, exist_ok=True)
+    written = 0
+    seen = set()
+    for name in sorted(os.listdir(requests_dir)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(requests_dir, name)
+        with open(path, "r", encoding="utf-8") as f:
+            record = ExecutionRecord.from_json(f.read())
+        for inputs in solve(record, params, constants):
+            key = json.dumps(inputs)
+            if key in seen:
+                continue
+            seen.add(key)
+            solution = ExecutionRecord(method=record.method, inputs=inputs, trace=[])
+            atomic_write(os.path.join(solutions_dir, f"{name[:-5]}_{written:04d}.json"), solution.to_json())
+            written += 1
+        os.replace(path, os.path.join(done_dir, name))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="符号执行求解器的本地替身（测试用）")
+    parser.add_argument("--handoff-dir", required=True, help="与模糊器共用的交接目录")
+    parser.add_argument("--java-class-path", default="bin:lib/asm.jar", help="Java类路径")
+    parser.add_argument("--target-method", default="jpamb.cases.Simple.divideByN:(I)I", help="目标测试Java方法")
+    parser.add_argument("--dictionary-cache-dir", default="./.constants_cache", help="常量收集结果的缓存目录")
+    parser.add_argument("--interval", type=float, default=2.0, help="轮询 requests/ 的间隔（秒）")
+    parser.add_argument("--once", action="store_true", help="只处理一遍当前的请求后退出")
+    args = parser.parse_args()
+
+    params = parse_descriptor(args.target_method) or ["I"]
+    dictionary = harvest_constants(args.java_class_path, args.target_method, args.dictionary_cache_dir)
+    constants = sorted(set(dictionary.ints + dictionary.longs))
+    print(f"常量 {len(constants)} 个，监视 {args.handoff_dir}/requests")
+    while True:
+        written = process_requests(args.handoff_dir, params, constants)
+        if written:
+            print(f"写出 {written} 个解")
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
 # fuzzer/config.py（正确版本）
+import copy
+import os
+
+
 class FuzzerConfig:
     def __init__(
         self,
@@ -8,23 +12,71 @@ class FuzzerConfig:
         agent_path: str = "./bytescribe-agent-1.0-SNAPSHOT.jar", # 插桩Agent jar包路径
         # 原有fuzz配置
         timeout: float = 5.0,
+        adaptive_timeout: bool = True,
+        min_timeout: float = 0.1,
+        calibration_runs: int = 10,
         seed_count: int = 100,
         mutate_count: int = 5,
         max_iterations: int = 10000,
-        coverage_map_size: int = 65536
+        coverage_map_size: int = 65536,
+        # 常驻JVM执行模式
+        persistent: bool = False,
+        persistent_max_execs: int = 1000,
+        # JVM快速启动
+        fast_startup: bool = False,
+        cds_dir: str = "./.jvm_cds",
+        # 并行执行
+        workers: int = 1,
+        work_dir: str = "./fuzz_workers",
+        executor: str = "thread",
+        # 能量调度
+        power_schedule: str = "uniform",
+        # 确定性变异阶段
+        deterministic: bool = True,
+        # 变异字典
+        use_dictionary: bool = True,
+        dictionary_cache_dir: str = "./.constants_cache",
+        # 执行结果缓存
+        exec_cache_entries: int = 100000,
+        exec_cache_mb: int = 64,
+        # 驱动模式
+        trace_encoding: str = "json",
+        # 遥测与日志
+        output_dir: str = "./fuzz_output",
+        stats_interval: float = 5.0,
+        # 检查点与恢复
+        resume: bool = False,
+        checkpoint_interval: float = 60.0,
+        # 输入精简
+        minimize_crashes: bool = True,
+        minimize_execs: int = 200,
+        # 符号执行交接
+        handoff_dir: str = None,
+        plateau_window: float = 300.0,
+        handoff_batch: int = 8,
+        # 多实例同步
+        sync_dir: str = None,
+        sync_id: str = "fuzzer01",
+        sync_role: str = "main",
+        sync_interval: float = 30.0,
+        verbose: int = 1
     ):
         # 目标java项目编译后的jar包路径
         self.java_class_path = java_class_path
 
         # 目标测试Java方法（带包名，类名，出入参类型）
         self.target_method = target_method
+        # 超时上限（秒）；开启自适应超时后，实际超时由种子校准得出并在运行中调整，不超过该值
         self.timeout = timeout
+        self.adaptive_timeout = adaptive_timeout
+        self.min_timeout = min_timeout
+        self.calibration_runs = calibration_runs  # 校准阶段执行的种子数
         self.seed_count = seed_count
         self.mutate_count = mutate_count
         self.max_iterations = max_iterations
 
         # --- 新增：插桩相关配置 ---
-        # 位图大小
+        # 位图大小（唯一来源：Python侧的位图与agent的 size= 参数都取自这里；2的幂）
         self.coverage_map_size = coverage_map_size
 
         # 建议使用绝对路径或相对于项目根目录的路径
@@ -32,4 +84,89 @@ class FuzzerConfig:
         self.agent_path = agent_path
         self.coverage_output_path = "./bytescribe.cov"
         self.map_output_path = "./bytescribe-map.csv"
-        self.edge_coverage_path = "./per-edge.csv"
\ No newline at end of file
+        self.edge_coverage_path = "./per-edge.csv"
+
+        # --- 新增：常驻JVM执行模式 ---
+        # 开启后一个JVM复用执行多个输入，避免每次执行都付出JVM启动和插桩的开销
+        self.persistent = persistent
+        # 单个JVM最多执行的输入数，达到后自动重启（防止状态累积/内存泄漏）
+        self.persistent_max_execs = persistent_max_execs
+        # harness 编译输出目录
+        self.harness_build_dir = "./.harness_build"
+
+        # --- 新增：JVM快速启动 ---
+        # 开启后缓存AppCDS归档（按类路径与agent jar的哈希命名，变化时自动重建）并使用面向启动速度的JVM参数
+        self.fast_startup = fast_startup
+        self.cds_dir = cds_dir
+
+        # --- 新增：并行执行 ---
+        # 同时运行的执行器数量；每个执行器在 work_dir 下有自己私有的 shm/map/perEdge 文件
+        self.workers = workers
+        self.work_dir = work_dir
+        # 并行执行后端：thread（线程池 + 阻塞子进程）或 async（asyncio子进程，workers 为在途进程数上限）
+        self.executor = executor
+
+        # --- 新增：能量调度 ---
+        # uniform（均匀随机，每个种子固定 mutate_count 次变异）/ explore / fast / rare
+        self.power_schedule = power_schedule
+
+        # --- 新增：确定性变异阶段 ---
+        # 每个新语料库条目先遍历位翻转、±1..35算术、边界值与字典常量替换，之后再进入随机变异
+        self.deterministic = deterministic
+
+        # --- 新增：变异字典 ---
+        # 解析目标类的 class 文件，收集常量池与字节码立即数中的常量，用于种子和字典变异；结果按类文件哈希缓存
+        self.use_dictionary = use_dictionary
+        self.dictionary_cache_dir = dictionary_cache_dir
+
+        # --- 新增：执行结果缓存 ---
+        # 按 (目标方法, 输入) 缓存覆盖签名与错误信息，条目数为0时关闭缓存
+        self.exec_cache_entries = exec_cache_entries
+        self.exec_cache_mb = exec_cache_mb
+
+        # --- 新增：驱动模式 ---
+        # 响应中执行轨迹的编码：json（整数列表，兼容格式）或 b64（小端定长数组的base64，体积小、编解码快）
+        self.trace_encoding = trace_encoding
+
+        # --- 新增：遥测与日志 ---
+        # output_dir 下定期写出 fuzzer_stats（当前状态）和 plot_data（时间序列）
+        self.output_dir = output_dir
+        self.stats_interval = stats_interval
+
+        # --- 新增：检查点与恢复 ---
+        # output_dir/queue 下保存语料库条目，errors.jsonl 保存错误，checkpoint.json 每 checkpoint_interval 秒原子写出一次；
+        # resume 为 True 时从这些文件恢复测试活动，而不是重新生成并执行种子
+        self.resume = resume
+        self.checkpoint_interval = checkpoint_interval
+
+        # --- 新增：输入精简 ---
+        # 发现新的崩溃类别时，把复现输入精简到仍触发同一崩溃类别的最简形式，每次最多执行 minimize_execs 次
+        self.minimize_crashes = minimize_crashes
+        self.minimize_execs = minimize_execs
+
+        # --- 新增：符号执行交接 ---
+        # 覆盖率停滞 plateau_window 秒后，把 handoff_batch 个最少被探索的条目连同执行轨迹导出到 handoff_dir/requests，
+        # 并导入求解器写到 handoff_dir/solutions 的输入；handoff_dir 为空时关闭
+        self.handoff_dir = handoff_dir
+        self.plateau_window = plateau_window
+        self.handoff_batch = handoff_batch
+
+        # --- 新增：多实例同步 ---
+        # sync_dir 为各实例共享的目录（本地或NFS）；sync_id 在实例间唯一；
+        # sync_role 为 main（做确定性阶段）或 secondary（只做随机变异），每 sync_interval 秒交换一次新条目
+        self.sync_dir = sync_dir
+        self.sync_id = sync_id
+        self.sync_role = sync_role
+        self.sync_interval = sync_interval
+        # 0：只输出总结；1：另外输出进度；2：另外输出每次执行的Java命令
+        self.verbose = verbose
+
+    def for_worker(self, worker_id: int) -> "FuzzerConfig":
+        """为并行执行器生成独立的配置副本，输出文件放在各自的私有目录下，避免互相覆盖"""
+        worker_config = copy.copy(self)
+        worker_dir = os.path.join(self.work_dir, f"worker_{worker_id}")
+        os.makedirs(worker_dir, exist_ok=True)
+        worker_config.coverage_output_path = os.path.join(worker_dir, "bytescribe.cov")
+        worker_config.map_output_path = os.path.join(worker_dir, "bytescribe-map.csv")
+        worker_config.edge_coverage_path = os.path.join(worker_dir, "per-edge.csv")
+        return worker_config
@@ -1,29 +1,256 @@
 import random
-from typing import List, Any, Set
+from dataclasses import dataclass
+from typing import List, Any, Set, Dict, Optional, Tuple
+
+
+@dataclass
+class SeedInfo:
+    """语料库中单个种子的元数据（用于能量调度）"""
+    input: Any
+    exec_time_ms: Optional[float] = None  # 执行耗时；初始种子未执行过时为None
+    bitmap_size: int = 0                  # 覆盖的边数
+    depth: int = 0                        # 发现深度（初始种子为0，由其变异得到的为父种子+1）
+    signature: Optional[int] = None       # 覆盖签名（分桶后位图的哈希），同一路径共享
+    times_fuzzed: int = 0                 # 被选中变异的次数
+    edges: Tuple[int, ...] = ()           # 覆盖的边（位图下标），用于top-rated评选
+    favored: bool = False                 # 是否属于覆盖全部已知边的精简子集
+    det_done: bool = False                # 确定性变异阶段是否已完成
+
+    def fav_factor(self) -> float:
+        """AFL的评分因子：执行越快、输入越小越好"""
+        return (self.exec_time_ms or 0.0) * len(repr(self.input))
+
 
 class CorpusManager:
     """管理有效测试用例（带来新覆盖率的输入），去重并优先级排序"""
-    def __init__(self):
+    # 可用的能量调度策略（参考AFL/AFLFast）
+    SCHEDULES = ("uniform", "explore", "fast", "rare")
+    MAX_ENERGY_FACTOR = 16  # 单个种子最多获得 mutate_count 的多少倍变异次数
+    MAX_PATH_EDGES = 16384  # rare调度最多记住多少条路径（覆盖签名）的边，供命中缓存的重放计数
+
+    def __init__(self, schedule: str = "uniform"):
+        if schedule not in self.SCHEDULES:
+            raise ValueError(f"未知的能量调度策略: {schedule}")
+        self.schedule = schedule
         self.corpus: List[Any] = []  # 有效输入列表（按添加顺序排序）
         self.seen: Set[Any] = set()  # 去重集合
+        self.entries: List[SeedInfo] = []  # 与 corpus 一一对应的元数据
+        self.path_hits: Dict[int, int] = {}  # 每条路径（覆盖签名）被执行到的次数，用于fast调度
+        self.total_path_hits = 0
+        # 每条边被执行命中的次数（仅rare调度统计），种子按其覆盖的最稀有边分配能量
+        self.edge_hits: Dict[int, int] = {}
+        self.total_edge_hits = 0
+        self._path_edges: Dict[int, Tuple[int, ...]] = {}  # 覆盖签名 -> 该路径覆盖的边
+        self._cursor = 0  # 非uniform调度时按队列顺序轮转选择
+        # 已执行种子的累计耗时/覆盖边数，用于计算平均值（避免每次调度都遍历语料库）
+        self._executed_count = 0
+        self._total_exec_time_ms = 0.0
+        self._total_bitmap_size = 0
+        # AFL风格的top-rated：每条边对应覆盖它的最优（最快*最小）种子
+        self.top_rated: Dict[int, SeedInfo] = {}
+        self._score_changed = False
+        self.favored_count = 0
+        self.pending_favored = 0  # 尚未被变异过的favored种子数
+        self.det_done_count = 0   # 已完成确定性变异阶段的种子数
 
-    def add(self, input_data: Any) -> bool:
+    def add(self, input_data: Any, exec_time_ms: Optional[float] = None, bitmap_size: int = 0,
+            depth: int = 0, signature: Optional[int] = None, edges: Tuple[int, ...] = ()) -> bool:
         """添加输入到语料库（去重）"""
         if input_data not in self.seen:
             self.seen.add(input_data)
             self.corpus.append(input_data)
+            seed = SeedInfo(input_data, exec_time_ms, bitmap_size, depth, signature, edges=edges)
+            self.entries.append(seed)
+            self._update_top_rated(seed)
+            if exec_time_ms is not None:
+                self._executed_count += 1
+                self._total_exec_time_ms += exec_time_ms
+                self._total_bitmap_size += bitmap_size
             return True
         return False
 
+    def update_seed(self, seed: SeedInfo, exec_time_ms: float, bitmap_size: int, signature: int,
+                    edges: Tuple[int, ...]):
+        """补充种子的执行元数据（如初始种子在校准阶段执行之后）"""
+        if seed.exec_time_ms is None:
+            self._executed_count += 1
+        else:
+            self._total_exec_time_ms -= seed.exec_time_ms
+            self._total_bitmap_size -= seed.bitmap_size
+        self._total_exec_time_ms += exec_time_ms
+        self._total_bitmap_size += bitmap_size
+        seed.exec_time_ms = exec_time_ms
+        seed.bitmap_size = bitmap_size
+        seed.signature = signature
+        seed.edges = edges
+        self._update_top_rated(seed)
+
+    def mark_det_done(self, seed: SeedInfo):
+        """标记种子的确定性变异阶段已完成，之后只做随机变异"""
+        if not seed.det_done:
+            seed.det_done = True
+            self.det_done_count += 1
+
+    def scheduler_state(self) -> Dict:
+        """可JSON序列化的调度器状态（语料库条目本身由 CampaignStore 另行保存）"""
+        return {
+            "seeds": [[seed.times_fuzzed, seed.det_done] for seed in self.entries],
+            "path_hits": [[signature, hits] for signature, hits in self.path_hits.items()],
+            "total_path_hits": self.total_path_hits,
+            "edge_hits": [[edge, hits] for edge, hits in self.edge_hits.items()],
+            "cursor": self._cursor,
+        }
+
+    def restore_scheduler_state(self, state: Dict):
+        """恢复 scheduler_state 保存的状态；检查点之后才加入的条目保持初始状态"""
+        for seed, (times_fuzzed, det_done) in zip(self.entries, state["seeds"]):
+            seed.times_fuzzed = times_fuzzed
+            if det_done:
+                self.mark_det_done(seed)
+        self.path_hits = {signature: hits for signature, hits in state["path_hits"]}
+        self.total_path_hits = state["total_path_hits"]
+        if "edge_hits" in state:  # 旧检查点没有边命中统计
+            self.edge_hits = {edge: hits for edge, hits in state["edge_hits"]}
+            self.total_edge_hits = sum(self.edge_hits.values())
+        self._cursor = state["cursor"]
+        self._score_changed = True  # times_fuzzed 变化后需重新统计 pending_favored
+
     def get_random_input(self) -> Any:
         """从语料库中随机选择一个输入（用于变异）"""
         return random.choice(self.corpus) if self.corpus else None
 
+    def _update_top_rated(self, seed: SeedInfo):
+        """若新种子在某条边上优于当前的top-rated种子，则取而代之"""
+        factor = seed.fav_factor()
+        for edge in seed.edges:
+            current = self.top_rated.get(edge)
+            if current is None or factor < current.fav_factor():
+                self.top_rated[edge] = seed
+                self._score_changed = True
+
+    def cull(self):
+        """
+        重新评选favored子集（AFL的cull_queue）：
+        依次遍历每条边，若尚未被已选种子覆盖，就选中该边的top-rated种子，直到覆盖全部已知边。
+        """
+        if not self._score_changed:
+            return
+        self._score_changed = False
+        for seed in self.entries:
+            seed.favored = False
+        covered: Set[int] = set()
+        self.favored_count = 0
+        self.pending_favored = 0
+        for edge, seed in self.top_rated.items():
+            if edge in covered:
+                continue
+            covered.update(seed.edges)
+            if not seed.favored:
+                seed.favored = True
+                self.favored_count += 1
+                if seed.times_fuzzed == 0:
+                    self.pending_favored += 1
+
+    def select(self) -> Optional[SeedInfo]:
+        """按调度策略选择下一个要变异的种子"""
+        if not self.entries:
+            return None
+        # 所有策略都优先favored种子：非favored种子大概率被跳过。
+        # uniform 随机选择候选；其余策略与AFL一样按队列轮转，由能量决定每个种子的变异次数
+        self.cull()
+        for _ in range(len(self.entries)):
+            if self.schedule == "uniform":
+                seed = random.choice(self.entries)
+            else:
+                seed = self.entries[self._cursor % len(self.entries)]
+                self._cursor += 1
+            if not self._should_skip(seed):
+                break
+        if seed.favored and seed.times_fuzzed == 0:
+            self.pending_favored -= 1
+        return seed
+
+    def _should_skip(self, seed: SeedInfo) -> bool:
+        """AFL的跳过规则"""
+        if self.pending_favored:
+            # 还有未变异过的favored种子时，几乎只变异它们
+            return (seed.times_fuzzed > 0 or not seed.favored) and random.random() < 0.99
+        if not seed.favored and self.favored_count:
+            return random.random() < (0.95 if seed.times_fuzzed > 0 else 0.75)
+        return False
+
+    def has_path(self, signature: int) -> bool:
+        """是否已记下该路径覆盖的边（已记下时 record_execution 不需要传入边）"""
+        return signature in self._path_edges
+
+    def record_execution(self, signature: int, edges: Optional[Tuple[int, ...]] = None):
+        """
+        记录一次执行命中的路径。
+        :param edges: 该次执行覆盖的边（rare调度需要）；缺省时（如命中执行结果缓存的重放）按签名查之前记下的边
+        """
+        self.path_hits[signature] = self.path_hits.get(signature, 0) + 1
+        self.total_path_hits += 1
+        if self.schedule != "rare":
+            return
+        if edges is None:
+            edges = self._path_edges.get(signature, ())
+        elif signature not in self._path_edges and len(self._path_edges) < self.MAX_PATH_EDGES:
+            self._path_edges[signature] = edges
+        for edge in edges:
+            self.edge_hits[edge] = self.edge_hits.get(edge, 0) + 1
+        self.total_edge_hits += len(edges)
+
+    def rarest_edge_hits(self, seed: SeedInfo) -> int:
+        """种子覆盖的边中最稀有的一条被执行命中的次数"""
+        return min((self.edge_hits.get(edge, 0) for edge in seed.edges), default=0)
+
+    def calculate_energy(self, seed: SeedInfo, base: int) -> int:
+        """
+        计算种子本轮的变异次数（能量）。
+        :param base: 基础变异次数（FuzzerConfig.mutate_count）
+        """
+        seed.times_fuzzed += 1
+        if self.schedule == "uniform":
+            return base
+
+        score = self._performance_score(seed)
+        hits = self.path_hits.get(seed.signature, 1) if seed.signature is not None else 1
+        if self.schedule == "fast":
+            # AFLFast：被选中越多次能量指数增长，但路径越“热门”能量越低
+            factor = (2 ** min(seed.times_fuzzed - 1, 16)) / hits
+        elif self.schedule == "rare":
+            # 覆盖了稀有边（命中次数低于边的平均命中次数）的种子获得更多能量
+            avg_hits = self.total_edge_hits / len(self.edge_hits) if self.edge_hits else 1
+            factor = avg_hits / max(self.rarest_edge_hits(seed), 1)
+        else:  # explore
+            factor = 1.0
+
+        factor = min(max(factor, 1.0 / self.MAX_ENERGY_FACTOR), self.MAX_ENERGY_FACTOR)
+        energy = int(base * score * factor)
+        return max(1, min(energy, base * self.MAX_ENERGY_FACTOR))
+
+    def _performance_score(self, seed: SeedInfo) -> float:
+        """根据执行速度、覆盖边数和发现深度评估种子质量（1.0为平均水平）"""
+        score = 1.0
+        if seed.exec_time_ms is None or not self._executed_count:
+            return score
+        avg_time = self._total_exec_time_ms / self._executed_count
+        avg_size = self._total_bitmap_size / self._executed_count
+        # 越快的种子单位时间内能执行越多次
+        if seed.exec_time_ms * 2 < avg_time:
+            score *= 2.0
+        elif seed.exec_time_ms > avg_time * 2:
+            score *= 0.5
+        # 覆盖更多边的种子更有价值
+        if seed.bitmap_size > avg_size * 1.5:
+            score *= 1.5
+        elif seed.bitmap_size * 2 < avg_size:
+            score *= 0.75
+        # 深层种子往往接近难以到达的路径
+        if seed.depth >= 4:
+            score *= 1.5 if seed.depth < 8 else 2.0
+        return score
+
     def size(self) -> int:
         return len(self.corpus)
 
-    # TODOLIST
-    # - 基于覆盖率的种子优先级排序
-    # - 能量调度机制  
-    # - 种子质量评估
-    # - 智能选择策略
@@ -0,0 +1,99 @@
+# fuzzer/corpus_sync.py
+# 多实例语料库同步（参考AFL的 -M/-S 与 sync_dir）：每个实例把自己的新条目导出到 sync_dir/<sync_id>/queue，
+# 并定期导入其他实例的新条目；只有覆盖签名在本地未知的条目才重新执行，带来新覆盖的合并进本地语料库
+import os
+import time
+from typing import Dict
+
+from campaign_store import CampaignStore
+
+
+class CorpusSync:
+    """
+    sync_dir 可以是本地目录或NFS等共享路径，布局为：
+        sync_dir/<sync_id>/queue/id_000123.json   各实例导出的条目（与 CampaignStore 的队列格式相同）
+        sync_dir/<sync_id>/.synced/<peer_id>       本实例已导入到对方的哪个条目（重启后不重复导入）
+    """
+    def __init__(self, sync_dir: str, sync_id: str, interval: float = 30.0):
+        if os.sep in sync_id or sync_id.startswith("."):
+            raise ValueError(f"无效的同步实例ID: {sync_id}")
+        self.sync_dir = sync_dir
+        self.sync_id = sync_id
+        self.interval = interval
+        self.outbox = CampaignStore(os.path.join(sync_dir, sync_id))
+        self.synced_dir = os.path.join(sync_dir, sync_id, ".synced")
+        os.makedirs(self.outbox.queue_dir, exist_ok=True)
+        os.makedirs(self.synced_dir, exist_ok=True)
+        self._exported = 0  # 已导出的本地条目数
+        self._last_sync = 0.0
+        self.imported = 0   # 导入后带来新覆盖、加入本地语料库的条目数
+        self.skipped = 0    # 覆盖签名或输入已知、未重新执行的条目数
+        self.evaluated = 0  # 重新执行过的条目数
+
+    def due(self) -> bool:
+        """是否到了同步的时间"""
+        return time.time() - self._last_sync >= self.interval
+
+    def maybe_sync(self, engine):
+        """距上次同步超过 interval 秒时同步一次（在主循环中频繁调用，开销很小）"""
+        if self.due():
+            self.sync(engine)
+
+    def sync(self, engine):
+        self.export(engine)
+        self.import_peers(engine)
+        self._last_sync = time.time()
+
+    def export(self, engine):
+        """导出上次同步以来新加入本地语料库的条目"""
+        entries = engine.corpus_manager.entries
+        for index in range(self._exported, len(entries)):
+            self.outbox.append_entry(index, entries[index])
+        self._exported = len(entries)
+
+    def import_peers(self, engine):
+        for peer_id in sorted(os.listdir(self.sync_dir)):
+            if peer_id == self.sync_id or peer_id.startswith("."):
+                continue
+            peer_queue = os.path.join(self.sync_dir, peer_id, "queue")
+            if os.path.isdir(peer_queue):
+                self._import_peer(engine, peer_id)
+
+    def _import_peer(self, engine, peer_id: str):
+        start = self._load_progress(peer_id)
+        peer = CampaignStore(os.path.join(self.sync_dir, peer_id))
+        entries = peer.load_entries(start)
+        if not entries:
+            return
+        corpus = engine.corpus_manager
+        known_signatures = {seed.signature for seed in corpus.entries}
+        known_signatures.update(corpus.path_hits)
+        imported_before = self.imported
+        for entry in entries:
+            if (entry["input"] in corpus.seen or entry["signature"] in known_signatures
+                    or engine.execution_cache.contains(engine.config.target_method, entry["input"])):
+                self.skipped += 1
+                continue
+            self.evaluated += 1
+            if engine.import_entry(entry):
+                self.imported += 1
+            known_signatures.add(engine.coverage_tracker.last_signature())
+        self._save_progress(peer_id, entries[-1]["id"] + 1)
+        if self.imported > imported_before and engine.config.verbose >= 1:
+            print(f"从实例 {peer_id} 导入 {self.imported - imported_before} 个条目")
+
+    def _load_progress(self, peer_id: str) -> int:
+        try:
+            with open(os.path.join(self.synced_dir, peer_id), "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _save_progress(self, peer_id: str, next_id: int):
+        path = os.path.join(self.synced_dir, peer_id)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(str(next_id))
+        os.replace(path + ".tmp", path)
+
+    def report(self) -> Dict[str, int]:
+        return {"imported": self.imported, "evaluated": self.evaluated, "skipped": self.skipped}
@@ -1,8 +1,11 @@
 # fuzzer/coverage_tracker.py（修改后，对接Java插桩）
-from typing import Set, Optional, Dict, Tuple
+from typing import Set, Optional, Dict, List, Tuple
 import json
 import os
 import csv
+import re
+import zlib
+from fuzzer_stats import StageProfiler
 
 class CoverageTracker:
     def __init__(self, config):
@@ -21,6 +24,27 @@ class CoverageTracker:
         # 0 -> 0, 1 -> 1, 2 -> 2, 3 -> 3, 4-7 -> 4, 8-15 -> 5, 16-31 -> 6, 32-127 -> 7, 128+ -> 8
         self.hit_count_buckets = self._initialize_buckets()
 
+        # 向量化比较所需的状态：
+        # classify_table 把原始计数一次性(bytes.translate)映射为单热的桶位：桶k -> 1 << (k-1)
+        # virgin_bits 是 AFL 风格的反向位图（整张图作为一个大整数），为1的位表示该边的该桶从未出现过
+        self.classify_table = bytes(0 if b == 0 else 1 << (b - 1) for b in self.hit_count_buckets)
+        self.virgin_bits = (1 << (8 * self.config.coverage_map_size)) - 1
+        # 已覆盖的边数，在发现新边时增量维护，统计时无需重新扫描全局位图
+        self.covered_edge_count = 0
+        # 最近一次发现新行为时首次覆盖的边（仅在 evaluate_run_map 返回 True 后有效）
+        self.last_new_edges = []
+        # 发现新行为的执行所命中的插桩块ID（来自 per-edge 文件；位图槽位是边哈希，不能反推块），
+        # 以及最近一次发现新行为时首次命中的块。没有新行为的执行不会命中新块（边哈希冲突除外），因此只在此时读取
+        self.covered_blocks: Set[int] = set()
+        self.last_new_blocks: List[int] = []
+
+        # 预分配的缓冲区：直接在mmap位图上评估时，原地拷贝到这里再做分桶，避免每次执行分配内存
+        self._run_buf = bytearray(self.config.coverage_map_size)
+        # 最近一次评估得到的分桶位图，用于计算覆盖签名和覆盖边数
+        self.last_classified = bytes(self.config.coverage_map_size)
+        # 分阶段计时（FuzzerEngine 会替换为引擎共用的实例）
+        self.profiler = StageProfiler()
+
     def _initialize_buckets(self):
         """预先计算好0-255每个计数值对应的桶，避免重复计算"""
         buckets = bytearray(256)
@@ -73,34 +97,114 @@ class CoverageTracker:
         # 1. 执行Java程序
         trace, error_msg_str = java_runner.run_java_program2(new_input)
 
-        # 2. 读取本次运行生成的覆盖率位图 (bytescribe.cov)
-        bitmap_file = self.config.coverage_output_path
-        try:
-            with open(bitmap_file, 'rb') as f:
-                current_run_map = bytearray(f.read())
-        except FileNotFoundError:
-            # 如果位图文件不存在，说明执行失败，没有新覆盖
-            return False, error_msg_str
-
-        # 3. 比较位图，判断是否有新行为 (核心逻辑)
-        has_new_coverage = False
-        for i in range(self.config.coverage_map_size):
-            # 如果当前运行的命中次数不为0
-            if current_run_map[i] != 0:
-                # 将当前命中次数和全局命中次数都归入“桶”中
-                current_bucket = self.hit_count_buckets[current_run_map[i]]
-                global_bucket = self.hit_count_buckets[self.global_coverage_map[i]]
-
-                # 如果当前“桶”比全局“桶”更大，说明发现了新的行为
-                # 例如，之前只命中1次(桶1)，现在命中了5次(桶4)，这是一个有价值的发现
-                if current_bucket > global_bucket:
-                    has_new_coverage = True
-                    # 更新全局位图，记录下这个更有价值的命中次数
-                    self.global_coverage_map[i] = current_run_map[i]
+        # 2. 读取本次运行生成的覆盖率位图 (bytescribe.cov，已由执行器mmap映射)
+        current_run_map = self.read_run_map(java_runner)
+
+        # 3. 比较位图，判断是否有新行为（有新行为时再读取本次命中的块）
+        has_new_coverage = self.evaluate_run_map(current_run_map)
+        if has_new_coverage:
+            self.note_blocks(trace if trace is not None else java_runner.read_blocks())
 
         # 4. 返回结果
+        return has_new_coverage, self.filter_error(error_msg_str)
+
+    def read_run_map(self, java_runner) -> memoryview:
+        """
+        获取执行器本次运行的覆盖率位图。
+        直接返回执行器mmap共享位图的 memoryview（零拷贝），只在该执行器下一次执行前有效；
+        需要跨执行保留时（如并行模式）由调用方自行拷贝。
+        """
+        return java_runner.bitmap.view
+
+    def evaluate_run_map(self, current_run_map, blocks=None) -> bool:
+        """
+        将一次运行的位图合并进全局位图 (核心逻辑)。
+        并行模式下只应在主线程中调用，保证 global_coverage_map 不被并发修改。
+        :param blocks: 该次执行命中的块ID（并行/异步模式下由执行器随执行读取），有新行为时记入 covered_blocks
+        :return: 是否发现了新行为
+        """
+        with self.profiler.stage("bitmap_compare"):
+            has_new_coverage = self._evaluate_run_map(current_run_map)
+        if has_new_coverage:
+            self.note_blocks(blocks or ())
+        return has_new_coverage
+
+    def note_blocks(self, blocks):
+        """记录一次发现新行为的执行所命中的块，last_new_blocks 为其中首次命中的块"""
+        self.last_new_blocks = [block for block in blocks if block not in self.covered_blocks]
+        self.covered_blocks.update(self.last_new_blocks)
+
+    def _evaluate_run_map(self, current_run_map) -> bool:
+        # 1. 一次性把整张位图的命中次数归入“桶”中
+        if isinstance(current_run_map, memoryview):
+            # mmap 位图没有 translate，先原地拷贝到预分配缓冲区
+            self._run_buf[:] = current_run_map
+            current_run_map = self._run_buf
+        classified = self.classify(current_run_map)
+        self.last_classified = classified
+
+        # 2. 整张图按大整数与反向位图做位与：非零说明出现了从未见过的(边, 桶)组合
+        # 例如，之前只命中1次(桶1)，现在命中了5次(桶4)，这是一个有价值的发现
+        new_bits = int.from_bytes(classified, "little") & self.virgin_bits
+        if not new_bits:
+            return False
+
+        # 3. 仅在有新行为时（很少发生）才逐字节更新全局位图
+        self.virgin_bits &= ~new_bits
+        self._merge_new_bits(new_bits, current_run_map)
+        return True
+
+    def classify(self, run_map) -> bytes:
+        """把原始命中次数位图整体映射为单热的桶位图"""
+        return bytes(run_map).translate(self.classify_table) if isinstance(run_map, memoryview) \
+            else run_map.translate(self.classify_table)
+
+    @staticmethod
+    def edges_of(classified) -> Tuple[int, ...]:
+        """分桶位图中所有被覆盖的边（位图下标）"""
+        return tuple(match.start() for match in re.finditer(rb"[^\x00]", classified))
+
+    def _merge_new_bits(self, new_bits: int, current_run_map):
+        """把新出现的桶位对应的命中次数写入全局位图，并增量统计新覆盖的边"""
+        changed = new_bits.to_bytes(self.config.coverage_map_size, "little")
+        self.last_new_edges = []
+        for match in re.finditer(rb"[^\x00]", changed):
+            i = match.start()
+            if self.global_coverage_map[i] == 0:
+                self.covered_edge_count += 1
+                self.last_new_edges.append(i)
+            # 记录下更有价值（更大）的命中次数
+            if current_run_map[i] > self.global_coverage_map[i]:
+                self.global_coverage_map[i] = current_run_map[i]
+
+    def merge_edges(self, edges):
+        """
+        把只知道下标、不知道命中次数的边（如语料库条目文件中的 edges）记为已覆盖：
+        全局位图至少记1次，反向位图清除最低的桶位（命中1次）；更高的桶之后再出现时仍算新行为。
+        """
+        for i in edges:
+            if self.global_coverage_map[i] == 0:
+                self.global_coverage_map[i] = 1
+                self.covered_edge_count += 1
+            self.virgin_bits &= ~(1 << (8 * i))
+
+    def last_signature(self) -> int:
+        """最近一次执行的覆盖签名（分桶后位图的CRC32），走相同路径的输入签名相同"""
+        return zlib.crc32(self.last_classified)
+
+    def last_edges(self) -> Tuple[int, ...]:
+        """最近一次执行覆盖的边"""
+        return self.edges_of(self.last_classified)
+
+    def last_bitmap_size(self) -> int:
+        """最近一次执行覆盖的边数"""
+        return len(self.last_classified) - self.last_classified.count(0)
+
+    @staticmethod
+    def filter_error(error_msg_str: Optional[str]) -> Optional[str]:
+        """只把Java异常视为错误，其余（如超时）不上报"""
         is_error = bool(error_msg_str and "Exception" in error_msg_str)
-        return has_new_coverage, error_msg_str if is_error else None
+        return error_msg_str if is_error else None
 
     def get_coverage_stats(self) -> Dict:
         """返回覆盖率统计信息"""
@@ -110,11 +214,9 @@ class CoverageTracker:
         }
 
     def get_coverage_stats2(self):
-        """计算已覆盖的边的总数"""
-        # 统计全局位图中非零项的数量，即为覆盖到的总边数
-        total_covered_edges = sum(1 for byte in self.global_coverage_map if byte > 0)
+        """返回已覆盖的边的总数（增量维护，无需重新扫描全局位图）"""
         return {
-            "total_covered_branches": total_covered_edges
+            "total_covered_branches": self.covered_edge_count
         }
 
     def reset(self):
@@ -0,0 +1,165 @@
+# fuzzer/crash_triage.py
+# 崩溃分诊：从stderr开头解析JVM异常类型与栈帧，按 异常类型 + 前N个归一化栈帧 分桶，
+# 每个桶只保留计数、首条信息与最小的复现输入，内存占用与不同缺陷的数量成正比，而不是与崩溃次数成正比
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+STACK_HEAD_CHARS = 8192   # 只解析stderr的开头部分（异常行与栈顶帧都在最前面）
+TOP_FRAMES = 3            # 参与分桶的栈帧数
+MAX_MESSAGE_CHARS = 500   # 每个桶保存的异常信息长度上限
+MAX_BUCKET_SIGNATURES = 64
+MAX_BUCKETS = 10000       # 桶数上限，超出后新类别只计数不保存
+
+# Exception in thread "main" java.lang.ArithmeticException: / by zero
+# 以及 Caused by: / 直接以异常类名开头的行
+_EXCEPTION_RE = re.compile(
+    r'^(?:Exception in thread "[^"]*" |Caused by: )?'
+    r'((?:[\w$]+\.)+[\w$]*(?:Exception|Error|Throwable)|[\w$]*(?:Exception|Error))(?::\s*(.*))?$'
+)
+# 执行器在stderr前加的前缀，如 "Java执行异常 (返回码: 1): "
+_RUNNER_PREFIX_RE = re.compile(r'^Java执行异常 \(返回码: -?\d+\):\s*')
+# \tat jpamb.cases.Simple.divideByN(Simple.java:12)
+# 可能带有类加载器/模块前缀，如 java.base/java.util.Arrays.foo、app//jpamb.X.f
+_FRAME_RE = re.compile(r'^\s*at\s+(?:[\w.@-]*/)*([\w$.<>]+)\(([^)]*)\)')
+# 运行时生成的类名中带有的编号/地址（lambda、代理、反射访问器），同一位置每次运行可能不同
+_GENERATED_RE = re.compile(r'(\$\$Lambda|\$Proxy|GeneratedMethodAccessor|GeneratedConstructorAccessor)(?:\$?\d+)?(?:/0x[0-9a-f]+)?')
+# 不属于被测代码的栈帧：JDK内部与 jpamb 的入口类
+_IGNORED_FRAME_PREFIXES = ("java.", "javax.", "jdk.", "sun.", "com.sun.", "jpamb.Runtime.")
+
+
+@dataclass
+class ParsedCrash:
+    """从stderr解析出的异常"""
+    exception_type: str
+    message: str
+    frames: List[str]   # 归一化后的栈帧（类名.方法名），由栈顶到栈底
+
+
+def normalize_frame(line: str) -> str:
+    """去掉运行时生成类名中的编号与地址（行号在匹配栈帧时丢弃，同一缺陷在不同行号的变体仍归为一类）"""
+    return _GENERATED_RE.sub(r"\1", line)
+
+
+def parse_crash(stderr: str, head_chars: int = STACK_HEAD_CHARS) -> ParsedCrash:
+    """只读取 stderr 的前 head_chars 个字符，解析第一个异常及其栈帧"""
+    exception_type, message, frames = "UnknownError", "", []
+    for line in stderr[:head_chars].splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        frame = _FRAME_RE.match(normalize_frame(line))
+        if frame:
+            if exception_type != "UnknownError":
+                frames.append(frame.group(1))
+            continue
+        if exception_type != "UnknownError":
+            break  # 只取第一个异常的栈帧（Caused by / 被截断的 "... N more" 之后不再解析）
+        match = _EXCEPTION_RE.match(_RUNNER_PREFIX_RE.sub("", line))
+        if match:
+            exception_type, message = match.group(1), (match.group(2) or "").strip()
+    return ParsedCrash(exception_type, message, frames)
+
+
+@dataclass
+class CrashBucket:
+    """一类崩溃：同一异常类型、同一栈顶位置"""
+    bucket_id: str
+    exception_type: str
+    frames: Tuple[str, ...]
+    message: str
+    reproducer: Any        # 目前已知的最小复现输入
+    count: int = 0
+    signatures: Set[int] = field(default_factory=set)  # 到达该崩溃的不同覆盖签名（最多 MAX_BUCKET_SIGNATURES 个）
+
+    def to_dict(self) -> Dict:
+        return {
+            "bucket": self.bucket_id,
+            "input": self.reproducer,
+            "error_type": self.exception_type,
+            "error_message": self.message,
+            "frames": list(self.frames),
+            "count": self.count,
+            "signatures": len(self.signatures),
+        }
+
+
+def input_size(input_data: Any) -> Tuple[int, int]:
+    """复现输入的大小：先比较文本长度，再比较数值的绝对值（单个整数参数时）"""
+    magnitude = abs(input_data) if isinstance(input_data, (int, float)) and not isinstance(input_data, bool) else 0
+    return len(repr(input_data)), magnitude
+
+
+class CrashTriage:
+    """
+    按 (异常类型, 前 top_frames 个归一化栈帧) 分桶；解析不到栈帧时以覆盖签名代替栈帧，
+    避免所有无栈信息的崩溃都落进同一个桶。
+    """
+    def __init__(self, top_frames: int = TOP_FRAMES, head_chars: int = STACK_HEAD_CHARS,
+                 max_buckets: int = MAX_BUCKETS):
+        self.top_frames = top_frames
+        self.head_chars = head_chars
+        self.max_buckets = max_buckets
+        self.buckets: Dict[str, CrashBucket] = {}
+        self.total_crashes = 0
+        self.dropped = 0  # 桶数达到上限后未保存的新类别崩溃数
+
+    def bucket_key(self, crash: ParsedCrash, signature: Optional[int]) -> Tuple[str, Tuple[str, ...]]:
+        frames = tuple(f for f in crash.frames if not f.startswith(_IGNORED_FRAME_PREFIXES))[:self.top_frames]
+        if not frames:
+            # 全部是JDK内部帧时退回到原始栈顶帧；仍然没有时用覆盖签名区分
+            frames = tuple(crash.frames[:self.top_frames]) or ((f"sig:{signature:08x}",) if signature is not None else ())
+        key = "\n".join((crash.exception_type,) + frames)
+        return hashlib.md5(key.encode("utf-8")).hexdigest()[:16], frames
+
+    def add(self, input_data: Any, error_msg: str,
+            signature: Optional[int] = None) -> Tuple[Optional[CrashBucket], bool, bool]:
+        """
+        归类一次崩溃。
+        :return: (所属的桶, 是否为新桶, 复现输入是否变小)；桶数达到上限时桶为None
+        """
+        self.total_crashes += 1
+        crash = parse_crash(error_msg, self.head_chars)
+        bucket_id, frames = self.bucket_key(crash, signature)
+        bucket = self.buckets.get(bucket_id)
+        is_new = bucket is None
+        smaller = False
+        if is_new:
+            if len(self.buckets) >= self.max_buckets:
+                self.dropped += 1
+                return None, False, False
+            bucket = self.buckets[bucket_id] = CrashBucket(
+                bucket_id, crash.exception_type, frames,
+                (f"{crash.exception_type}: {crash.message}" if crash.message else crash.exception_type)[:MAX_MESSAGE_CHARS],
+                input_data,
+            )
+        elif input_size(input_data) < input_size(bucket.reproducer):
+            bucket.reproducer = input_data
+            smaller = True
+        bucket.count += 1
+        if signature is not None and len(bucket.signatures) < MAX_BUCKET_SIGNATURES:
+            bucket.signatures.add(signature)
+        return bucket, is_new, smaller
+
+    def restore(self, data: Dict):
+        """从 CrashBucket.to_dict 的结果恢复一个桶（覆盖同ID的旧记录）"""
+        self.buckets[data["bucket"]] = CrashBucket(
+            data["bucket"], data["error_type"], tuple(data["frames"]), data["error_message"],
+            data["input"], data["count"],
+        )
+
+    def counts_state(self) -> Dict:
+        """各桶的计数（随检查点保存；错误日志只在新类别或复现输入变小时写出，计数可能落后）"""
+        return {
+            "total": self.total_crashes,
+            "dropped": self.dropped,
+            "buckets": {bucket_id: bucket.count for bucket_id, bucket in self.buckets.items()},
+        }
+
+    def restore_counts(self, state: Dict):
+        self.total_crashes = state["total"]
+        self.dropped = state["dropped"]
+        for bucket_id, count in state["buckets"].items():
+            if bucket_id in self.buckets:
+                self.buckets[bucket_id].count = count
@@ -0,0 +1,161 @@
+# fuzzer/driver.py
+# 驱动模式：供符号执行引擎调用，按请求执行Java方法并返回 ExecutionRecord
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, IO, Iterable
+
+from java_runner import JavaRunner, PersistentJavaRunner
+from common.exchange_format import ExecutionRecord
+
+
+def handle_request(java_runner, req: Dict, default_method: str, trace_encoding: str = "json") -> Dict:
+    """
+    执行单个驱动请求并构建响应。
+    请求格式：{"run_id": ..., "method": 目标方法签名(可选), "inputs": [...], "trace_encoding": json|b64(可选)}
+    trace_encoding 缺省时使用配置中的 trace_encoding；b64 为紧凑的二进制轨迹（见 ExecutionRecord.to_dict）
+    请求不是JSON对象或处理中出现异常时返回 status 为 error 的响应，不向调用方抛出
+    """
+    if not isinstance(req, dict):
+        return error_response("", "请求必须是JSON对象")
+    run_id = req.get("run_id", "")
+    try:
+        return _run_request(java_runner, req, run_id, default_method, trace_encoding)
+    except Exception as e:
+        return error_response(run_id, f"处理请求失败: {e}")
+
+
+def _run_request(java_runner, req: Dict, run_id, default_method: str, trace_encoding: str) -> Dict:
+    method = req.get("method", None)
+    inputs = req.get("inputs", [])   # 从输入中获取参数列表
+
+    # 确保 inputs 是一个列表
+    if not isinstance(inputs, list):
+        inputs = [inputs]
+
+    # 请求中的 method 即本次要执行的目标方法，缺省时使用配置中的目标方法
+    java_runner.target_method = method or default_method
+
+    t0 = time.perf_counter()
+    trace, err = java_runner.run_java_program2(input_data=inputs)
+    t_ms = int((time.perf_counter() - t0) * 1000)
+
+    status = "ok" if err is None else "error"
+
+    # 构建 ExecutionRecord 对象
+    record = ExecutionRecord(
+        method=java_runner.target_method,
+        inputs=inputs,
+        trace=trace if trace is not None else [] # 如果 trace 为 None（发生错误），则用空列表
+    )
+
+    return {
+        "run_id": run_id,
+        "status": status,
+        "error": {"message": err} if err else None,
+        "data": record.to_dict(req.get("trace_encoding", trace_encoding)), # 将 ExecutionRecord 对象转为字典
+        "time_ms": t_ms,
+    }
+
+
+def error_response(run_id, message: str) -> Dict:
+    return {
+        "run_id": run_id,
+        "status": "error",
+        "error": {"message": message}
+    }
+
+
+def invalid_json_response(run_id: str = "") -> Dict:
+    return error_response(run_id, "无效的输入JSON格式")
+
+
+def create_runner(config):
+    """按配置创建执行器（常驻JVM模式下复用同一个JVM）"""
+    runner_cls = PersistentJavaRunner if config.persistent else JavaRunner
+    return runner_cls(
+        java_class_path=config.java_class_path,
+        target_method=config.target_method,
+        config=config,
+    )
+
+
+def run_single(config, req_text: str) -> Dict:
+    """单次驱动：一个请求、一个执行器"""
+    try:
+        req = json.loads(req_text)
+    except json.JSONDecodeError:
+        return invalid_json_response()
+
+    java_runner = create_runner(config)
+    try:
+        return handle_request(java_runner, req, config.target_method, config.trace_encoding)
+    finally:
+        java_runner.close()
+
+
+def run_batch(config, lines: Iterable[str], out: IO[str], concurrency: int = 1) -> int:
+    """
+    批量驱动：逐行读取 JSONL 请求，以有限并发执行，并按完成顺序把响应逐行写回（以 run_id 区分）。
+    每个并发槽位使用独立的执行器和私有输出目录（见 FuzzerConfig.for_worker）。
+    :return: 处理的请求数
+    """
+    concurrency = max(1, concurrency)
+    runners = [create_runner(config.for_worker(worker_id)) for worker_id in range(concurrency)]
+    idle_runners = queue.Queue()
+    for runner in runners:
+        idle_runners.put(runner)
+
+    def execute(req):
+        runner = idle_runners.get()
+        try:
+            return handle_request(runner, req, config.target_method, config.trace_encoding)
+        finally:
+            idle_runners.put(runner)
+
+    write_lock = threading.Lock()
+
+    def emit(resp):
+        with write_lock:
+            out.write(json.dumps(resp, ensure_ascii=False) + "\n")
+            out.flush()
+
+    # 限制在途请求数量，避免一次性把整个输入流读入内存；响应在执行完成时立即写出，不等待后续请求
+    slots = threading.BoundedSemaphore(concurrency * 2)
+
+    def finish(future):
+        try:
+            emit(future.result())
+        finally:
+            slots.release()
+
+    handled = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            handled += 1
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError:
+                emit(invalid_json_response())
+                continue
+            slots.acquire()
+            pool.submit(execute, req).add_done_callback(finish)
+
+    if runners[0].startup_profile:
+        print(runners[0].startup_profile.summary(), file=sys.stderr)
+    for runner in runners:
+        runner.close()
+    return handled
+
+
+def open_input(path):
+    """'-' 或 None 表示stdin"""
+    if path is None or path == "-":
+        return sys.stdin
+    return open(path, "r", encoding="utf-8")
@@ -0,0 +1,214 @@
+# fuzzer/driver_daemon.py
+# 常驻驱动守护进程：在本地Unix socket上监听，按行接收与 --driver 相同格式的JSON请求
+import itertools
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from java_runner import PersistentJavaRunner
+from jvm_startup import StartupProfile
+import driver
+
+
+class ExecutorPool:
+    """
+    按目标方法分组的常驻JVM执行器池，每个方法最多 max_per_method 个执行器，按需懒启动。
+    最多同时保留 max_methods 个方法的执行器：新方法到来时关闭最久未使用且没有在途请求的方法的执行器（LRU）；
+    所有方法都有在途请求时暂时超出上限，之后的新方法再逐个淘汰。
+    """
+    def __init__(self, config, max_per_method: int = 1, max_methods: int = 16):
+        self.config = config
+        self.max_per_method = max(1, max_per_method)
+        self.max_methods = max(1, max_methods)
+        self._idle: "OrderedDict[str, queue.Queue]" = OrderedDict()  # 按最近使用排序，最久未使用的在前
+        self._created: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}  # 在途（已获取或正在等待执行器）的请求数，非0时不淘汰
+        self._runners: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.evicted = 0
+
+    def acquire(self, method: str):
+        evicted = []
+        with self._lock:
+            idle = self._idle.get(method)
+            if idle is None:
+                evicted = self._evict()
+                idle = self._idle[method] = queue.Queue()
+                self._created[method] = 0
+                self._in_use[method] = 0
+                self._runners[method] = []
+            self._idle.move_to_end(method)
+            self._in_use[method] += 1
+            runner = None
+            if idle.empty() and self._created[method] < self.max_per_method:
+                # 每个执行器使用独立的私有输出目录
+                try:
+                    runner = PersistentJavaRunner(
+                        java_class_path=self.config.java_class_path,
+                        target_method=method,
+                        config=self.config.for_worker(next(self._ids)),
+                    )
+                except Exception:
+                    self._in_use[method] -= 1
+                    raise
+                self._created[method] += 1
+                self._runners[method].append(runner)
+        for old in evicted:
+            old.close()
+        return runner if runner is not None else idle.get()
+
+    def release(self, method: str, runner):
+        with self._lock:
+            self._in_use[method] -= 1
+            self._idle[method].put(runner)
+
+    def _evict(self) -> List:
+        """（持锁调用）为新方法腾出位置：移除最久未使用的空闲方法，返回需要关闭的执行器"""
+        evicted = []
+        for method in list(self._idle):
+            if len(self._idle) < self.max_methods:
+                break
+            if self._in_use[method]:
+                continue
+            evicted += self._runners.pop(method)
+            del self._idle[method], self._created[method], self._in_use[method]
+            self.evicted += 1
+        return evicted
+
+    def describe(self) -> Dict:
+        with self._lock:
+            return {
+                method: {"executors": count, "idle": self._idle[method].qsize()}
+                for method, count in self._created.items()
+            }
+
+    def close(self):
+        with self._lock:
+            runners = [runner for method_runners in self._runners.values() for runner in method_runners]
+        for runner in runners:
+            runner.close()
+
+
+class DriverStats:
+    """吞吐量计数器（线程安全）"""
+    def __init__(self):
+        self.start_time = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_time_ms = 0
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, resp: Dict):
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            if resp.get("status") != "ok":
+                self.errors += 1
+            self.total_time_ms += resp.get("time_ms", 0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            uptime = time.time() - self.start_time
+            return {
+                "uptime_s": round(uptime, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "requests_per_sec": round(self.requests / uptime, 3) if uptime > 0 else 0.0,
+                "avg_time_ms": round(self.total_time_ms / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """每个客户端连接一个线程；一行一个请求，一行一个响应"""
+    def handle(self):
+        daemon = self.server.driver_daemon
+        for raw in self.rfile:
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError:
+                resp = driver.invalid_json_response()
+            else:
+                resp = daemon.dispatch(req)
+            self.wfile.write((json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class DriverDaemon:
+    """
+    驱动守护进程：执行器按目标方法保持常驻（JVM已预热），多个客户端可并发请求。
+    除执行请求外，还支持 {"op": "health"} 与 {"op": "stats"} 两种查询。
+    """
+    def __init__(self, config, socket_path: str, executors_per_method: int = 1, max_methods: int = 16):
+        self.config = config
+        self.socket_path = socket_path
+        self.pool = ExecutorPool(config, executors_per_method, max_methods)
+        self.stats = DriverStats()
+        self.startup_profile = StartupProfile.for_config(config) if config.fast_startup else None
+        self.server = None
+
+    def dispatch(self, req: Dict) -> Dict:
+        if not isinstance(req, dict):
+            return driver.error_response("", "请求必须是JSON对象")
+        op = req.get("op", "run")
+        if op == "health":
+            return {"status": "ok", "executors": self.pool.describe(), "evicted_methods": self.pool.evicted,
+                    **self.stats.snapshot()}
+        if op == "stats":
+            resp = {"status": "ok", **self.stats.snapshot()}
+            if self.startup_profile:
+                resp["startup"] = self.startup_profile.report()
+            return resp
+
+        method = req.get("method") or self.config.target_method
+        if not isinstance(method, str):
+            return driver.error_response(req.get("run_id", ""), "method 必须是字符串")
+        self.stats.begin()
+        resp = {"run_id": req.get("run_id", ""), "status": "error"}
+        try:
+            runner = self.pool.acquire(method)
+            try:
+                resp = driver.handle_request(runner, req, method, self.config.trace_encoding)
+            finally:
+                self.pool.release(method, runner)
+        except Exception as e:
+            resp = driver.error_response(req.get("run_id", ""), f"处理请求失败: {e}")
+        finally:
+            self.stats.end(resp)
+        return resp
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, _RequestHandler)
+        self.server.daemon_threads = True
+        self.server.driver_daemon = self
+        print(f"驱动守护进程已启动：{self.socket_path}")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.server_close()
+            self.server = None
+        self.pool.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
@@ -1,41 +1,72 @@
 # fuzzer/error_detector.py（修改后）
-from typing import Optional, List, Dict, Set
-import hashlib
+from typing import Any, Optional, List, Dict
+import json
+import os
+from crash_triage import CrashTriage
 
 class ErrorDetector:
-    def __init__(self):
-        self.errors: List[Dict] = []
-        self.seen_errors: Set[str] = set()  # 用哈希去重，避免重复记录同一错误
+    """
+    错误记录：崩溃交给 CrashTriage 按异常类型与栈顶位置分桶，
+    同一缺陷的不同输入/不同异常信息只算一个错误，每类只保留计数与最小复现输入。
+    """
+    def __init__(self, journal_path: Optional[str] = None):
+        self.triage = CrashTriage()
+        # 错误日志（JSONL，只追加）：出现新的崩溃类别或更小的复现输入时写出一行，测试活动重启后据此恢复
+        self.journal_path = journal_path
+        self.last_bucket = None  # 最近一次 detect 归入的崩溃类别
 
-    def detect(self, input_data: int, error_msg: Optional[str]) -> bool:
+    def detect(self, input_data: Any, error_msg: Optional[str], signature: Optional[int] = None) -> bool:
+        """
+        :param signature: 该次执行的覆盖签名（栈信息缺失时用于区分崩溃类别）
+        :return: 是否为新的崩溃类别
+        """
         if not error_msg:
             return False
+        bucket, is_new, smaller = self.triage.add(input_data, error_msg, signature)
+        self.last_bucket = bucket
+        if is_new or smaller:
+            self._journal(bucket)
+        return is_new
 
-        # 生成错误唯一标识（基于错误信息的哈希，避免重复）
-        error_hash = hashlib.md5(error_msg.encode("utf-8")).hexdigest()
-        if error_hash in self.seen_errors:
-            return False
+    def set_reproducer(self, bucket, input_data: Any):
+        """用精简后的输入替换崩溃类别的复现输入"""
+        if bucket.reproducer != input_data:
+            bucket.reproducer = input_data
+            self._journal(bucket)
+
+    def _journal(self, bucket):
+        if self.journal_path:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(bucket.to_dict(), ensure_ascii=False) + "\n")
 
-        # 记录错误详情（包含Java输入和异常信息）
-        self.seen_errors.add(error_hash)
-        self.errors.append({
-            "input": input_data,
-            "error_message": error_msg,
-            "error_type": self._extract_error_type(error_msg)  # 提取错误类型（如AssertionError）
-        })
-        return True
-
-    def _extract_error_type(self, error_msg: str) -> str:
-        """从Java异常信息中提取错误类型（如"java.lang.AssertionError"）"""
-        if "Exception" in error_msg or "Error" in error_msg:
-            # Java异常格式通常是"Exception in thread "main" 类名: 消息"
-            for part in error_msg.split(":"):
-                if part.strip().startswith(("java.lang.", "com.")):
-                    return part.strip()
-        return "UnknownError"
+    def load_journal(self, to_input=lambda x: x) -> int:
+        """
+        从错误日志恢复崩溃类别（同一类别以最后一行为准）。
+        :param to_input: 把JSON读回的输入还原为语料库中的表示（列表 -> 元组）
+        :return: 恢复的错误数
+        """
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    error = json.loads(line)
+                except ValueError:
+                    continue  # 崩溃时最后一行可能只写了一半
+                error["input"] = to_input(error["input"])
+                self.triage.restore(error)
+        return self.error_count()
 
     def get_errors(self) -> List[Dict]:
-        return self.errors
+        """每个崩溃类别一条：最小复现输入、异常类型、异常信息、栈顶帧与出现次数"""
+        return [bucket.to_dict() for bucket in self.triage.buckets.values()]
 
     def error_count(self) -> int:
-        return len(self.errors)
\ No newline at end of file
+        return len(self.triage.buckets)
+
+    def crash_count(self) -> int:
+        """崩溃总次数（含同类重复）"""
+        return self.triage.total_crashes
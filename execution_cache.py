@@ -0,0 +1,100 @@
+# fuzzer/execution_cache.py
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+
+@dataclass
+class CachedResult:
+    """一次执行的结果摘要：分桶后位图的覆盖签名 + 错误信息"""
+    signature: int
+    error_msg: Optional[str]
+
+
+class ExecutionCache:
+    """
+    有界的执行结果缓存，键为 (目标方法, 输入)。
+    变异经常重新生成已经执行过的值（两次取反、先乘2再除2、偏移来回抵消等），
+    命中缓存时直接返回上次的结果，省去一次JVM执行。
+    采用LRU淘汰，同时限制条目数和估算的内存占用。
+    """
+    def __init__(self, max_entries: int = 100000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Any], CachedResult]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(method: str, input_data: Any) -> Tuple[str, Any]:
+        if isinstance(input_data, list):
+            input_data = tuple(input_data)
+        return method, input_data
+
+    @staticmethod
+    def _entry_size(key, result: CachedResult) -> int:
+        """估算一个条目的内存占用"""
+        size = sys.getsizeof(key) + sys.getsizeof(key[1]) + sys.getsizeof(result) + sys.getsizeof(result.signature)
+        if result.error_msg:
+            size += sys.getsizeof(result.error_msg)
+        return size
+
+    def get(self, method: str, input_data: Any) -> Optional[CachedResult]:
+        if not self.max_entries:
+            return None
+        key = self._key(method, input_data)
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def peek(self, method: str, input_data: Any) -> Optional[CachedResult]:
+        """查询缓存但不计入命中率（精简等辅助执行使用，不影响模糊测试的命中率统计）"""
+        if not self.max_entries:
+            return None
+        key = self._key(method, input_data)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def contains(self, method: str, input_data: Any) -> bool:
+        """是否已缓存该输入（不计入命中率，也不影响LRU顺序）"""
+        return self._key(method, input_data) in self._entries
+
+    def put(self, method: str, input_data: Any, signature: int, error_msg: Optional[str]):
+        if not self.max_entries:
+            return
+        key = self._key(method, input_data)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        result = CachedResult(signature, error_msg)
+        self._entries[key] = result
+        self._bytes += self._entry_size(key, result)
+
+        # 超出条目数或内存上限时淘汰最久未使用的条目
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            old_key, old_result = self._entries.popitem(last=False)
+            self._bytes -= self._entry_size(old_key, old_result)
+            self.evictions += 1
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+        }
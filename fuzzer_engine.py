@@ -1,34 +1,290 @@
 # fuzzer/fuzzer_engine.py（修改后）
+import asyncio
+import queue
+import os
+import random
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from config import FuzzerConfig
 from coverage_tracker import CoverageTracker
 from input_generator import InputGenerator
-from java_runner import JavaRunner
+from class_constants import harvest_constants
+from java_runner import JavaRunner, PersistentJavaRunner
+from async_runner import AsyncJavaRunner
 from corpus_manager import CorpusManager
 from error_detector import ErrorDetector
+from execution_cache import ExecutionCache
+from fuzzer_stats import StageProfiler, FuzzerStats
+from timeout_calibrator import TimeoutCalibrator
+from hang_detector import HangDetector
+from block_map import BlockMap, collision_report, format_report
+from source_coverage import SourceCoverage
+from campaign_store import CampaignStore, to_hashable
+from corpus_sync import CorpusSync
+from minimizer import InputMinimizer
+from concolic_handoff import ConcolicHandoff
 
 class FuzzerEngine:
-    def __init__(self, config: FuzzerConfig):
+    def __init__(self, config: FuzzerConfig, java_runner=None):
+        """
+        :param java_runner: 多目标模式下各目标共用的执行器（切换目标前调用 activate）；缺省时新建
+        """
         self.config = config
         # 初始化Java程序调用器（对接插桩后的Java程序）
-        self.java_runner = JavaRunner(
+        # 常驻JVM模式下使用 PersistentJavaRunner，接口与 JavaRunner 一致
+        runner_cls = PersistentJavaRunner if config.persistent else JavaRunner
+        self.java_runner = java_runner or runner_cls(
             java_class_path=config.java_class_path,
             target_method=config.target_method,
             config=self.config # 将config对象传递给JavaRunner
         )
+        # 多目标模式下执行器被各目标共用，其超时次数按目标激活期间分段计入（见 activate/deactivate）
+        self.shared_runner = java_runner is not None
+        self._shared_timeouts = 0
+        self._timeouts_base = None
         # 初始化其他核心组件
         self.coverage_tracker = CoverageTracker(config=self.config)
-        self.input_generator = InputGenerator(input_type=int)
-        self.corpus_manager = CorpusManager()
-        self.error_detector = ErrorDetector()
+        self.input_generator = InputGenerator.for_method(config.target_method)
+        if config.use_dictionary:
+            # 从目标类文件收集常量作为变异字典（按类文件哈希缓存）
+            self.dictionary = harvest_constants(config.java_class_path, config.target_method, config.dictionary_cache_dir)
+            self.input_generator.set_dictionary(self.dictionary.ints + self.dictionary.longs, self.dictionary.strings)
+        self.corpus_manager = CorpusManager(schedule=config.power_schedule)
+        # 测试活动持久化：语料库条目与错误在产生时写入 output_dir，定期写出检查点
+        self.store = CampaignStore(config.output_dir, config.checkpoint_interval)
+        self.error_detector = ErrorDetector(journal_path=self.store.errors_path)
+        # 多实例同步：main 实例做确定性阶段，secondary 实例只做随机变异，通过 sync_dir 交换新条目
+        self.sync = None
+        if config.sync_dir:
+            self.sync = CorpusSync(config.sync_dir, config.sync_id, config.sync_interval)
+            if config.sync_role == "secondary":
+                config.deterministic = False
+        # 执行结果缓存：重复的变异体无需再次执行JVM
+        self.execution_cache = ExecutionCache(
+            max_entries=config.exec_cache_entries,
+            max_bytes=config.exec_cache_mb * 1024 * 1024
+        )
+        self.total_execs = 0  # 总执行数（包含命中缓存的执行）
+        self.det_execs = 0    # 确定性阶段产生的变异体数
+
+        # 自适应超时与挂起归类：config.timeout 作为超时上限，也用于复核疑似挂起
+        self.max_timeout = config.timeout
+        self.timeout_calibrator = TimeoutCalibrator(max_timeout=config.timeout, min_timeout=config.min_timeout)
+        self.hang_detector = HangDetector(config.coverage_map_size)
+
+        # 块映射索引、源码级覆盖率与位图冲突情况（在 initialize 中加载块映射后建立）
+        self.block_map = None
+        self.source_coverage = None
+        self.map_report = None
+
+        # 并行模式：每个worker一个独立的执行器（私有的shm/map/perEdge文件）
+        # 异步后端（executor="async"）：每个并发槽位一个私有目录，进程由asyncio启动
+        self.worker_runners = []
+        self.async_runner = None
+        if config.executor == "async":
+            self.async_runner = AsyncJavaRunner(
+                [
+                    JavaRunner(
+                        java_class_path=config.java_class_path,
+                        target_method=config.target_method,
+                        config=config.for_worker(worker_id)
+                    )
+                    for worker_id in range(max(1, config.workers))
+                ],
+                timeout=config.timeout,
+                verify_timeout=config.timeout
+            )
+        elif config.workers > 1:
+            self.worker_runners = [
+                runner_cls(
+                    java_class_path=config.java_class_path,
+                    target_method=config.target_method,
+                    config=config.for_worker(worker_id)
+                )
+                for worker_id in range(config.workers)
+            ]
+
+        # 遥测：各组件共用一个分阶段计时器，定期写出 fuzzer_stats / plot_data
+        # 模糊测试只使用覆盖率位图，执行器不需要解析执行轨迹
+        self.profiler = StageProfiler()
+        self.coverage_tracker.profiler = self.profiler
+        for runner in self._all_runners():
+            runner.profiler = self.profiler
+            runner.collect_trace = False
+        self.stats = FuzzerStats(config.output_dir, config.stats_interval)
+
+        # 覆盖率停滞时与符号执行引擎交接（导出与导入都在主线程中用主执行器执行）
+        self.handoff = None
+        if config.handoff_dir:
+            self.handoff = ConcolicHandoff(config.handoff_dir, config.target_method, config.plateau_window,
+                                           config.handoff_batch, config.trace_encoding)
+
+        # 新崩溃类别的复现输入在主线程中用主执行器精简（保持同一崩溃类别），结果复用执行结果缓存
+        self.minimizer = None
+        if config.minimize_crashes:
+            self.minimizer = InputMinimizer(
+                self.java_runner, self.coverage_tracker, self.input_generator.params, config.target_method,
+                execution_cache=self.execution_cache, triage=self.error_detector.triage,
+                max_execs=config.minimize_execs,
+            )
 
     def initialize(self):
-        """初始化：生成初始种子并添加到语料库"""
+        """初始化：生成初始种子并添加到语料库（--resume 且存在检查点时改为从检查点恢复）"""
+        if self.config.resume:
+            if self.store.has_checkpoint():
+                self._resume()
+                return
+            print(f"警告：{self.store.checkpoint_path} 不存在，开始新的测试活动")
+        self.store.reset()
+        self.stats.reset()
         seeds = self.input_generator.generate_seeds(self.config.seed_count)
         for seed in seeds:
             self.corpus_manager.add(seed)
         print(f"初始化完成：生成 {len(seeds)} 个初始种子")
         print(f"Java目标方法：{self.config.target_method}")
         print(f"Java类路径：{self.config.java_class_path}")
+        if self.config.use_dictionary:
+            print(f"变异字典：整数常量 {len(self.dictionary.ints) + len(self.dictionary.longs)} 个，"
+                  f"字符串常量 {len(self.dictionary.strings)} 个")
+        # 工作目录中残留的块映射可能属于其他目标，本次测试活动重新写出（多目标模式已预先给出块映射）
+        if self.block_map is None and os.path.exists(self.config.map_output_path):
+            os.remove(self.config.map_output_path)
+        self._prepare_startup()
+        if self.config.adaptive_timeout:
+            self.calibrate()
+        self._load_block_map()
+        # 初始种子在校准之后写出，带上执行得到的元数据
+        for index, seed in enumerate(self.corpus_manager.entries):
+            self.store.append_entry(index, seed)
+        self.store.checkpoint(self)
+        if self.sync:
+            self.sync.sync(self)
+
+    def _resume(self):
+        """
+        从 output_dir 恢复测试活动：重新载入语料库条目、错误日志与检查点中的全局位图、调度器和随机数状态。
+        覆盖率直接取自检查点，不重新执行语料库，也不重新校准超时。
+        """
+        state = self.store.load_checkpoint()
+        if state["map_size"] != self.config.coverage_map_size:
+            raise ValueError(f"检查点的位图大小为 {state['map_size']}，与当前配置 "
+                             f"{self.config.coverage_map_size} 不一致，无法恢复")
+        if state["target_method"] != self.config.target_method:
+            raise ValueError(f"检查点的目标方法为 {state['target_method']}，与当前配置 "
+                             f"{self.config.target_method} 不一致，无法恢复")
+        entries = self.store.load_entries()
+        for entry in entries:
+            self.corpus_manager.add(
+                entry["input"],
+                exec_time_ms=entry["exec_time_ms"],
+                bitmap_size=entry["bitmap_size"],
+                depth=entry["depth"],
+                signature=entry["signature"],
+                edges=entry["edges"],
+            )
+        self.corpus_manager.restore_scheduler_state(state["scheduler"])
+
+        tracker = self.coverage_tracker
+        tracker.global_coverage_map[:] = state["global_map"]
+        tracker.virgin_bits = state["virgin_bits"]
+        tracker.covered_edge_count = state["covered_edge_count"]
+        tracker.covered_blocks = set(state.get("covered_blocks", ()))  # 旧检查点没有命中块
+        # 最后一次检查点之后才写出的条目：其覆盖不在检查点的位图中，补记进去，避免恢复后被当作新覆盖重复入队
+        tracker.merge_edges(edge for entry in entries if entry["id"] >= state["queue_len"] for edge in entry["edges"])
+        self.hang_detector.hangs = state["hangs"]
+        self.hang_detector.virgin_bits = state["hang_virgin_bits"]
+        self.hang_detector.suspected, self.hang_detector.confirmed, self.hang_detector.slow_inputs = state["hang_counts"]
+        self.error_detector.load_journal(to_hashable)
+        if "crash_counts" in state:
+            self.error_detector.triage.restore_counts(state["crash_counts"])
+        self.total_execs = state["total_execs"]
+        self.det_execs = state["det_execs"]
+        self.stats.resume(state.get("start_time", state["time"]), self.total_execs)  # 旧检查点没有开始时间
+
+        random.setstate(state["rng"])
+        self.input_generator.random.setstate(state["mutator_rng"])
+        if self.input_generator.np_random is not None and state["np_rng"] is not None:
+            self.input_generator.np_random.bit_generator.state = state["np_rng"]
+        self.timeout_calibrator.timeout = min(state["timeout"], self.max_timeout)
+        self._apply_timeout(self.timeout_calibrator.timeout)
+
+        print(f"从检查点恢复测试活动：语料库 {self.corpus_manager.size()} 个条目，"
+              f"覆盖分支 {tracker.covered_edge_count} 个，错误 {self.error_detector.error_count()} 个，"
+              f"已执行 {self.total_execs} 次")
+        print(f"Java目标方法：{self.config.target_method}")
+        self._prepare_startup()
+        self._load_block_map()
+        if self.sync:
+            self.sync.sync(self)
+
+    def _prepare_startup(self):
+        """快速启动：在校准与模糊测试之前生成AppCDS归档，训练与测量运行不计入任何执行的耗时"""
+        if self.java_runner.startup_profile and self.corpus_manager.entries:
+            self.java_runner.prepare_startup(self.corpus_manager.entries[0].input)
+            print(self.java_runner.startup_profile.summary())
+
+    def _load_block_map(self):
+        """
+        读取本次测试活动写出的块映射并建立索引，之后所有执行器不再写块映射。
+        校准阶段已执行过种子时直接读取，否则先执行第一个种子。
+        多目标模式下块映射由测试活动统一探测后预先给出，不读取文件。
+        """
+        if self.block_map is None:
+            if not os.path.exists(self.config.map_output_path) and self.corpus_manager.entries:
+                seed = self.corpus_manager.entries[0]
+                _, error_msg = self.coverage_tracker.track_execution2(self.java_runner, seed.input)
+                self.total_execs += 1
+                if error_msg:
+                    self.error_detector.detect(seed.input, error_msg, self.coverage_tracker.last_signature())
+            if not os.path.exists(self.config.map_output_path):
+                print(f"警告：未找到插桩块映射 {self.config.map_output_path}，不生成源码级覆盖率报告")
+                return
+            self.block_map = BlockMap.load(self.config.map_output_path)
+        elif not self.block_map.block_count():
+            print(f"警告：块映射中没有 {self.config.target_method} 所在类的插桩块，不生成源码级覆盖率报告")
+            return
+
+        self.map_report = collision_report(self.block_map, self.config.coverage_map_size)
+        self.source_coverage = SourceCoverage(self.block_map)
+        # 加载之前（校准阶段）已命中的块
+        self.source_coverage.update(self.coverage_tracker.covered_blocks)
+        for runner in self._all_runners():
+            runner.write_block_map = False
+
+    def calibrate(self):
+        """
+        校准阶段：执行前若干个种子，记录其覆盖率与执行耗时，据此确定本目标的超时。
+        种子的覆盖率同时合并进全局位图，元数据用于能量调度。
+        """
+        exec_times_s = []
+        for seed in self.corpus_manager.entries[:self.config.calibration_runs]:
+            t0 = time.perf_counter()
+            has_new_coverage, error_msg = self.coverage_tracker.track_execution2(self.java_runner, seed.input)
+            exec_time_s = time.perf_counter() - t0
+            self.total_execs += 1
+            if error_msg:
+                self.error_detector.detect(seed.input, error_msg, self.coverage_tracker.last_signature())
+            if self.java_runner.last_timed_out:
+                continue
+            exec_times_s.append(exec_time_s)
+            self.corpus_manager.update_seed(
+                seed,
+                exec_time_ms=exec_time_s * 1000,
+                bitmap_size=self.coverage_tracker.last_bitmap_size(),
+                signature=self.coverage_tracker.last_signature(),
+                edges=self.coverage_tracker.last_edges(),
+            )
+        self._apply_timeout(self.timeout_calibrator.calibrate(exec_times_s))
+        print(f"超时校准完成：{len(exec_times_s)} 个种子，超时设为 {self.config.timeout:.3f} 秒")
+
+    def _apply_timeout(self, timeout: float):
+        """把新的超时同步到所有执行器（并行执行器使用各自的配置副本）"""
+        self.config.timeout = timeout
+        for runner in self._all_runners():
+            runner.config.timeout = timeout
+        if self.async_runner:
+            self.async_runner.timeout = timeout
 
     # def run(self):
     #     """启动模糊测试（核心调度逻辑）"""
@@ -65,32 +321,177 @@ class FuzzerEngine:
 
     def run2(self):
         """启动模糊测试（核心调度逻辑）"""
+        if self.async_runner:
+            self.run_async()
+            return
+        if self.worker_runners:
+            self.run_parallel()
+            return
         self.initialize()
         iteration = 0
         while iteration < self.config.max_iterations and self.corpus_manager.size() > 0:
             iteration += 1
-            # 1. 从语料库随机选择一个有效输入
-            original_input = self.corpus_manager.get_random_input()
-
-            # 2. 对输入进行变异（生成多个变异体）
-            for _ in range(self.config.mutate_count):
-                new_input = self.input_generator.mutate(original_input)
+            self._fuzz_iteration()
 
-                # 3. 执行Java程序，跟踪覆盖率和异常
-                has_new_coverage, error_msg = self.coverage_tracker.track_execution2(
-                    self.java_runner, new_input
+            # 打印进度（每1000次迭代）
+            if iteration % 1000 == 0 and self.config.verbose >= 1:
+                coverage_stats = self.coverage_tracker.get_coverage_stats2()
+                print(
+                    f"迭代 {iteration:5d} | "
+                    f"语料库大小 {self.corpus_manager.size():4d} | "
+                    f"覆盖分支数 {coverage_stats['total_covered_branches']:4d} | "
+                    f"错误数 {self.error_detector.error_count()}"
                 )
+        self.java_runner.close()
+        self.finalize()
+        # 输出测试总结
+        self._print_summary2()
 
-                # 4. 检测并记录错误
-                if error_msg:
-                    self.error_detector.detect(new_input, error_msg)
+    def _fuzz_iteration(self):
+        """串行模式的一次迭代：选一个种子，按其能量变异并逐个执行"""
+        self._maintain()
+        # 1. 按能量调度策略从语料库选择一个种子，并计算本轮变异次数（能量）
+        seed = self.corpus_manager.select()
+        energy = self.corpus_manager.calculate_energy(seed, self.config.mutate_count)
+
+        # 2. 对输入进行变异（新条目先走确定性阶段，再按能量批量生成随机变异体）
+        for new_input in self._seed_mutants(seed, energy):
+            if self._replay_cached(seed, new_input):
+                continue
+
+            # 3. 执行Java程序，跟踪覆盖率和异常
+            t0 = time.perf_counter()
+            has_new_coverage, error_msg = self.coverage_tracker.track_execution2(
+                self.java_runner, new_input
+            )
+            exec_time_ms = (time.perf_counter() - t0) * 1000
+
+            # 4. 记录错误，若有新覆盖率，将输入加入语料库
+            self._process_result(seed, new_input, has_new_coverage, error_msg, exec_time_ms,
+                                 self.java_runner.last_timed_out)
+
+    def activate(self):
+        """多目标模式：切换到本目标之前调用，让共用的执行器指向本目标方法、使用本目标的超时与计时器"""
+        self.java_runner.target_method = self.config.target_method
+        self.java_runner.profiler = self.profiler
+        self._apply_timeout(self.config.timeout)
+        self._timeouts_base = self.java_runner.timeout_count
+
+    def deactivate(self):
+        """多目标模式：切换到其他目标之前调用，把本目标期间共用执行器上的超时计入本目标"""
+        self._shared_timeouts += self.java_runner.timeout_count - self._timeouts_base
+        self._timeouts_base = None
 
-                # 5. 若有新覆盖率，将输入加入语料库
-                if has_new_coverage:
-                    self.corpus_manager.add(new_input)
+    def run_slice(self, deadline: float) -> int:
+        """
+        多目标模式：持续迭代直到 deadline（time.time() 时间戳）。
+        一次迭代不会被打断（确定性阶段可能较长），因此实际耗时可能略超出。
+        :return: 本次执行的迭代数
+        """
+        iterations = 0
+        while time.time() < deadline and self.corpus_manager.size() > 0:
+            self._fuzz_iteration()
+            iterations += 1
+        return iterations
 
+    def finalize(self):
+        """写出最终的统计、检查点与同步导出（各运行模式结束时调用）"""
+        self.stats.write(self)
+        self.store.checkpoint(self)
+        if self.sync:
+            self.sync.export(self)
+
+    def run_parallel(self):
+        """
+        并行模糊测试：N个执行器同时运行变异体。
+        执行（及读取私有位图）在worker线程中完成；位图合并、错误记录、语料库更新只在主线程进行，
+        因此 global_coverage_map 与语料库无需加锁。
+        """
+        self.initialize()
+        idle_runners = queue.Queue()
+        for runner in self.worker_runners:
+            # 源码级覆盖率需要命中的块：worker线程随执行一起读取 per-edge 文件（执行器归还后会被覆盖）
+            runner.collect_trace = self.source_coverage is not None
+            idle_runners.put(runner)
+
+        def execute(seed, new_input):
+            runner = idle_runners.get()
+            try:
+                t0 = time.perf_counter()
+                blocks, error_msg = runner.run_java_program2(new_input)
+                exec_time_ms = (time.perf_counter() - t0) * 1000
+                # 执行器归还后位图会被下一次执行清零，这里必须拷贝一份交给主线程
+                run_map = bytes(self.coverage_tracker.read_run_map(runner))
+                timed_out = runner.last_timed_out
+                hang = None
+                if timed_out:
+                    # 挂起复核在本worker线程中用同一个执行器完成，不阻塞主线程
+                    confirmed = HangDetector.rerun(runner, new_input, self.max_timeout)
+                    hang = (confirmed, bytes(self.coverage_tracker.read_run_map(runner)) if confirmed else None)
+                return seed, new_input, run_map, blocks, error_msg, exec_time_ms, timed_out, hang
+            finally:
+                idle_runners.put(runner)
+
+        pending = set()
+        source = self._mutant_stream()
+        with ThreadPoolExecutor(max_workers=self.config.workers) as pool:
+            while True:
+                # 保持每个执行器都有活干
+                while len(pending) < self.config.workers:
+                    job = next(source, None)
+                    if job is None:
+                        break
+                    pending.add(pool.submit(execute, *job))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    seed, new_input, current_run_map, blocks, error_msg, exec_time_ms, timed_out, hang = future.result()
+                    has_new_coverage = self.coverage_tracker.evaluate_run_map(current_run_map, blocks)
+                    error_msg = self.coverage_tracker.filter_error(error_msg)
+                    self._process_result(seed, new_input, has_new_coverage, error_msg, exec_time_ms, timed_out,
+                                         hang=hang)
+
+        for runner in self.worker_runners:
+            runner.close()
+        self.finalize()
+        # 输出测试总结
+        self._print_summary2()
+
+    def _seed_mutants(self, seed, energy):
+        """
+        一个种子本轮的变异体：尚未做过确定性阶段的条目先遍历确定性变异体，
+        全部产出（执行）后标记完成，然后是按能量批量生成的随机变异体（havoc）。
+        """
+        if self.config.deterministic and not seed.det_done:
+            with self.profiler.stage("mutation"):
+                mutants = self.input_generator.deterministic_mutants(seed.input)
+            for new_input in mutants:
+                self.det_execs += 1
+                yield new_input
+            self.corpus_manager.mark_det_done(seed)
+        with self.profiler.stage("mutation"):
+            mutants = self.input_generator.mutate_batch(seed.input, energy)
+        yield from mutants
+
+    def _mutant_stream(self, maintain: bool = True):
+        """
+        按串行模式相同的节奏产生变异体：每次迭代选一个种子，按其能量变异若干次。
+        :param maintain: 是否在每次迭代前进行同步与交接；异步模式由事件循环在没有在途执行时自行调用 _maintain
+        """
+        iteration = 0
+        while iteration < self.config.max_iterations and self.corpus_manager.size() > 0:
+            iteration += 1
+            if maintain:
+                self._maintain()
+            seed = self.corpus_manager.select()
+            energy = self.corpus_manager.calculate_energy(seed, self.config.mutate_count)
+            for new_input in self._seed_mutants(seed, energy):
+                if not self._replay_cached(seed, new_input):
+                    yield seed, new_input
             # 打印进度（每1000次迭代）
-            if iteration % 1000 == 0:
+            if iteration % 1000 == 0 and self.config.verbose >= 1:
                 coverage_stats = self.coverage_tracker.get_coverage_stats2()
                 print(
                     f"迭代 {iteration:5d} | "
@@ -98,16 +499,219 @@ class FuzzerEngine:
                     f"覆盖分支数 {coverage_stats['total_covered_branches']:4d} | "
                     f"错误数 {self.error_detector.error_count()}"
                 )
+
+    def _maintain(self):
+        """同步与交接：在主线程中用主执行器阻塞执行（不占用worker执行器）"""
+        if self.sync:
+            self.sync.maybe_sync(self)
+        if self.handoff:
+            self.handoff.maybe_handoff(self)
+
+    def _maintenance_due(self) -> bool:
+        return bool(self.sync and self.sync.due() or self.handoff and self.handoff.due())
+
+    def run_async(self):
+        """
+        异步模糊测试：由 AsyncJavaRunner 保持最多N个JVM进程同时在途，
+        结果在完成时立即交回事件循环（主线程）处理，覆盖率合并与语料库更新仍是单线程的。
+        """
+        self.initialize()
+        for runner in self.async_runner.slots:
+            # 源码级覆盖率需要命中的块：随执行一起读取 per-edge 文件（作为执行轨迹返回）
+            runner.collect_trace = self.source_coverage is not None
+        asyncio.run(self._run_async_loop())
+        self.async_runner.close()
+        self.finalize()
         # 输出测试总结
         self._print_summary2()
 
+    async def _run_async_loop(self):
+        pending = set()
+        seeds = {}
+        source = self._mutant_stream(maintain=False)
+        while True:
+            if self._maintenance_due():
+                # 同步与交接会阻塞事件循环：先处理完所有在途执行，避免其计时与超时被拖长
+                while pending:
+                    pending = await self._process_async_done(pending, seeds)
+                self._maintain()
+            # 保持在途执行数达到并发上限
+            while len(pending) < self.async_runner.concurrency:
+                job = next(source, None)
+                if job is None:
+                    break
+                seed, new_input = job
+                task = asyncio.ensure_future(self.async_runner.run(new_input))
+                seeds[task] = seed
+                pending.add(task)
+            if not pending:
+                break
+            pending = await self._process_async_done(pending, seeds)
+
+    async def _process_async_done(self, pending, seeds):
+        """等待至少一个在途执行完成并处理其结果，返回仍在途的任务"""
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            seed = seeds.pop(task)
+            new_input, current_run_map, blocks, error_msg, exec_time_ms, timed_out, hang = task.result()
+            has_new_coverage = self.coverage_tracker.evaluate_run_map(current_run_map, blocks)
+            error_msg = self.coverage_tracker.filter_error(error_msg)
+            self._process_result(seed, new_input, has_new_coverage, error_msg, exec_time_ms, timed_out,
+                                 hang=hang)
+        return pending
+
+    def _process_result(self, seed, new_input, has_new_coverage, error_msg, exec_time_ms, timed_out=False,
+                        depth=None, hang=None):
+        """
+        处理一次执行结果（只在主线程调用，紧跟在覆盖率评估之后）：
+        记录错误、更新路径命中统计、若有新覆盖率则连同元数据加入语料库。
+        :param depth: 加入语料库时的发现深度，缺省为父种子深度+1
+        :param hang: 超时输入在执行器上已完成的复核结果 (是否确认挂起, 位图)，缺省时在主执行器上复核
+        """
+        with self.profiler.stage("corpus_update"):
+            self._update_corpus(seed, new_input, has_new_coverage, error_msg, exec_time_ms,
+                                seed.depth + 1 if depth is None else depth)
+        if timed_out:
+            self._handle_timeout(new_input, hang)
+        elif self.config.adaptive_timeout and self.timeout_calibrator.observe(exec_time_ms / 1000):
+            self._apply_timeout(self.timeout_calibrator.timeout)
+        self.stats.maybe_write(self)
+        self.store.maybe_checkpoint(self)
+
+    def _handle_timeout(self, new_input, hang=None):
+        """超时的输入以更长的超时复核，确认挂起后按覆盖率去重记录"""
+        if hang is None:
+            # 串行模式与外部来源的输入：在主执行器上复核
+            confirmed = self.hang_detector.verify(self.java_runner, new_input, self.max_timeout)
+            hang_map = self.coverage_tracker.read_run_map(self.java_runner)
+        else:
+            # 并行/异步模式：复核已在产生该超时的执行器上完成
+            confirmed, hang_map = hang
+            self.hang_detector.note_verified(confirmed)
+        if not confirmed:
+            return
+        classified = self.coverage_tracker.classify(hang_map)
+        signature = zlib.crc32(classified)
+        if self.hang_detector.record(new_input, classified, signature, self.max_timeout) and self.config.verbose >= 1:
+            print(f"发现新的挂起输入：{new_input}")
+
+    def import_entry(self, entry) -> bool:
+        """
+        执行一次其他实例导出的条目，按本地位图评估并合并（与本地变异体走相同的处理流程）。
+        :return: 是否带来新覆盖并加入了本地语料库
+        """
+        size_before = self.corpus_manager.size()
+        self._execute_external(entry["input"], entry["depth"])
+        return self.corpus_manager.size() > size_before
+
+    def import_solution(self, input_data) -> bool:
+        """
+        导入求解器给出的输入：验证执行一次，未超时就加入语料库（即使本次没有带来新覆盖，
+        求解结果通常指向变异难以到达的分支，值得作为变异的起点）。
+        :return: 是否加入了语料库
+        """
+        if input_data in self.corpus_manager.seen:
+            return False
+        size_before = self.corpus_manager.size()
+        timed_out, exec_time_ms = self._execute_external(input_data, 0)
+        if self.corpus_manager.size() == size_before and not timed_out:
+            self._add_to_corpus(input_data, exec_time_ms, 0, self.coverage_tracker.last_signature())
+        return self.corpus_manager.size() > size_before
+
+    def _execute_external(self, input_data, depth):
+        """在主线程中用主执行器执行一个外部来源的输入，结果走与本地变异体相同的处理流程"""
+        t0 = time.perf_counter()
+        has_new_coverage, error_msg = self.coverage_tracker.track_execution2(self.java_runner, input_data)
+        exec_time_ms = (time.perf_counter() - t0) * 1000
+        timed_out = self.java_runner.last_timed_out
+        self._process_result(None, input_data, has_new_coverage, error_msg, exec_time_ms, timed_out, depth=depth)
+        return timed_out, exec_time_ms
+
+    def _update_corpus(self, seed, new_input, has_new_coverage, error_msg, exec_time_ms, depth):
+        self.total_execs += 1
+        signature = self.coverage_tracker.last_signature()
+        if error_msg and self.error_detector.detect(new_input, error_msg, signature) and self.minimizer:
+            self._minimize_crash(new_input)
+
+        self.execution_cache.put(self.config.target_method, new_input, signature, error_msg)
+        if self.corpus_manager.schedule == "rare":
+            # 只有没见过的路径才扫描整张位图取边，已知路径按签名查表
+            edges = None if self.corpus_manager.has_path(signature) else self.coverage_tracker.last_edges()
+            self.corpus_manager.record_execution(signature, edges)
+        elif self.corpus_manager.schedule != "uniform":
+            self.corpus_manager.record_execution(signature)
+
+        if has_new_coverage:
+            if self.source_coverage and self.coverage_tracker.last_new_blocks:
+                for method, line in self.source_coverage.update(self.coverage_tracker.last_new_blocks):
+                    if self.config.verbose >= 2:
+                        print(f"新覆盖源码行：{method}:{line}")
+            if self._add_to_corpus(new_input, exec_time_ms, depth, signature) and self.handoff:
+                self.handoff.note_progress()
+
+    def _add_to_corpus(self, new_input, exec_time_ms, depth, signature) -> bool:
+        """以最近一次执行的覆盖信息把输入加入语料库，并写入磁盘队列"""
+        added = self.corpus_manager.add(
+            new_input,
+            exec_time_ms=exec_time_ms,
+            bitmap_size=self.coverage_tracker.last_bitmap_size(),
+            depth=depth,
+            signature=signature,
+            edges=self.coverage_tracker.last_edges(),
+        )
+        if added:
+            self.store.append_entry(self.corpus_manager.size() - 1, self.corpus_manager.entries[-1])
+        return added
+
+    def _minimize_crash(self, crash_input):
+        """精简新崩溃类别的复现输入"""
+        bucket = self.error_detector.last_bucket
+        with self.profiler.stage("minimize"):
+            minimized = self.minimizer.minimize(crash_input, ("crash", bucket.bucket_id))
+        self.error_detector.set_reproducer(bucket, minimized)
+        if minimized != crash_input and self.config.verbose >= 1:
+            print(f"崩溃输入已精简：{crash_input} -> {minimized}")
+
+    def _replay_cached(self, seed, new_input) -> bool:
+        """
+        若该输入已执行过，直接使用缓存的结果（不会再带来新覆盖率，但仍计入执行数与路径统计）。
+        :return: 是否命中缓存
+        """
+        cached = self.execution_cache.get(self.config.target_method, new_input)
+        if cached is None:
+            return False
+        self.total_execs += 1
+        if cached.error_msg:
+            self.error_detector.detect(new_input, cached.error_msg, cached.signature)
+        if self.corpus_manager.schedule != "uniform":
+            self.corpus_manager.record_execution(cached.signature)
+        return True
+
+    def _all_runners(self):
+        runners = [self.java_runner] + self.worker_runners
+        if self.async_runner:
+            runners += self.async_runner.slots
+        return runners
+
+    def timeout_count(self) -> int:
+        """所有执行器累计的超时次数（多目标模式下只计本目标激活期间共用执行器上的超时）"""
+        if self.shared_runner:
+            count = self._shared_timeouts
+            if self._timeouts_base is not None:
+                count += self.java_runner.timeout_count - self._timeouts_base
+            return count
+        count = sum(runner.timeout_count for runner in self._all_runners())
+        if self.async_runner:
+            count += self.async_runner.timeout_count
+        return count
+
     def _print_summary(self):
         coverage_stats = self.coverage_tracker.get_coverage_stats()
         print("\n" + "="*50)
         print("模糊测试结束")
         print("="*50)
         print(f"总迭代次数：{self.config.max_iterations}")
-        print(f"有效测试用例数：{self.corpus_manager.size()}")
+        print(f"有效测试用例数：{self.corpus_manager.size()}（完成确定性阶段 {self.corpus_manager.det_done_count} 个）")
         print(f"覆盖分支总数：{coverage_stats['total_covered_branches']}")
         print(f"检测到错误数：{self.error_detector.error_count()}")
         if self.error_detector.get_errors():
@@ -123,12 +727,30 @@ class FuzzerEngine:
         print("模糊测试结束")
         print("="*50)
         print(f"总迭代次数：{self.config.max_iterations}")
-        print(f"有效测试用例数：{self.corpus_manager.size()}")
+        print(f"总执行数：{self.total_execs}（缓存命中率 {self.execution_cache.hit_rate():.1%}）")
+        print(f"有效测试用例数：{self.corpus_manager.size()}（完成确定性阶段 {self.corpus_manager.det_done_count} 个）")
         print(f"覆盖分支总数：{coverage_stats['total_covered_branches']}")
-        print(f"检测到错误数：{self.error_detector.error_count()}")
+        print(f"检测到错误数：{self.error_detector.error_count()} 类（崩溃 {self.error_detector.crash_count()} 次）")
+        print(f"挂起输入数：{self.hang_detector.hang_count()}（超时 {self.hang_detector.suspected} 次，当前超时 {self.config.timeout:.3f} 秒）")
+        if self.map_report:
+            print(format_report(self.map_report))
+        if self.source_coverage:
+            print(self.source_coverage.summary())
+        if self.java_runner.startup_profile:
+            print(self.java_runner.startup_profile.summary())
+        if self.handoff:
+            report = self.handoff.report()
+            print(f"符号执行交接：导出 {report['batches']} 批共 {report['exported']} 个条目，"
+                  f"导入求解结果 {report['imported']} 个，拒绝 {report['rejected']} 个")
+        if self.sync:
+            report = self.sync.report()
+            print(f"多实例同步（{self.config.sync_id}，{self.config.sync_role}）：导入 {report['imported']} 个条目，"
+                  f"重新执行 {report['evaluated']} 个，跳过已知 {report['skipped']} 个")
         if self.error_detector.get_errors():
             print("\n错误详情：")
             for i, error in enumerate(self.error_detector.get_errors(), 1):
-                print(f"\n{i}. 输入：{error['input']}")
+                print(f"\n{i}. 最小复现输入：{error['input']}（出现 {error['count']} 次）")
                 print(f"   错误类型：{error['error_type']}")
-                print(f"   错误信息：{error['error_message'][:1000]}...")  # 截取前100字符
\ No newline at end of file
+                print(f"   错误信息：{error['error_message']}")
+                if error['frames']:
+                    print(f"   栈顶：{' <- '.join(error['frames'])}")
\ No newline at end of file
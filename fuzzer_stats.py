@@ -0,0 +1,149 @@
+# fuzzer/fuzzer_stats.py
+# 运行时遥测：分阶段计时 + 定期写出 fuzzer_stats（机器可读）、plot_data（时间序列）与 source_coverage（按方法的源码覆盖）
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StageProfiler:
+    """
+    按阶段累计耗时（线程安全，并行模式下各执行器共用一个实例）。
+    阶段：mutation / spawn / jvm_run / coverage_read / bitmap_compare / corpus_update
+    """
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """各阶段的总耗时(秒)、次数与平均耗时(毫秒)"""
+        with self._lock:
+            return {
+                name: {
+                    "total_s": total,
+                    "count": self.counts[name],
+                    "avg_ms": total * 1000 / self.counts[name],
+                }
+                for name, total in self.totals.items()
+            }
+
+
+class FuzzerStats:
+    """定期把引擎状态写入 output_dir/fuzzer_stats 与 output_dir/plot_data"""
+    PLOT_HEADER = "# unix_time, total_execs, execs_per_sec, covered_edges, corpus_size, errors, timeouts\n"
+
+    def __init__(self, output_dir: str, interval: float = 5.0):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.start_time = time.time()
+        self._last_write = 0.0
+        self._last_execs = 0
+        os.makedirs(output_dir, exist_ok=True)
+        self.stats_path = os.path.join(output_dir, "fuzzer_stats")
+        self.plot_path = os.path.join(output_dir, "plot_data")
+
+    def reset(self):
+        """开始新的测试活动：清空 plot_data 并写出表头"""
+        with open(self.plot_path, "w", encoding="utf-8") as f:
+            f.write(self.PLOT_HEADER)
+
+    def resume(self, start_time: float, total_execs: int):
+        """从检查点恢复：沿用原来的开始时间与执行数，plot_data 在原有历史之后续写"""
+        self.start_time = start_time
+        self._last_write = time.time()
+        self._last_execs = total_execs
+        if not os.path.exists(self.plot_path):
+            self.reset()
+
+    def maybe_write(self, engine):
+        """距上次写出超过 interval 秒时写出一次（在主循环中频繁调用，开销很小）"""
+        now = time.time()
+        if now - self._last_write >= self.interval:
+            self.write(engine, now)
+
+    def write(self, engine, now: float = None):
+        now = now or time.time()
+        elapsed = max(now - self.start_time, 1e-9)
+        window = max(now - (self._last_write or self.start_time), 1e-9)
+        execs = engine.total_execs
+        execs_per_sec = (execs - self._last_execs) / window
+        covered = engine.coverage_tracker.get_coverage_stats2()["total_covered_branches"]
+        timeouts = engine.timeout_count()
+
+        values = {
+            "start_time": int(self.start_time),
+            "last_update": int(now),
+            "run_time_s": round(elapsed, 3),
+            "target_method": engine.config.target_method,
+            "total_execs": execs,
+            "execs_per_sec": round(execs / elapsed, 2),
+            "execs_per_sec_recent": round(execs_per_sec, 2),
+            "covered_edges": covered,
+            "corpus_size": engine.corpus_manager.size(),
+            "det_done": engine.corpus_manager.det_done_count,
+            "det_execs": engine.det_execs,
+            "errors": engine.error_detector.error_count(),
+            "crashes": engine.error_detector.crash_count(),
+            "minimize_execs": engine.minimizer.execs if engine.minimizer else 0,
+            "minimize_cache_hits": engine.minimizer.cache_hits if engine.minimizer else 0,
+            "timeouts": timeouts,
+            "hangs": engine.hang_detector.hang_count(),
+            "timeout_s": round(engine.config.timeout, 4),
+            "exec_cache_hit_rate": round(engine.execution_cache.hit_rate(), 4),
+            "map_size": engine.config.coverage_map_size,
+            # 位图密度：已占用槽位的比例，即一条新边落到已占用槽位（与已知边冲突）的概率
+            "map_density": round(covered / engine.config.coverage_map_size, 6),
+        }
+        if engine.map_report:
+            values["map_blocks"] = engine.map_report["blocks"]
+            values["map_est_edge_collision_rate"] = round(engine.map_report["estimated_edge_collision_rate"], 4)
+        if engine.source_coverage:
+            totals = engine.source_coverage.totals()
+            values["lines_covered"] = totals["covered_lines"]
+            values["lines_total"] = totals["lines"]
+            if engine.source_coverage.changed:
+                engine.source_coverage.write(os.path.join(self.output_dir, "source_coverage"))
+        startup_profile = engine.java_runner.startup_profile
+        if startup_profile:
+            values["startup_saved_ms_per_exec"] = round(startup_profile.saved_ms_per_exec(), 3)
+            values["startup_total_saved_s"] = round(startup_profile.report()["total_saved_s"], 3)
+        if engine.sync:
+            for key, value in engine.sync.report().items():
+                values[f"sync_{key}"] = value
+        if engine.handoff:
+            for key, value in engine.handoff.report().items():
+                values[f"handoff_{key}"] = value
+        for name, stage in engine.profiler.snapshot().items():
+            values[f"stage_{name}_total_s"] = round(stage["total_s"], 3)
+            values[f"stage_{name}_avg_ms"] = round(stage["avg_ms"], 3)
+
+        # 先写临时文件再原子替换，读取方不会看到写了一半的文件
+        tmp_path = self.stats_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, value in values.items():
+                f.write(f"{key:<28}: {value}\n")
+        os.replace(tmp_path, self.stats_path)
+
+        with open(self.plot_path, "a", encoding="utf-8") as f:
+            f.write(
+                f"{int(now)}, {execs}, {execs_per_sec:.2f}, {covered}, "
+                f"{engine.corpus_manager.size()}, {engine.error_detector.error_count()}, {timeouts}\n"
+            )
+
+        self._last_write = now
+        self._last_execs = execs
@@ -0,0 +1,65 @@
+# fuzzer/hang_detector.py
+from typing import Any, Dict, List
+
+
+class HangDetector:
+    """
+    挂起（超时）输入单独归类，不走 ErrorDetector 的异常信息路径。
+    疑似挂起的输入会以更长的超时重新执行复核：仍然超时才记为挂起，否则只是慢输入。
+    确认的挂起按覆盖率去重：与 AFL 一样维护一份挂起专用的反向位图，
+    只有带来新(边, 桶)组合的挂起才视为新的挂起。
+    """
+    def __init__(self, coverage_map_size: int):
+        self.hangs: List[Dict] = []
+        self.virgin_bits = (1 << (8 * coverage_map_size)) - 1
+        self.suspected = 0        # 超时（疑似挂起）次数
+        self.confirmed = 0        # 复核后仍然超时的次数（含重复）
+        self.slow_inputs = 0      # 复核时在更长超时内结束的输入数
+
+    def verify(self, java_runner, input_data: Any, verify_timeout: float) -> bool:
+        """
+        以更长的超时重新执行疑似挂起的输入（在主线程中，用于串行模式）。
+        :return: 是否确认为挂起
+        """
+        confirmed = self.rerun(java_runner, input_data, verify_timeout)
+        self.note_verified(confirmed)
+        return confirmed
+
+    @staticmethod
+    def rerun(java_runner, input_data: Any, verify_timeout: float) -> bool:
+        """
+        复核执行本身，不修改计数，可以在产生该超时的执行器所在的worker线程中调用。
+        超时时先让agent把位图写回共享内存再终止JVM（SIGKILL 会留下全零的位图），
+        复核后执行器的位图即为挂起执行被终止前的覆盖率，供 record 去重。
+        :return: 是否仍然超时
+        """
+        java_runner.run_java_program2(input_data, timeout=verify_timeout, flush_on_timeout=True)
+        return java_runner.last_timed_out
+
+    def note_verified(self, confirmed: bool):
+        """记录一次复核的结果（只在主线程调用）"""
+        self.suspected += 1
+        if confirmed:
+            self.confirmed += 1
+        else:
+            self.slow_inputs += 1
+
+    def record(self, input_data: Any, classified: bytes, signature: int, verify_timeout: float) -> bool:
+        """
+        记录一个确认的挂起（按覆盖率去重）。
+        :param classified: 挂起执行被终止前的分桶位图（复核时由agent的关闭钩子写出）
+        :return: 是否为新的挂起
+        """
+        new_bits = int.from_bytes(classified, "little") & self.virgin_bits
+        if not new_bits and self.hangs:
+            return False
+        self.virgin_bits &= ~new_bits
+        self.hangs.append({
+            "input": input_data,
+            "signature": signature,
+            "timeout": verify_timeout,
+        })
+        return True
+
+    def hang_count(self) -> int:
+        return len(self.hangs)
@@ -0,0 +1,64 @@
+// fuzzer/harness/PersistentHarness.java
+// 常驻JVM执行器：JVM（jpamb.Runtime + bytescribe agent）只启动一次，
+// 通过stdin逐行接收输入，每次执行前后重置/刷新覆盖率位图，结果写回stdout。
+//
+// 协议（每行一条，UTF-8，字段以\t分隔）：
+//   请求：RUN\t<方法签名>\t<格式化输入>
+//   响应：DONE\t<返回码>\t<base64编码的stderr>
+// 返回码与单进程模式保持一致：0 正常结束，1 目标方法抛出异常。
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.util.Base64;
+
+public class PersistentHarness {
+    public static void main(String[] args) throws Exception {
+        String runtimeClass = args.length > 0 ? args[0] : "jpamb.Runtime";
+        Method runtimeMain = Class.forName(runtimeClass).getMethod("main", String[].class);
+
+        // bytescribe agent 的覆盖率接口（由 -javaagent 加载到系统类加载器）
+        Class<?> coverage = Class.forName("org.dtu.pa.agent.Coverage");
+        Method reset = coverage.getMethod("reset");
+        Method flush = coverage.getMethod("flush");
+
+        PrintStream realOut = System.out;
+        PrintStream realErr = System.err;
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] parts = line.split("\t", 3);
+            if (parts.length < 3 || !parts[0].equals("RUN")) {
+                continue;
+            }
+
+            ByteArrayOutputStream errBuf = new ByteArrayOutputStream();
+            PrintStream capturedErr = new PrintStream(errBuf, true, StandardCharsets.UTF_8);
+            System.setOut(new PrintStream(new ByteArrayOutputStream(), true, StandardCharsets.UTF_8));
+            System.setErr(capturedErr);
+
+            int code = 0;
+            reset.invoke(null);
+            try {
+                runtimeMain.invoke(null, (Object) new String[] {parts[1], parts[2]});
+            } catch (InvocationTargetException e) {
+                // 与单进程模式下未捕获异常的stderr格式保持一致
+                code = 1;
+                capturedErr.print("Exception in thread \"main\" ");
+                e.getCause().printStackTrace(capturedErr);
+            } finally {
+                flush.invoke(null);
+                System.setOut(realOut);
+                System.setErr(realErr);
+            }
+
+            String err = Base64.getEncoder().encodeToString(errBuf.toByteArray());
+            realOut.print("DONE\t" + code + "\t" + err + "\n");
+            realOut.flush();
+        }
+    }
+}
@@ -1,69 +1,432 @@
 # fuzzer/input_generator.py
 import random
-from typing import List, Any
+from typing import List, Any, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选：没有时数值槽位逐个变异
+    np = None
+
+# 整数类型的位宽（JVM描述符：B byte / S short / I int / J long）
+INT_BITS = {"B": 8, "S": 16, "I": 32, "J": 64}
+# 字符与字符串只使用可安全写进 jpamb 参数的字符（不含引号、逗号、括号与反斜杠）
+SAFE_CHARS = "abcxyzABCXYZ0129 _-+*/.;=!?#%&"
+UNSAFE_CHARS = set("'\"\\,()[]")
+MAX_ARRAY_LEN = 32
+ARITH_MAX = 35  # 确定性算术变异的最大偏移（与AFL一致）
+MAX_STRING_LEN = 32
+
+
+def parse_descriptor(method: str) -> Optional[List[str]]:
+    """
+    解析目标方法描述符中的参数类型列表。
+    如 "jpamb.cases.Simple.divideByN:(I)I" -> ["I"]，"m:(I[CZLjava/lang/String;)V" -> ["I", "[C", "Z", "Ljava/lang/String;"]
+    :return: 参数类型列表；无法解析时返回None
+    """
+    start = method.find("(")
+    end = method.find(")", start)
+    if start < 0 or end < 0:
+        return None
+    params = []
+    desc = method[start + 1:end]
+    i = 0
+    while i < len(desc):
+        j = i
+        while desc[j] == "[":
+            j += 1
+        if desc[j] == "L":
+            j = desc.index(";", j)
+        params.append(desc[i:j + 1])
+        i = j + 1
+    return params
+
+
+def _wrap(value: int, bits: int) -> int:
+    """按Java整数位宽回绕（溢出时与Java行为一致，避免生成解析不了的参数）"""
+    mask = (1 << bits) - 1
+    value &= mask
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+
+def _interesting_ints(bits: int) -> List[int]:
+    """边界值：0、±1、2的幂次（适配Proposal中1024=2^10的场景）以及该位宽的最大/最小值"""
+    values = [0, 1, -1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+    if bits > 16:
+        values += [int(1e5), int(-1e5)]
+    values += [(1 << (bits - 1)) - 1, -(1 << (bits - 1))]
+    return [_wrap(v, bits) for v in values]
+
 
 class InputGenerator:
-    def __init__(self, input_type: type = int):
+    def __init__(self, input_type: type = int, params: Optional[List[str]] = None):
         """
         初始化输入生成器
-        :param input_type: 目标输入类型（默认int，适配Proposal中的division_loop(int n)）
+        :param input_type: 目标输入类型（默认int，适配Proposal中的division_loop(int n)）；给出 params 时忽略
+        :param params: 目标方法的参数类型（JVM描述符，见 parse_descriptor）。
+                       单参数方法的输入是该参数的值，多参数方法的输入是各参数值组成的元组；数组参数的值为元组
         """
         self.input_type = input_type
+        self.params = params if params is not None else (["I"] if input_type == int else [])
         self.random = random.Random()
-        self.random.seed(42)  # 固定种子，保证可复现性  
+        self.random.seed(42)  # 固定种子，保证可复现性
+        self.np_random = np.random.default_rng(42) if np is not None else None
+        # 变异字典（从目标类文件收集的常量，见 set_dictionary）
+        self.dict_ints: List[int] = []
+        self.dict_strings: List[str] = []
+
+    def set_dictionary(self, ints: List[int], strings: List[str]):
+        """
+        设置变异字典：整数常量连同其±1（覆盖 <、<= 之类的比较边界）用于种子和字典变异，
+        字符串常量用于字符串参数的种子、替换与插入
+        """
+        values = set()
+        for value in ints:
+            values.update((value - 1, value, value + 1))
+        self.dict_ints = sorted(values)
+        self.dict_strings = [string for string in strings
+                             if string.isprintable() and not UNSAFE_CHARS.intersection(string)]
+
+    @classmethod
+    def for_method(cls, method: str) -> "InputGenerator":
+        """按目标方法描述符创建生成器（描述符无法解析时退回int）"""
+        params = parse_descriptor(method)
+        if params is None:
+            return cls(input_type=int)
+        return cls(params=params)
 
+    # ---------- 种子 ----------
     def generate_seeds(self, count: int = 100) -> List[Any]:
         """
         生成初始种子输入（覆盖常见值和边界值）
+        多参数时先让每个参数依次取遍其边界值（其他参数取0值），再补充随机组合
         :param count: 种子数量
         :return: 种子列表
         """
+        if not self.params:
+            return [()]
         seeds = []
-        if self.input_type == int:
-            # 包含边界值（0、最大值、最小值、2的幂次，适配Proposal中1024=2^10的场景）
-            boundary_values = [0, 1, -1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048,
-                               int(1e5), int(-1e5), int(2**31-1), int(-2**31)]
-            seeds.extend(boundary_values)
-            # 补充随机int值，确保种子多样性
-            while len(seeds) < count:
-                seeds.append(self.random.randint(-10**6, 10**6))
-        # 后续可扩展其他类型（如str：生成随机字符串、常见关键词）
-        return list(set(seeds))  # 去重
+        seen = set()
+
+        def add(values):
+            value = self._pack(values)
+            if value not in seen:
+                seen.add(value)
+                seeds.append(value)
+
+        zero = [self._zero_value(t) for t in self.params]
+        for i, t in enumerate(self.params):
+            for value in self._interesting_values(t):
+                values = list(zero)
+                values[i] = value
+                add(values)
+        # 补充随机值，确保种子多样性（取值空间很小时提前结束）
+        for _ in range(count * 4):
+            if len(seeds) >= count:
+                break
+            add([self._random_value(t) for t in self.params])
+        return seeds
+
+    def _pack(self, values: Sequence[Any]) -> Any:
+        return values[0] if len(self.params) == 1 else tuple(values)
+
+    def _unpack(self, input_data: Any) -> List[Any]:
+        return [input_data] if len(self.params) == 1 else list(input_data)
+
+    def _zero_value(self, t: str) -> Any:
+        if t in INT_BITS:
+            return 0
+        if t == "Z":
+            return False
+        if t == "C":
+            return "a"
+        if t in ("D", "F"):
+            return 0.0
+        return () if t.startswith("[") else ""
+
+    def _interesting_values(self, t: str) -> List[Any]:
+        if t in INT_BITS:
+            bits = INT_BITS[t]
+            return _interesting_ints(bits) + [_wrap(v, bits) for v in self.dict_ints]
+        if t == "Z":
+            return [False, True]
+        if t == "C":
+            return ["a", "z", "0", " "]
+        if t in ("D", "F"):
+            return [0.0, 1.0, -1.0, 0.5, 1e-9, 1e9, -1e9]
+        if t.startswith("["):
+            elem = t[1:]
+            return [(), (self._zero_value(elem),)] + [
+                tuple(self._random_value(elem) for _ in range(n)) for n in (1, 2, 8)
+            ]
+        return ["", "a", "abc"] + self.dict_strings
+
+    def _random_value(self, t: str) -> Any:
+        if t in INT_BITS:
+            bits = INT_BITS[t]
+            if bits >= 32:
+                return self.random.randint(-10**6, 10**6)
+            return self.random.randint(-(1 << (bits - 1)), (1 << (bits - 1)) - 1)
+        if t == "Z":
+            return self.random.random() < 0.5
+        if t == "C":
+            return self.random.choice(SAFE_CHARS)
+        if t in ("D", "F"):
+            return round(self.random.uniform(-1e6, 1e6), 3)
+        if t.startswith("["):
+            return tuple(self._random_value(t[1:]) for _ in range(self.random.randint(0, 8)))
+        return "".join(self.random.choice(SAFE_CHARS) for _ in range(self.random.randint(0, 8)))
 
+    # ---------- 变异 ----------
     def mutate(self, original_input: Any) -> Any:
         """
         变异输入（核心：基于有效输入生成新输入，触发新路径）
-        变异策略：针对int类型，采用“随机修改位、加减偏移、乘除2”等算术变异（适配循环/算术密集型代码）
+        每次随机选一个参数按其类型变异；int类型采用“随机修改位、加减偏移、乘除2”等算术变异（适配循环/算术密集型代码）
         :param original_input: 原始有效输入
         :return: 变异后的新输入
         """
-        if self.input_type == int:
+        if not self.params:
+            return original_input
+        values = self._unpack(original_input)
+        i = self.random.randrange(len(self.params))
+        values[i] = self._mutate_value(self.params[i], values[i])
+        return self._pack(values)
+
+    def deterministic_mutants(self, original_input: Any) -> List[Any]:
+        """
+        确定性变异阶段（参考AFL）：对每个参数依次遍历单位/相邻2位/4位翻转、字节翻转、±1..ARITH_MAX 算术、
+        边界值与字典常量替换等所有邻近值，去重且不含原输入。
+        由引擎对每个新语料库条目执行一次，之后交给随机变异（havoc）阶段。
+        """
+        if not self.params:
+            return []
+        values = self._unpack(original_input)
+        mutants = []
+        seen = {original_input}
+        for i, t in enumerate(self.params):
+            for new_value in self._deterministic_values(t, values[i]):
+                mutant = list(values)
+                mutant[i] = new_value
+                mutant = self._pack(mutant)
+                if mutant not in seen:
+                    seen.add(mutant)
+                    mutants.append(mutant)
+        return mutants
+
+    def _deterministic_values(self, t: str, value: Any) -> List[Any]:
+        if t in INT_BITS:
+            bits = INT_BITS[t]
+            new_values = []
+            # 翻转连续的1、2、4位
+            for width in (1, 2, 4):
+                pattern = (1 << width) - 1
+                new_values += [value ^ (pattern << bit) for bit in range(bits - width + 1)]
+            # 翻转整字节、相邻2字节、相邻4字节
+            for width in (8, 16, 32):
+                if width <= bits:
+                    pattern = (1 << width) - 1
+                    new_values += [value ^ (pattern << bit) for bit in range(0, bits - width + 1, 8)]
+            # 算术：±1..ARITH_MAX
+            for delta in range(1, ARITH_MAX + 1):
+                new_values += [value + delta, value - delta]
+            # 边界值与字典常量替换
+            new_values += self._interesting_values(t)
+            return [_wrap(v, bits) for v in new_values]
+        if t == "Z":
+            return [not value]
+        if t == "C":
+            return list(SAFE_CHARS)
+        if t in ("D", "F"):
+            return [value + 1, value - 1, value * 2, value / 2, -value] + self._interesting_values(t)
+        if t.startswith("["):
+            elem = t[1:]
+            new_values = self._interesting_values(t)
+            # 逐个删除元素，逐个元素替换为边界值/字典常量
+            for k in range(len(value)):
+                new_values.append(value[:k] + value[k + 1:])
+                for elem_value in self._interesting_values(elem):
+                    new_values.append(value[:k] + (elem_value,) + value[k + 1:])
+            return new_values
+        # 字符串：逐个删除字符，替换为字典字符串
+        return [value[:k] + value[k + 1:] for k in range(len(value))] + self._interesting_values(t)
+
+    def mutate_batch(self, original_input: Any, count: int) -> List[Any]:
+        """
+        一次生成 count 个变异体。numpy 可用时，整数参数的变异按批向量化生成；
+        其余参数（以及没有numpy时）逐个调用对应类型的变异器。
+        """
+        if self.np_random is None or not self.params or count < 4:
+            return [self.mutate(original_input) for _ in range(count)]
+        values = self._unpack(original_input)
+        slots = self.np_random.integers(0, len(self.params), size=count)
+        mutants: List[Optional[List[Any]]] = [None] * count
+        for i, t in enumerate(self.params):
+            positions = np.flatnonzero(slots == i)
+            if not len(positions):
+                continue
+            if t in INT_BITS:
+                new_values = self._mutate_ints_np(values[i], len(positions), INT_BITS[t])
+            else:
+                new_values = [self._mutate_value(t, values[i]) for _ in positions]
+            for pos, new_value in zip(positions.tolist(), new_values):
+                mutant = list(values)
+                mutant[i] = new_value
+                mutants[pos] = mutant
+        return [self._pack(mutant) for mutant in mutants]
+
+    def _mutate_ints_np(self, x: int, count: int, bits: int) -> List[int]:
+        """向量化的整数变异：翻转1位 / 加减偏移 / 乘除2 / 取反 / 边界值或字典常量，结果按位宽回绕"""
+        rng = self.np_random
+        ops = rng.integers(0, 5, size=count)
+        # 用Python整数对象数组，避免64位long在乘2时于numpy中溢出
+        base = np.full(count, x, dtype=object)
+        flipped = base ^ np.left_shift(1, rng.integers(0, bits - 1, size=count)).astype(object)
+        offset = base + rng.integers(-10, 11, size=count).astype(object)
+        halved = base * 2 if x == 0 else np.where(rng.random(count) < 0.5, base * 2, base // 2)
+        interesting = np.array(_interesting_ints(bits) + self.dict_ints, dtype=object)
+        boundary = interesting[rng.integers(0, len(interesting), size=count)]
+        result = np.empty(count, dtype=object)
+        for op, candidates in enumerate([flipped, offset, halved, -base, boundary]):
+            mask = ops == op
+            result[mask] = candidates[mask]
+        return [_wrap(int(v), bits) for v in result]
+
+    def _mutate_value(self, t: str, value: Any) -> Any:
+        if t in INT_BITS:
+            bits = INT_BITS[t]
             mutation_choice = self.random.choice([
                 self._bit_flip,    # 随机翻转1位二进制
                 self._add_offset,  # 加减随机偏移
                 self._multiply_divide,  # 乘/除2（适配Proposal中n /=2的循环）
-                self._negate       # 取反
-            ])
-            return mutation_choice(original_input)
-        return original_input
+                self._negate,      # 取反
+                self._boundary,    # 替换为边界值
+            ] + ([self._dictionary] if self.dict_ints else []))
+            return _wrap(mutation_choice(value, bits), bits)
+        if t == "Z":
+            return not value
+        if t == "C":
+            return self._mutate_char(value)
+        if t in ("D", "F"):
+            return self._mutate_float(value)
+        if t.startswith("["):
+            return self._mutate_array(t[1:], value)
+        return self._mutate_string(value)
 
     # 以下是具体变异策略
-    def _bit_flip(self, x: int) -> int:
-        """随机翻转x的1位二进制位"""
-        bit_pos = self.random.randint(0, 30)  # 针对32位int，避免符号位溢出
+    def _bit_flip(self, x: int, bits: int = 32) -> int:
+        """随机翻转x的1位二进制位（不含符号位）"""
+        bit_pos = self.random.randint(0, bits - 2)
         return x ^ (1 << bit_pos)
 
-    def _add_offset(self, x: int) -> int:
+    def _add_offset(self, x: int, bits: int = 32) -> int:
         """加减随机偏移（-10~10）"""
         offset = self.random.randint(-10, 10)
         return x + offset
 
-    def _multiply_divide(self, x: int) -> int:
+    def _multiply_divide(self, x: int, bits: int = 32) -> int:
         """乘2或除2（避免除零）"""
         if x == 0:
             return x * 2
         return x * 2 if self.random.choice([True, False]) else x // 2
 
-    def _negate(self, x: int) -> int:
+    def _negate(self, x: int, bits: int = 32) -> int:
         """取反"""
-        return -x
\ No newline at end of file
+        return -x
+
+    def _boundary(self, x: int, bits: int = 32) -> int:
+        """替换为该位宽的边界值"""
+        return self.random.choice(_interesting_ints(bits))
+
+    def _dictionary(self, x: int, bits: int = 32) -> int:
+        """替换为目标类中的常量（魔数比较、switch分支值）"""
+        return self.random.choice(self.dict_ints)
+
+    def _mutate_char(self, c: str) -> str:
+        """替换为相邻字符或随机字符"""
+        if self.random.random() < 0.5 and c in SAFE_CHARS:
+            i = SAFE_CHARS.index(c) + self.random.choice([-1, 1])
+            return SAFE_CHARS[i % len(SAFE_CHARS)]
+        return self.random.choice(SAFE_CHARS)
+
+    def _mutate_float(self, x: float) -> float:
+        """加减偏移、缩放、取反或替换为特殊值"""
+        choice = self.random.randrange(4)
+        if choice == 0:
+            return x + self.random.uniform(-10, 10)
+        if choice == 1:
+            return x * self.random.choice([2.0, 0.5, 10.0, 0.1])
+        if choice == 2:
+            return -x
+        return self.random.choice([0.0, 1.0, -1.0, 0.5, 1e-9, 1e9])
+
+    def _mutate_array(self, elem: str, arr: Tuple) -> Tuple:
+        """变异一个元素 / 插入 / 删除 / 复制一个元素 / 清空"""
+        items = list(arr)
+        choice = self.random.randrange(5)
+        if choice == 0 and items:
+            i = self.random.randrange(len(items))
+            items[i] = self._mutate_value(elem, items[i])
+        elif choice == 1 and len(items) < MAX_ARRAY_LEN:
+            items.insert(self.random.randint(0, len(items)), self._random_value(elem))
+        elif choice == 2 and items:
+            del items[self.random.randrange(len(items))]
+        elif choice == 3 and items and len(items) < MAX_ARRAY_LEN:
+            i = self.random.randrange(len(items))
+            items.insert(i, items[i])
+        elif choice == 4:
+            items = []
+        else:
+            items.append(self._random_value(elem))
+        return tuple(items)
+
+    def _mutate_string(self, s: str) -> str:
+        """变异一个字符 / 插入 / 删除 / 替换为字典中的字符串 / 插入字典中的字符串"""
+        if self.dict_strings and self.random.random() < 0.3:
+            word = self.random.choice(self.dict_strings)
+            if self.random.random() < 0.5:
+                return word
+            i = self.random.randint(0, len(s))
+            return (s[:i] + word + s[i:])[:MAX_STRING_LEN]
+        chars = list(s)
+        choice = self.random.randrange(3)
+        if choice == 0 and chars:
+            i = self.random.randrange(len(chars))
+            chars[i] = self._mutate_char(chars[i])
+        elif choice == 2 and chars:
+            del chars[self.random.randrange(len(chars))]
+        elif len(chars) < MAX_STRING_LEN:
+            chars.insert(self.random.randint(0, len(chars)), self.random.choice(SAFE_CHARS))
+        return "".join(chars)
+
+
+def format_value(t: str, value: Any) -> str:
+    """按参数类型格式化为 jpamb.Runtime 的参数语法：true/false、'c'、[I:1,2]、[C:'a','b']"""
+    if t == "Z":
+        return "true" if value else "false"
+    if t == "C":
+        return f"'{value}'"
+    if t.startswith("["):
+        elem = t[1:]
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        return f"[{elem}:" + ",".join(format_value(elem, v) for v in value) + "]"
+    if t.startswith("L"):
+        return f'"{value}"'
+    if t in ("D", "F"):
+        return repr(float(value))
+    return str(value)
+
+
+def format_args(params: List[str], input_data: Any) -> Optional[str]:
+    """
+    按参数类型格式化一个输入，如 (5) 或 (1, true, [I:1,2])。
+    输入与参数列表不匹配时返回None（由调用方退回按值格式化）
+    """
+    if isinstance(input_data, list) and len(input_data) == len(params):
+        values = input_data  # 驱动请求/JSON中的参数列表
+    elif len(params) == 1:
+        values = [input_data]
+    elif isinstance(input_data, tuple) and len(input_data) == len(params):
+        values = input_data
+    else:
+        return None
+    return "(" + ", ".join(format_value(t, v) for t, v in zip(params, values)) + ")"
@@ -2,9 +2,20 @@ import subprocess
 import json
 import tempfile
 import os
-from typing import Tuple, Optional, Dict
+import select
+import time
+import base64
+import threading
+from array import array
+from typing import Tuple, Optional, Dict, List
+from shared_bitmap import SharedBitmap
+from fuzzer_stats import StageProfiler
+from jvm_startup import StartupProfile
+from input_generator import parse_descriptor, format_args
 
 class JavaRunner:
+    FLUSH_GRACE_S = 2.0  # flush_on_timeout 时 SIGTERM 之后等待agent关闭钩子写出位图的时间
+
     def __init__(self, java_class_path: str, target_method: str, config, coverage_output_path: str = "coverage_temp.json"):
         """
         :param java_class_path: Java类路径（如"bin:lib/asm.jar"，包含插桩后的类文件）
@@ -21,6 +32,27 @@ class JavaRunner:
         if os.path.exists(coverage_output_path):
             os.remove(coverage_output_path)
 
+        # 与agent共享的覆盖率位图（shm文件只映射一次，每次执行前原地清零）
+        self.bitmap = SharedBitmap(config.coverage_output_path, config.coverage_map_size)
+
+        # 分阶段计时（FuzzerEngine 会替换为引擎共用的实例）与超时计数
+        self.profiler = StageProfiler()
+        self.timeout_count = 0
+        self.last_timed_out = False  # 最近一次执行是否超时（挂起单独归类，不走错误信息路径）
+
+        # 目标方法的参数类型（按描述符格式化输入，见 _format_input）
+        self._params_method = None
+        self._params = None
+
+        # 是否解析执行轨迹（驱动模式需要；模糊测试主循环只用位图，引擎会关闭以省去解析开销）
+        self.collect_trace = True
+
+        # 块映射每个测试活动只需写出一次：引擎加载后关闭，之后的执行让agent写到 os.devnull
+        self.write_block_map = True
+
+        # 快速启动配置（AppCDS归档 + 启动参数），同一类路径/agent的执行器共用
+        self.startup_profile = StartupProfile.for_config(config) if config.fast_startup else None
+
     # # def run_java_program(self, input_data: int, method: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
     # #     """
     # #     运行插桩后的Java程序，返回覆盖率数据和异常信息
@@ -67,20 +99,20 @@ class JavaRunner:
     # #     except Exception as e:
     # #         return None, f"Python调用Java失败：{str(e)}"
 
-    def run_java_program2(self, input_data: str, method: Optional[str] = None):
-        """
-        使用插桩代理执行Java程序，并返回执行结果。
-        """
-        # 1. 定义插桩代理和输出文件的路径 (从配置中读取)
+    def _build_agent_args(self, scratch_dir: Optional[str] = None) -> str:
+        """构建 -javaagent 参数字符串（路径从配置中读取；给出 scratch_dir 时输出文件都放在该目录下）"""
         agent_path = self.config.agent_path
         shm_path = self.config.coverage_output_path
-        map_path = self.config.map_output_path
+        map_path = self.config.map_output_path if self.write_block_map else os.devnull
         edge_coverage_path = self.config.edge_coverage_path
+        if scratch_dir:
+            shm_path = os.path.join(scratch_dir, os.path.basename(shm_path))
+            map_path = os.path.join(scratch_dir, os.path.basename(self.config.map_output_path))
+            edge_coverage_path = os.path.join(scratch_dir, os.path.basename(edge_coverage_path))
 
-        # 2. 构建 -javaagent 参数字符串
-        agent_args = (
+        return (
             f"-javaagent:{agent_path}="
-            f"size=65536,"
+            f"size={self.config.coverage_map_size},"
             f"shm={os.path.abspath(shm_path)},"
             f"map={os.path.abspath(map_path)},"
             f"map.append=false,"
@@ -88,69 +120,329 @@ class JavaRunner:
             f"perEdgePath={os.path.abspath(edge_coverage_path)}"
         )
 
-        # 3. 输入数据格式化
-        formatted_input = f"({input_data})"
+    def _prepare_edge_file(self):
+        """确保per-edge输出目录存在，并清理上一次执行的残留"""
+        edge_coverage_path = self.config.edge_coverage_path
+        os.makedirs(os.path.dirname(edge_coverage_path), exist_ok=True)
+        if os.path.exists(edge_coverage_path):
+            os.remove(edge_coverage_path)
 
-        # 4. 构建完整的Java执行命令列表
+    def read_trace(self) -> Optional[array]:
+        """
+        读取并解析 per-edge 覆盖率文件，提取执行轨迹（trace）。
+        文件格式为表头 edgeId:count 加每行一条 边ID:命中次数，轨迹取各行的边ID。
+        整个文件一次读入后批量解析，结果为 array('q')；collect_trace 关闭时不解析，返回None。
+        """
+        if not self.collect_trace:
+            return None
+        return self.read_blocks()
+
+    def read_blocks(self) -> array:
+        """
+        读取本次执行命中的插桩块ID（不受 collect_trace 影响）。
+        agent 的 per-edge 稀疏模式以 bump 的参数即块ID为键计数，因此 edgeId 就是块映射中的 blockId；
+        共享位图的槽位则是边哈希，无法反推块。
+        """
+        try:
+            with open(self.config.edge_coverage_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return array("q")
+        return self.parse_edge_data(data)
+
+    @staticmethod
+    def parse_edge_data(data: bytes) -> array:
+        """批量解析 per-edge 文件内容：按 ':' 与空白切分后每两个字段取第一个（边ID）"""
+        if data[:1].isalpha():
+            # 跳过表头 edgeId:count
+            newline = data.find(b"\n")
+            data = data[newline + 1:] if newline >= 0 else b""
+        fields = data.replace(b":", b" ").split()
+        try:
+            return array("q", map(int, fields[::2]))
+        except ValueError:
+            # 存在格式不正确的行时逐行解析，忽略这些行
+            trace = array("q")
+            for line in data.splitlines():
+                edge_id, _, _ = line.partition(b":")
+                try:
+                    trace.append(int(edge_id))
+                except ValueError:
+                    pass
+            return trace
+
+    def _format_input(self, input_data) -> str:
+        """
+        格式化为 jpamb.Runtime 接受的参数形式，如 (5)、(1, 2) 或 (true, 'a', [I:1,2])。
+        能解析目标方法描述符时按参数类型格式化，否则按值拼接
+        """
+        if self._params_method != self.target_method:
+            # 驱动模式下每个请求可能换目标方法，描述符按方法缓存解析结果
+            self._params_method = self.target_method
+            self._params = parse_descriptor(self.target_method)
+        if self._params is not None:
+            formatted = format_args(self._params, input_data)
+            if formatted is not None:
+                return formatted
+        if isinstance(input_data, (list, tuple)):
+            input_data = ", ".join(map(str, input_data))
+        return f"({input_data})"
+
+    def build_command(self, input_data, method: Optional[str] = None) -> List[str]:
+        """构建完整的Java执行命令列表（同步与异步执行后端共用）"""
+        launch_args = self._launch_args(input_data, method)
+        if self.startup_profile is None:
+            return ["java"] + launch_args
+        # 快速启动：归档尚未生成时（如驱动模式，没有 initialize 阶段）以本次输入训练
+        self.prepare_startup(input_data, method)
+        return ["java"] + self.startup_profile.jvm_options() + launch_args
+
+    def prepare_startup(self, input_data, method: Optional[str] = None):
+        """
+        快速启动：生成AppCDS归档并测量启动耗时（已生成或已失败时立即返回）。
+        训练与测量运行的agent输出写到临时目录，不会写入本执行器的位图、块映射与per-edge文件。
+        """
+        if self.startup_profile is None or self.startup_profile.ready or self.startup_profile.failed:
+            return
+        with tempfile.TemporaryDirectory(prefix="bytescribe-startup-") as scratch_dir:
+            self.startup_profile.ensure(self._launch_args(input_data, method, scratch_dir))
+
+    def _launch_args(self, input_data, method: Optional[str] = None, scratch_dir: Optional[str] = None) -> List[str]:
+        """
+        java 之后的启动参数：agent、类路径、运行时主类与目标方法参数
+        :param scratch_dir: 非空时agent的输出文件放在该目录下（训练等不属于测试活动的运行）
+        """
+        # 1. 构建 -javaagent 参数字符串
+        agent_args = self._build_agent_args(scratch_dir)
+
+        # 2. 输入数据格式化
+        formatted_input = self._format_input(input_data)
+
+        # 3. 构建完整的启动参数列表
         command = [
-            "java",
             agent_args,
             "-ea", # 开启断言
             "-cp",
             self.java_class_path,
             self.runtime_class,
-            self.target_method, # 第一个参数: 方法签名
+            method or self.target_method,  # 第一个参数: 方法签名
             formatted_input     # 第二个参数： 格式化目标待执行方法所需参数
-        ] 
-                
-        if method:  
-            command.append(method)
-        if not isinstance(input_data, list):
-            input_data = [input_data]
-        command.extend(map(str, input_data))
+        ]
+        return command
 
-        os.makedirs(os.path.dirname(edge_coverage_path), exist_ok=True)
+    def prepare_run(self):
+        """执行前清理上一次的per-edge文件，并原地清零共享位图"""
+        self._prepare_edge_file()
+        self.bitmap.reset()
 
-        if os.path.exists(edge_coverage_path):
-            os.remove(edge_coverage_path)
+    def run_java_program2(self, input_data: str, method: Optional[str] = None, timeout: Optional[float] = None,
+                          flush_on_timeout: bool = False):
+        """
+        使用插桩代理执行Java程序，并返回执行结果。
+        :param timeout: 本次执行的超时，缺省为 config.timeout（挂起复核时使用更长的超时）
+        :param flush_on_timeout: 超时时先发 SIGTERM，让agent的关闭钩子把位图写回共享内存再强杀；
+            否则直接 SIGKILL，位图保持全零（agent 只在 flush 时写共享内存）
+        """
+        timeout = self.config.timeout if timeout is None else timeout
+        command = self.build_command(input_data, method)
+        self.prepare_run()
+        self.last_timed_out = False
 
-        # 4.1 log
-        print(f"========executed java command is: {command}========")
+        # 3.1 log（逐次执行的日志只在最高详细级别输出）
+        if self.config.verbose >= 2:
+            print(f"========executed java command is: {command}========")
 
-        # 5. 执行命令
+        # 4. 执行命令（拆分为进程创建与JVM运行两个阶段分别计时）
         try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=self.config.timeout  # 设置一个超时，防止程序卡死
-            )
+            with self.profiler.stage("spawn"):
+                process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
+            with self.profiler.stage("jvm_run"):
+                try:
+                    _, stderr = process.communicate(timeout=timeout)  # 设置一个超时，防止程序卡死
+                except subprocess.TimeoutExpired:
+                    self._terminate(process, flush_on_timeout)
+                    raise
 
             error_msg = None
-            if result.returncode != 0:
-                error_msg = f"Java执行异常 (返回码: {result.returncode}): {result.stderr.strip()}"
-
-            # 读取并解析覆盖率文件，提取执行轨迹（trace）
-            trace = []
-            if os.path.exists(edge_coverage_path):
-                with open(edge_coverage_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            # 假设 per-edge.csv 的格式是 "source_offset,target_offset"
-                            # 我们可以提取 source_offset 作为轨迹的一部分
-                            parts = line.split(",")
-                            if len(parts) >= 1:
-                                try:
-                                    trace.append(int(parts[0]))
-                                except ValueError:
-                                    # 如果格式不正确，忽略这条记录
-                                    pass
-            
+            if process.returncode != 0:
+                error_msg = f"Java执行异常 (返回码: {process.returncode}): {stderr.strip()}"
+
             # 返回执行轨迹和错误信息
+            with self.profiler.stage("coverage_read"):
+                trace = self.read_trace()
             return trace, error_msg
 
         except subprocess.TimeoutExpired:
-            return None, f"Java程序执行超时 (超过 {self.config.timeout} 秒)"
+            self.timeout_count += 1
+            self.last_timed_out = True
+            return None, f"Java程序执行超时 (超过 {timeout} 秒)"
         except Exception as e:
-            return None, f"调用Java程序失败: {str(e)}"
\ No newline at end of file
+            return None, f"调用Java程序失败: {str(e)}"
+
+    def _terminate(self, process: subprocess.Popen, flush: bool):
+        """终止超时的JVM；flush 时先 SIGTERM 并等待关闭钩子写出位图，宽限期过后仍未退出再强杀"""
+        if flush:
+            process.terminate()
+            try:
+                process.communicate(timeout=self.FLUSH_GRACE_S)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+        process.kill()
+        process.communicate()
+
+    def close(self):
+        """释放执行器占用的资源"""
+        self.bitmap.close()
+
+
+class PersistentJavaRunner(JavaRunner):
+    """
+    常驻JVM执行模式：JVM（jpamb.Runtime + bytescribe agent）只启动一次，
+    通过管道逐个接收输入，由 harness/PersistentHarness.java 在每次执行前后重置/刷新覆盖率位图。
+    崩溃、超时或执行满 persistent_max_execs 次后自动重启JVM。
+    对外接口与 JavaRunner.run_java_program2 保持一致，可直接替换。
+    """
+    harness_class = "PersistentHarness"
+    harness_source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "harness", "PersistentHarness.java")
+    _compile_lock = threading.Lock()  # 并行模式下多个执行器共享同一个编译目录
+
+    def __init__(self, java_class_path: str, target_method: str, config, coverage_output_path: str = "coverage_temp.json"):
+        super().__init__(java_class_path, target_method, config, coverage_output_path)
+        self.harness_dir = os.path.abspath(config.harness_build_dir)
+        self.process: Optional[subprocess.Popen] = None
+        self.exec_count = 0     # 当前JVM已执行的输入数
+        self.restart_count = 0  # JVM（重新）启动次数
+        self._buffer = b""
+
+    def _ensure_harness(self):
+        """编译 harness（仅在class文件缺失或源码更新时执行）"""
+        class_file = os.path.join(self.harness_dir, self.harness_class + ".class")
+        with self._compile_lock:
+            if os.path.exists(class_file) and os.path.getmtime(class_file) >= os.path.getmtime(self.harness_source):
+                return
+            os.makedirs(self.harness_dir, exist_ok=True)
+            subprocess.run(["javac", "-d", self.harness_dir, self.harness_source], check=True, capture_output=True)
+
+    def _start(self):
+        """启动常驻JVM"""
+        self._ensure_harness()
+        # 常驻JVM的类路径以目标类路径开头，可复用非常驻执行已生成的AppCDS归档
+        startup_options = self.startup_profile.jvm_options() if self.startup_profile else []
+        command = [
+            "java",
+            *startup_options,
+            self._build_agent_args(),
+            "-ea", # 开启断言
+            "-cp",
+            os.pathsep.join([self.java_class_path, self.harness_dir]),
+            self.harness_class,
+            self.runtime_class,
+        ]
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.exec_count = 0
+        self.restart_count += 1
+        self._buffer = b""
+
+    def _stop(self, flush: bool = False):
+        """
+        终止常驻JVM（超时、崩溃或达到执行上限时调用）。
+        :param flush: 先 SIGTERM 并等待agent的关闭钩子把本次执行的位图写回共享内存（挂起复核用）
+        """
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        if flush and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=self.FLUSH_GRACE_S)
+            except subprocess.TimeoutExpired:
+                pass
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdout.close()
+        self.process = None
+
+    def _read_line(self, deadline: float) -> Optional[bytes]:
+        """在截止时间前读取一行响应；超时返回None，JVM退出时抛出EOFError"""
+        fd = self.process.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line
+
+    def run_java_program2(self, input_data: str, method: Optional[str] = None, timeout: Optional[float] = None,
+                          flush_on_timeout: bool = False):
+        """
+        在常驻JVM中执行一次输入，参数与返回值与 JavaRunner.run_java_program2 相同。
+        """
+        timeout = self.config.timeout if timeout is None else timeout
+        if self.process is None or self.exec_count >= self.config.persistent_max_execs:
+            self._stop()
+            try:
+                with self.profiler.stage("spawn"):
+                    self._start()
+            except Exception as e:
+                self.process = None
+                return None, f"调用Java程序失败: {str(e)}"
+
+        formatted_input = self._format_input(input_data)
+        self.prepare_run()
+        self.last_timed_out = False
+
+        try:
+            with self.profiler.stage("jvm_run"):
+                request = f"RUN\t{method or self.target_method}\t{formatted_input}\n"
+                self.process.stdin.write(request.encode("utf-8"))
+                self.process.stdin.flush()
+                self.exec_count += 1
+                line = self._read_line(time.monotonic() + timeout)
+        except (EOFError, OSError):
+            # JVM意外退出（如目标方法调用了System.exit），下次执行时重启
+            returncode = self.process.wait()
+            self._stop()
+            return self.read_trace(), f"Java执行异常 (返回码: {returncode}): 常驻JVM意外退出"
+
+        if line is None:
+            # 超时：目标可能陷入死循环，杀掉JVM，下次执行时重启
+            self.timeout_count += 1
+            self.last_timed_out = True
+            self._stop(flush=flush_on_timeout)
+            return None, f"Java程序执行超时 (超过 {timeout} 秒)"
+
+        _, code, err = line.decode("utf-8").split("\t", 2)
+        error_msg = None
+        if code != "0":
+            stderr = base64.b64decode(err).decode("utf-8", errors="replace")
+            error_msg = f"Java执行异常 (返回码: {code}): {stderr.strip()}"
+        with self.profiler.stage("coverage_read"):
+            trace = self.read_trace()
+        return trace, error_msg
+
+    def close(self):
+        """关闭常驻JVM"""
+        self._stop()
+        super().close()
@@ -0,0 +1,180 @@
+# fuzzer/jvm_startup.py
+# JVM快速启动配置：缓存AppCDS归档 + 面向启动速度的JVM参数，降低每次冷启动JVM的开销
+# （提示信息写到stderr，驱动模式下stdout只输出响应JSON）
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class StartupProfile:
+    """
+    快速启动配置。首次执行时以 -XX:ArchiveClassesAtExit 训练一次，生成覆盖
+    jpamb.Runtime、bytescribe agent 与目标类路径的动态CDS归档；之后每次启动都通过
+    -XX:SharedArchiveFile 复用。归档以类路径、agent jar 与 java 可执行文件的哈希为键，
+    任一变化时自动重建。同一个键的配置在进程内共享（并行执行器共用一份归档）。
+    """
+    # 面向启动速度的JVM参数：被测方法执行时间很短，C1即可，串行GC启动最快，关闭perf数据文件
+    STARTUP_OPTIONS = ["-XX:TieredStopAtLevel=1", "-XX:+UseSerialGC", "-XX:-UsePerfData", "-Xshare:auto"]
+    TRAIN_TIMEOUT = 120.0  # 训练（生成归档）运行的超时（秒）
+    MEASURE_RUNS = 3       # 生成归档后分别测量冷启动与快速启动耗时的次数（取中位数）
+
+    _profiles: Dict[str, "StartupProfile"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, key: str, cds_dir: str):
+        self.key = key
+        self.archive_path = os.path.abspath(os.path.join(cds_dir, f"{key}.jsa"))
+        self.report_path = os.path.abspath(os.path.join(cds_dir, f"{key}.json"))
+        self.ready = False      # 归档是否可用
+        self.failed = False     # 训练失败后只使用启动参数，不再重试
+        self.baseline_ms: Optional[float] = None  # 冷启动单次执行耗时
+        self.profile_ms: Optional[float] = None   # 快速启动单次执行耗时
+        self.launches = 0       # 使用快速启动配置的JVM启动次数
+        self.prepare_s: Optional[float] = None  # 本进程中训练与测量运行的耗时（复用已有归档时为 None）
+        self._lock = threading.Lock()
+        self._load_report()
+
+    @classmethod
+    def for_config(cls, config) -> "StartupProfile":
+        """按配置获取（或创建）共享的快速启动配置"""
+        key = cls.compute_key(config.java_class_path, config.agent_path)
+        with cls._registry_lock:
+            profile = cls._profiles.get(key)
+            if profile is None:
+                os.makedirs(config.cds_dir, exist_ok=True)
+                profile = cls._profiles[key] = cls(key, config.cds_dir)
+            return profile
+
+    @staticmethod
+    def compute_key(java_class_path: str, agent_path: str) -> str:
+        """类路径（jar按内容、目录按文件大小与修改时间）+ agent jar + java 可执行文件的哈希"""
+        digest = hashlib.sha256()
+        entries = java_class_path.split(os.pathsep) + [agent_path]
+        java = shutil.which("java")
+        if java:
+            entries.append(os.path.realpath(java))
+        for entry in entries:
+            digest.update(entry.encode("utf-8") + b"\0")
+            if os.path.isfile(entry):
+                with open(entry, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+            elif os.path.isdir(entry):
+                for root, dirs, files in os.walk(entry):
+                    dirs.sort()
+                    for name in sorted(files):
+                        st = os.stat(os.path.join(root, name))
+                        rel = os.path.relpath(os.path.join(root, name), entry)
+                        digest.update(f"{rel}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def _load_report(self):
+        """复用已有归档时一并读取当时测得的启动耗时"""
+        if not os.path.exists(self.archive_path):
+            return
+        self.ready = True
+        try:
+            with open(self.report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            self.baseline_ms = report.get("baseline_ms")
+            self.profile_ms = report.get("profile_ms")
+        except (OSError, ValueError):
+            pass
+
+    def jvm_options(self) -> List[str]:
+        """快速启动的JVM参数（归档可用时包含 -XX:SharedArchiveFile）"""
+        self.launches += 1
+        if self.ready:
+            return [f"-XX:SharedArchiveFile={self.archive_path}"] + self.STARTUP_OPTIONS
+        return list(self.STARTUP_OPTIONS)
+
+    def ensure(self, launch_args: List[str]):
+        """
+        归档不存在时用一次真实执行训练生成归档，并测量冷启动与快速启动的耗时。
+        模糊测试在 initialize 中、超时校准之前调用，训练与测量的耗时不计入任何执行。
+        :param launch_args: java 之后的启动参数（agent、类路径、主类与目标方法参数；agent输出应指向临时文件）
+        """
+        if self.ready or self.failed:
+            return
+        with self._lock:
+            if self.ready or self.failed:
+                return
+            t0 = time.perf_counter()
+            try:
+                self._train(launch_args)
+            finally:
+                self.prepare_s = time.perf_counter() - t0
+
+    def _train(self, launch_args: List[str]):
+        """（持锁调用）生成归档并测量"""
+        tmp_path = f"{self.archive_path}.{os.getpid()}.tmp"
+        try:
+            subprocess.run(
+                ["java", f"-XX:ArchiveClassesAtExit={tmp_path}"] + self.STARTUP_OPTIONS + launch_args,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=self.TRAIN_TIMEOUT,
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            pass
+        if not os.path.exists(tmp_path):
+            # 如JDK不支持动态归档（低于JDK 13），只使用启动参数
+            self.failed = True
+            print("警告：AppCDS归档生成失败，快速启动仅使用启动参数", file=sys.stderr)
+            return
+        os.replace(tmp_path, self.archive_path)
+        self.ready = True
+
+        self.baseline_ms = self._measure(["java"] + launch_args)
+        self.profile_ms = self._measure(
+            ["java", f"-XX:SharedArchiveFile={self.archive_path}"] + self.STARTUP_OPTIONS + launch_args)
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            json.dump({"baseline_ms": self.baseline_ms, "profile_ms": self.profile_ms}, f)
+        print(f"AppCDS归档已生成：{self.archive_path}（冷启动 {self.baseline_ms:.1f} ms，"
+              f"快速启动 {self.profile_ms:.1f} ms）", file=sys.stderr)
+
+    def _measure(self, command: List[str]) -> float:
+        """多次执行取中位数耗时（毫秒）"""
+        samples = []
+        for _ in range(self.MEASURE_RUNS):
+            t0 = time.perf_counter()
+            try:
+                subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               timeout=self.TRAIN_TIMEOUT)
+            except (subprocess.TimeoutExpired, OSError):
+                pass
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        return samples[len(samples) // 2]
+
+    def saved_ms_per_exec(self) -> float:
+        if self.baseline_ms is None or self.profile_ms is None:
+            return 0.0
+        return self.baseline_ms - self.profile_ms
+
+    def report(self) -> Dict:
+        """快速启动的效果：单次节省的耗时与累计节省的时间"""
+        saved = self.saved_ms_per_exec()
+        return {
+            "archive": self.archive_path if self.ready else None,
+            "baseline_ms": self.baseline_ms,
+            "profile_ms": self.profile_ms,
+            "saved_ms_per_exec": saved,
+            "launches": self.launches,
+            "total_saved_s": saved * self.launches / 1000,
+            "prepare_s": self.prepare_s,
+        }
+
+    def summary(self) -> str:
+        report = self.report()
+        prepared = "" if self.prepare_s is None else \
+            f"（归档训练与测量用时 {self.prepare_s:.1f} 秒，在测试开始前完成，不计入执行耗时）"
+        if report["archive"] is None or self.baseline_ms is None:
+            return f"快速启动：未使用AppCDS归档，启动 {report['launches']} 次" + prepared
+        return (f"快速启动：冷启动 {report['baseline_ms']:.1f} ms -> {report['profile_ms']:.1f} ms，"
+                f"单次节省 {report['saved_ms_per_exec']:.1f} ms，启动 {report['launches']} 次，"
+                f"累计节省 {report['total_saved_s']:.2f} 秒" + prepared)
@@ -1,18 +1,34 @@
 import argparse
 import sys
 import json
-import time
 from config import FuzzerConfig
 from fuzzer_engine import FuzzerEngine
-from java_runner import JavaRunner
-from common.exchange_format import ExecutionRecord 
+import driver
+from driver_daemon import DriverDaemon
+from cmin import run_cmin
+from minimizer import run_minimize
+from campaign import CampaignScheduler, resolve_targets
+from block_map import is_power_of_two, resolve_map_size
+
+
+def map_size_arg(value: str):
+    """--coverage-map-size：2的幂，或 auto"""
+    if value == "auto":
+        return value
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的位图大小：{value}")
+    if not is_power_of_two(size):
+        raise argparse.ArgumentTypeError(f"位图大小必须是2的幂：{value}")
+    return size
+
 
 def main():
     parser = argparse.ArgumentParser(description="Java Coverage-Based Fuzzer（对接ASM插桩）")
     parser.add_argument("--java-class-path", default="bin:lib/asm.jar", help="Java类路径")
     parser.add_argument("--target-class", default="com.test.DivisionLoop", help="目标Java类名（含包名）")
     parser.add_argument("--coverage-output", default="coverage_temp.json", help="覆盖率输出JSON路径或文件名")
-    parser.add_argument("--max-iter", type=int, default=10, help="最大迭代次数")
     parser.add_argument("--target-method", default="jpamb.cases.Simple.divideByN:(I)I", help="目标测试Java方法（带包名，类名，出入参类型）")
     parser.add_argument("--agent-path", default="./bytescribe-agent-1.0-SNAPSHOT.jar", help="插桩Agent jar包路径")
 
@@ -20,76 +36,131 @@ def main():
     parser.add_argument("--max-iter", type=int, default=10000, help="最大迭代次数")
     parser.add_argument("--seed-count", type=int, default=100, help="初始种子数量")
 
+    # 超时
+    parser.add_argument("--timeout", type=float, default=5.0, help="单次执行的超时上限（秒），也用于复核疑似挂起")
+    parser.add_argument("--no-adaptive-timeout", action="store_true", help="关闭自适应超时，始终使用 --timeout")
+    parser.add_argument("--min-timeout", type=float, default=0.1, help="自适应超时的下限（秒）")
+    parser.add_argument("--calibration-runs", type=int, default=10, help="超时校准阶段执行的种子数")
+
     # 位图
-    parser.add_argument("--coverage-map-size", type=int, default=65536, help="覆盖率位图的大小")
+    parser.add_argument("--coverage-map-size", type=map_size_arg, default=65536,
+                        help="覆盖率位图的大小（2的幂）；auto 按插桩块数自动确定")
+    # 常驻JVM
+    parser.add_argument("--persistent", action="store_true", help="启用常驻JVM执行模式（一个JVM复用执行多个输入）")
+    parser.add_argument("--persistent-max-execs", type=int, default=1000, help="常驻JVM执行多少次后自动重启")
+    # JVM快速启动
+    parser.add_argument("--fast-startup", action="store_true", help="启用JVM快速启动配置（缓存AppCDS归档 + 启动参数）")
+    parser.add_argument("--cds-dir", default="./.jvm_cds", help="AppCDS归档的缓存目录")
+    # 并行
+    parser.add_argument("--workers", type=int, default=1, help="并行执行器数量")
+    parser.add_argument("--executor", default="thread", choices=["thread", "async"],
+                        help="并行执行后端：thread 线程池；async 基于asyncio，同时在途 --workers 个JVM进程")
+    parser.add_argument("--work-dir", default="./fuzz_workers", help="并行执行器的私有输出目录")
+    # 能量调度
+    parser.add_argument("--power-schedule", default="uniform", choices=["uniform", "explore", "fast", "rare"],
+                        help="种子能量调度策略（各策略都优先选择覆盖全部已知边的favored种子）")
+    # 确定性变异阶段
+    parser.add_argument("--no-deterministic", action="store_true", help="跳过确定性变异阶段，只做随机变异")
+    # 变异字典
+    parser.add_argument("--no-dictionary", action="store_true", help="不从目标类文件收集常量作为变异字典")
+    parser.add_argument("--dictionary-cache-dir", default="./.constants_cache", help="常量收集结果的缓存目录")
+    # 执行结果缓存
+    parser.add_argument("--exec-cache-entries", type=int, default=100000, help="执行结果缓存的最大条目数（0表示关闭）")
+    parser.add_argument("--exec-cache-mb", type=int, default=64, help="执行结果缓存的内存上限（MB）")
+    # 遥测与日志
+    parser.add_argument("--output-dir", default="./fuzz_output", help="fuzzer_stats / plot_data 等输出目录")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="写出 fuzzer_stats 的间隔（秒）")
+    # 检查点与恢复
+    parser.add_argument("--resume", action="store_true",
+                        help="从 --output-dir 中的语料库与检查点恢复上一次测试活动（不重新执行语料库）")
+    parser.add_argument("--checkpoint-interval", type=float, default=60.0, help="写出检查点的间隔（秒）")
+    # 符号执行交接
+    parser.add_argument("--handoff-dir", default=None,
+                        help="与符号执行引擎交接的目录（requests/ 导出 ExecutionRecord，solutions/ 导入求解结果）；缺省时关闭")
+    parser.add_argument("--plateau-window", type=float, default=300.0, help="覆盖率停滞多少秒后导出一批条目")
+    parser.add_argument("--handoff-batch", type=int, default=8, help="每批导出的条目数")
+    # 多实例同步
+    parser.add_argument("--sync-dir", default=None, help="多实例共享的同步目录（本地或NFS路径）；缺省时不同步")
+    parser.add_argument("--sync-id", default="fuzzer01", help="本实例在同步目录中的唯一ID")
+    parser.add_argument("--sync-role", default="main", choices=["main", "secondary"],
+                        help="main 实例做确定性变异阶段，secondary 实例只做随机变异")
+    parser.add_argument("--sync-interval", type=float, default=30.0, help="与其他实例同步的间隔（秒）")
+    # 多目标测试活动
+    parser.add_argument("--campaign-targets", default=None,
+                        help="多目标模式：逗号分隔的目标方法列表，或 @文件（每行一个方法）")
+    parser.add_argument("--campaign-class", action="append", default=[],
+                        help="多目标模式：测试类中所有可生成参数的静态方法（可重复）")
+    parser.add_argument("--campaign-package", action="append", default=[],
+                        help="多目标模式：测试包中各顶层类的所有可生成参数的静态方法（可重复）")
+    parser.add_argument("--campaign-time", type=float, default=3600.0, help="多目标模式的总时长（秒）")
+    parser.add_argument("--campaign-slice", type=float, default=10.0, help="多目标模式每个时间片的长度（秒）")
+    parser.add_argument("--campaign-retire-slices", type=int, default=5,
+                        help="目标连续多少个时间片没有新覆盖后退役")
+    parser.add_argument("--verbose", type=int, default=1, choices=[0, 1, 2],
+                        help="日志详细级别：0 仅总结，1 进度，2 每次执行的Java命令")
+    # 语料库精简
+    parser.add_argument("--cmin", default=None, help="离线精简语料库：输入为JSONL语料库文件（每行一个输入）")
+    parser.add_argument("--cmin-output", default="corpus.min.jsonl", help="精简后语料库的输出路径")
+    # 输入精简
+    parser.add_argument("--no-minimize-crashes", action="store_true", help="不精简新崩溃类别的复现输入")
+    parser.add_argument("--minimize-execs", type=int, default=200, help="精简单个输入时最多执行的次数")
+    parser.add_argument("--minimize", default=None,
+                        help="离线精简输入：输入为JSONL文件（每行一个输入），崩溃输入保持崩溃类别，其余保持覆盖签名")
+    parser.add_argument("--minimize-output", default="inputs.min.jsonl", help="精简后输入的输出路径")
     parser.add_argument("--driver", action="store_true", help="启用单次驱动模式")
+    parser.add_argument("--driver-batch", action="store_true", help="启用批量驱动模式（输入为JSONL，每行一个请求）")
+    parser.add_argument("--driver-concurrency", type=int, default=1, help="批量驱动模式的并发执行数；守护进程模式下为每个目标方法的执行器数")
+    parser.add_argument("--driver-daemon", action="store_true", help="启用驱动守护进程模式（在Unix socket上常驻服务）")
+    parser.add_argument("--driver-max-methods", type=int, default=16,
+                        help="守护进程模式下最多同时保留执行器的目标方法数，超出时关闭最久未使用方法的执行器")
+    parser.add_argument("--driver-socket", default="./fuzzer-driver.sock", help="驱动守护进程监听的Unix socket路径")
+    parser.add_argument("--trace-encoding", default="json", choices=["json", "b64"],
+                        help="驱动模式响应与符号执行交接导出中执行轨迹的编码（驱动请求中的 trace_encoding 优先）")
     parser.add_argument("--driver-input", default=None, help="驱动模式输入JSON路径；为'-'时从stdin读取")
     parser.add_argument("--driver-output", default=None, help="驱动模式输出JSON路径；缺省时stdout")
     args = parser.parse_args()
 
     # --- (Driver Mode) ---
-    if args.driver:
+    if args.driver or args.driver_batch or args.driver_daemon:
         config = FuzzerConfig(
             java_class_path=args.java_class_path,
-            target_class=args.target_class,
+            target_method=args.target_method,
+            agent_path=args.agent_path,
             max_iterations=args.max_iter,
-            seed_count=args.seed_count
+            seed_count=args.seed_count,
+            coverage_map_size=65536 if args.coverage_map_size == "auto" else args.coverage_map_size,
+            persistent=args.persistent,
+            persistent_max_execs=args.persistent_max_execs,
+            fast_startup=args.fast_startup,
+            cds_dir=args.cds_dir,
+            work_dir=args.work_dir,
+            trace_encoding=args.trace_encoding,
+            verbose=args.verbose
         )
-        jr = JavaRunner(
-            java_class_path=config.java_class_path,
-            target_class=config.target_class,
-            config=config,
-            coverage_output_path=config.coverage_output_path,
-        )
-        if args.driver_input is None or args.driver_input == "-":
-            req_text = sys.stdin.read()
-        else:
-            with open(args.driver_input, "r", encoding="utf-8") as rf:
-                req_text = rf.read()
-        try:
-            req = json.loads(req_text)
-        except json.JSONDecodeError:
-            resp = {
-                "status": "error",
-                "error": {"message": "无效的输入JSON格式"}
-            }
-            print(json.dumps(resp, ensure_ascii=False))
+        if args.coverage_map_size == "auto":
+            resolve_map_size(config)
+        if args.driver_daemon:
+            # 守护进程模式：每个目标方法最多 --driver-concurrency 个常驻执行器
+            DriverDaemon(config, args.driver_socket, executors_per_method=args.driver_concurrency,
+                         max_methods=args.driver_max_methods).serve_forever()
             return
- 
-        run_id = req.get("run_id", "")
-        method = req.get("method", None)
-        inputs = req.get("inputs", [])   # 从输入中获取参数列表
-
-         # 确保 inputs 是一个列表
-        if not isinstance(inputs, list):
-            inputs = [inputs]
-
-        t0 = time.perf_counter()
-        trace, err = jr.run_java_program2(input_data=inputs, method=method)
-        t_ms = int((time.perf_counter() - t0) * 1000)
- 
-        status = "ok" if err is None else "error"
-
-        # 构建 ExecutionRecord 对象
-        record = ExecutionRecord(
-            method=method or f"{config.target_class}.main",
-            inputs=inputs,
-            trace=trace or [] # 如果 trace 为 None（发生错误），则用空列表
-        )
 
-        resp = {
-            "run_id": run_id,
-            "status": status,
-            "error": {"message": err} if err else None,
-            "data": record.__dict__, # 将 ExecutionRecord 对象转为字典
-            "time_ms": t_ms,
-        }
-        out_text = json.dumps(resp, ensure_ascii=False)
-        if args.driver_output:
-            with open(args.driver_output, "w", encoding="utf-8") as wf:
-                wf.write(out_text)
-        else:
-            print(out_text)
+        out = open(args.driver_output, "w", encoding="utf-8") if args.driver_output else sys.stdout
+        src = driver.open_input(args.driver_input)
+        try:
+            if args.driver_batch:
+                # 批量模式：JSONL 输入，按完成顺序流式输出 JSONL 响应
+                driver.run_batch(config, src, out, concurrency=args.driver_concurrency)
+            else:
+                resp = driver.run_single(config, src.read())
+                out.write(json.dumps(resp, ensure_ascii=False))
+                if out is sys.stdout:
+                    out.write("\n")
+        finally:
+            if src is not sys.stdin:
+                src.close()
+            if out is not sys.stdout:
+                out.close()
         return
 
     config = FuzzerConfig(
@@ -99,9 +170,64 @@ def main():
         agent_path=args.agent_path,
         max_iterations=args.max_iter,
         seed_count=args.seed_count,
-        coverage_map_size=args.coverage_map_size
+        timeout=args.timeout,
+        adaptive_timeout=not args.no_adaptive_timeout,
+        min_timeout=args.min_timeout,
+        calibration_runs=args.calibration_runs,
+        coverage_map_size=65536 if args.coverage_map_size == "auto" else args.coverage_map_size,
+        persistent=args.persistent,
+        persistent_max_execs=args.persistent_max_execs,
+        fast_startup=args.fast_startup,
+        cds_dir=args.cds_dir,
+        workers=args.workers,
+        work_dir=args.work_dir,
+        executor=args.executor,
+        power_schedule=args.power_schedule,
+        deterministic=not args.no_deterministic,
+        use_dictionary=not args.no_dictionary,
+        dictionary_cache_dir=args.dictionary_cache_dir,
+        exec_cache_entries=args.exec_cache_entries,
+        exec_cache_mb=args.exec_cache_mb,
+        output_dir=args.output_dir,
+        stats_interval=args.stats_interval,
+        resume=args.resume,
+        checkpoint_interval=args.checkpoint_interval,
+        minimize_crashes=not args.no_minimize_crashes,
+        minimize_execs=args.minimize_execs,
+        handoff_dir=args.handoff_dir,
+        plateau_window=args.plateau_window,
+        handoff_batch=args.handoff_batch,
+        trace_encoding=args.trace_encoding,
+        sync_dir=args.sync_dir,
+        sync_id=args.sync_id,
+        sync_role=args.sync_role,
+        sync_interval=args.sync_interval,
+        verbose=args.verbose
     )
 
+    if args.coverage_map_size == "auto":
+        resolve_map_size(config)
+
+    if args.cmin:
+        run_cmin(config, args.cmin, args.cmin_output)
+        return
+
+    if args.minimize:
+        run_minimize(config, args.minimize, args.minimize_output, max_execs=args.minimize_execs)
+        return
+
+    if args.campaign_targets or args.campaign_class or args.campaign_package:
+        methods = []
+        if args.campaign_targets and args.campaign_targets.startswith("@"):
+            with open(args.campaign_targets[1:], "r", encoding="utf-8") as f:
+                methods = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        elif args.campaign_targets:
+            methods = [m.strip() for m in args.campaign_targets.split(",") if m.strip()]
+        targets = resolve_targets(config.java_class_path, methods, args.campaign_class, args.campaign_package)
+        CampaignScheduler(config, targets, total_time=args.campaign_time, slice_time=args.campaign_slice,
+                          retire_after=args.campaign_retire_slices).run()
+        return
+
     fuzzer = FuzzerEngine(config)
     # fuzzer.run()
     fuzzer.run2()
@@ -0,0 +1,178 @@
+# fuzzer/minimizer.py
+# 输入精简（类似 afl-tmin）：在保持相同崩溃类别（或相同覆盖签名）的前提下，
+# 把输入逐个参数地向更简单的值收缩：整数趋向0且置位更少，字符串/数组删掉元素、元素再各自收缩
+import json
+import time
+import zlib
+from typing import Any, Iterator, List, Optional, Tuple
+
+from campaign_store import to_hashable
+from cmin import load_inputs, save_inputs
+from coverage_tracker import CoverageTracker
+from crash_triage import CrashTriage, parse_crash
+from driver import create_runner
+from execution_cache import ExecutionCache
+from input_generator import INT_BITS, SAFE_CHARS, InputGenerator
+
+
+def _int_candidates(x: int, bits: int) -> Iterator[int]:
+    """绝对值更小（或绝对值相同但为正）的整数，越简单的越先尝试"""
+    if x == 0:
+        return
+    yield 0
+    sign = 1 if x > 0 else -1
+    magnitude = abs(x)
+    if x < 0 and magnitude < 1 << (bits - 1):  # 最小值取反会溢出
+        yield magnitude
+    yield sign * (magnitude // 2)
+    yield sign * (magnitude & ~(1 << (magnitude.bit_length() - 1)))  # 清掉最高置位
+    yield sign * (magnitude & (magnitude - 1))                      # 清掉最低置位
+    # 减去由大到小的2的幂：可以逼近“大于某个阈值”之类的边界（最后一步为 x∓1）
+    for k in range(magnitude.bit_length() - 1, -1, -1):
+        yield sign * (magnitude - (1 << k))
+
+
+def _float_candidates(x: float) -> Iterator[float]:
+    if x == 0:
+        return
+    yield 0.0
+    if x != int(x):
+        yield float(int(x))
+    yield float(int(x / 2))
+
+
+def _sequence_candidates(items: tuple, shrink_elem) -> Iterator[tuple]:
+    """先成块删除元素（块大小由一半递减到1），再逐个收缩元素"""
+    n = len(items)
+    chunk = n // 2 if n > 1 else n
+    while chunk >= 1:
+        for start in range(0, n, chunk):
+            yield items[:start] + items[start + chunk:]
+        chunk //= 2
+    for i, elem in enumerate(items):
+        for candidate in shrink_elem(elem):
+            yield items[:i] + (candidate,) + items[i + 1:]
+
+
+def shrink_candidates(value: Any, t: str) -> Iterator[Any]:
+    """按参数类型（JVM描述符）产生比 value 更简单的候选值"""
+    if t in INT_BITS:
+        yield from _int_candidates(value, INT_BITS[t])
+    elif t == "Z":
+        if value:
+            yield False
+    elif t == "C":
+        if value != SAFE_CHARS[0]:
+            yield SAFE_CHARS[0]
+    elif t in ("F", "D"):
+        yield from _float_candidates(value)
+    elif t.startswith("["):
+        yield from _sequence_candidates(tuple(value), lambda elem: shrink_candidates(elem, t[1:]))
+    else:  # String
+        for candidate in _sequence_candidates(tuple(value), lambda c: shrink_candidates(c, "C")):
+            yield "".join(candidate)
+
+
+class InputMinimizer:
+    """
+    贪心精简：对每个参数依次尝试更简单的候选值，候选保持目标行为就接受并从新值继续，
+    一轮下来所有参数都无法再收缩（或执行次数用完）时结束。
+    执行结果优先从执行结果缓存中取，精简期间的执行也写回缓存。
+    """
+    def __init__(self, java_runner, coverage_tracker: CoverageTracker, params: List[str], method: str,
+                 execution_cache: Optional[ExecutionCache] = None, triage: Optional[CrashTriage] = None,
+                 max_execs: int = 200):
+        self.java_runner = java_runner
+        self.coverage_tracker = coverage_tracker
+        self.params = params
+        self.method = method
+        self.execution_cache = execution_cache
+        self.triage = triage or CrashTriage()
+        self.max_execs = max_execs
+        self.execs = 0        # 累计实际执行次数（不含命中缓存）
+        self.cache_hits = 0   # 命中执行结果缓存的次数（单独统计，不计入模糊测试的缓存命中率）
+        self._budget = 0
+
+    def execute(self, input_data: Any) -> Tuple[int, Optional[str]]:
+        """执行一次输入（优先查缓存），返回 (覆盖签名, 错误信息)"""
+        if self.execution_cache is not None:
+            cached = self.execution_cache.peek(self.method, input_data)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached.signature, cached.error_msg
+        _, error_msg = self.java_runner.run_java_program2(input_data)
+        self.execs += 1
+        self._budget -= 1
+        error_msg = self.coverage_tracker.filter_error(error_msg)
+        signature = zlib.crc32(self.coverage_tracker.classify(self.coverage_tracker.read_run_map(self.java_runner)))
+        if self.execution_cache is not None and not self.java_runner.last_timed_out:
+            self.execution_cache.put(self.method, input_data, signature, error_msg)
+        return signature, error_msg
+
+    def behavior(self, input_data: Any) -> Tuple[str, Any]:
+        """输入的目标行为：崩溃时为崩溃类别，否则为覆盖签名"""
+        signature, error_msg = self.execute(input_data)
+        if error_msg:
+            return "crash", self.triage.bucket_key(parse_crash(error_msg, self.triage.head_chars), signature)[0]
+        return "signature", signature
+
+    def minimize(self, input_data: Any, target: Optional[Tuple[str, Any]] = None) -> Any:
+        """
+        :param target: 需要保持的行为（见 behavior）；缺省时先执行一次原输入得到
+        :return: 精简后的输入（无法精简时为原输入）
+        """
+        self._budget = self.max_execs
+        if target is None:
+            target = self.behavior(input_data)
+        if len(self.params) == 1:
+            values = [input_data]
+        else:
+            values = list(input_data)
+        tried = {input_data}
+        changed = True
+        while changed and self._budget > 0:
+            changed = False
+            for i, t in enumerate(self.params):
+                while self._budget > 0:
+                    for candidate in shrink_candidates(values[i], t):
+                        trial = values[:i] + [candidate] + values[i + 1:]
+                        trial_input = self._pack(trial)
+                        if trial_input in tried:
+                            continue
+                        tried.add(trial_input)
+                        if self.behavior(trial_input) == target:
+                            values = trial
+                            changed = True
+                            break
+                        if self._budget <= 0:
+                            break
+                    else:
+                        break  # 该参数的所有候选都改变了行为
+        return self._pack(values)
+
+    def _pack(self, values: List[Any]) -> Any:
+        return values[0] if len(self.params) == 1 else tuple(values)
+
+
+def run_minimize(config, input_path: str, output_path: str, max_execs: int = 200):
+    """离线精简：对JSONL文件中的每个输入分别精简（崩溃输入保持崩溃类别，其余保持覆盖签名）"""
+    inputs = [to_hashable(input_data) for input_data in load_inputs(input_path)]
+    java_runner = create_runner(config)
+    java_runner.collect_trace = False
+    minimizer = InputMinimizer(
+        java_runner, CoverageTracker(config=config), InputGenerator.for_method(config.target_method).params,
+        config.target_method, execution_cache=ExecutionCache(), max_execs=max_execs,
+    )
+    results = []
+    t0 = time.perf_counter()
+    try:
+        for input_data in inputs:
+            minimized = minimizer.minimize(input_data)
+            results.append(minimized)
+            if config.verbose >= 1:
+                print(f"{json.dumps(input_data, ensure_ascii=False)} -> {json.dumps(minimized, ensure_ascii=False)}")
+    finally:
+        java_runner.close()
+    save_inputs(output_path, results)
+    print(f"输入精简完成：{len(inputs)} 个输入，执行 {minimizer.execs} 次，"
+          f"耗时 {time.perf_counter() - t0:.1f} 秒，已写入 {output_path}")
@@ -0,0 +1,88 @@
+# fuzzer/source_coverage.py
+# 源码级覆盖率：把新命中的插桩块（per-edge 文件中的块ID）映射回 类/方法/源码行，按方法与行增量统计
+import os
+from typing import Dict, Iterable, List, Set, Tuple
+
+from block_map import BlockMap
+
+
+class MethodCoverage:
+    """一个方法的块与源码行覆盖情况"""
+    def __init__(self, class_name: str, method: str):
+        self.class_name = class_name
+        self.method = method
+        self.blocks: Set[int] = set()
+        self.covered_blocks: Set[int] = set()
+        self.lines: Set[int] = set()
+        self.covered_lines: Set[int] = set()
+
+    @property
+    def name(self) -> str:
+        return f"{self.class_name.replace('/', '.')}.{self.method}"
+
+
+class SourceCoverage:
+    """
+    基于块映射的增量覆盖率报告。
+    只在发现新覆盖时用新命中的块ID更新，不需要每次执行重新解析文件。
+    块ID取自 per-edge 文件而不是位图：位图槽位是边哈希 (blockId ^ (prevBlock >>> 1)) & mask，不能反推块。
+    """
+    def __init__(self, block_map: BlockMap):
+        self.block_map = block_map
+        self.methods: Dict[Tuple[str, str], MethodCoverage] = {}
+        for block in block_map.by_id.values():
+            key = (block.class_name, block.method)
+            method = self.methods.get(key)
+            if method is None:
+                method = self.methods[key] = MethodCoverage(block.class_name, block.method)
+            method.blocks.add(block.block_id)
+            method.lines.add(block.line)
+        self.changed = True  # 自上次写出报告后是否有新覆盖
+
+    def update(self, block_ids: Iterable[int]) -> List[Tuple[str, int]]:
+        """
+        用新命中的块更新报告（不在块映射中的块忽略）。
+        :return: 新覆盖的源码行 [(方法名, 行号), ...]
+        """
+        new_lines = []
+        for block_id in block_ids:
+            block = self.block_map.lookup(block_id)
+            if block is None:
+                continue
+            method = self.methods[(block.class_name, block.method)]
+            if block_id in method.covered_blocks:
+                continue
+            method.covered_blocks.add(block_id)
+            if block.line not in method.covered_lines:
+                method.covered_lines.add(block.line)
+                new_lines.append((method.name, block.line))
+        if new_lines:
+            self.changed = True
+        return new_lines
+
+    def totals(self) -> Dict[str, int]:
+        methods = self.methods.values()
+        return {
+            "blocks": sum(len(m.blocks) for m in methods),
+            "covered_blocks": sum(len(m.covered_blocks) for m in methods),
+            "lines": sum(len(m.lines) for m in methods),
+            "covered_lines": sum(len(m.covered_lines) for m in methods),
+        }
+
+    def summary(self) -> str:
+        totals = self.totals()
+        return (f"源码覆盖：行 {totals['covered_lines']}/{totals['lines']}，"
+                f"块 {totals['covered_blocks']}/{totals['blocks']}，方法 {len(self.methods)} 个")
+
+    def write(self, path: str):
+        """写出按方法的覆盖率报告（每个方法一行汇总，随后列出未覆盖的行）"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for method in sorted(self.methods.values(), key=lambda m: m.name):
+                f.write(f"{method.name}: 行 {len(method.covered_lines)}/{len(method.lines)}，"
+                        f"块 {len(method.covered_blocks)}/{len(method.blocks)}\n")
+                uncovered = sorted(method.lines - method.covered_lines)
+                if uncovered:
+                    f.write(f"    未覆盖的行: {', '.join(map(str, uncovered))}\n")
+        os.replace(tmp_path, path)
+        self.changed = False
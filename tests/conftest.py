@@ -0,0 +1,6 @@
+# fuzzer/tests/conftest.py
+# 模块都放在仓库根目录（平铺结构），测试从根目录导入
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
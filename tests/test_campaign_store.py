@@ -0,0 +1,102 @@
+# fuzzer/tests/test_campaign_store.py
+# 检查点写出与 --resume 恢复（不执行Java：覆盖率直接写入位图）
+import os
+
+import pytest
+
+from config import FuzzerConfig
+from fuzzer_engine import FuzzerEngine
+
+MAP_SIZE = 256
+METHOD = "jpamb.cases.Simple.divideByN:(I)I"
+
+
+def make_engine(tmp_path, resume=False, target_method=METHOD):
+    config = FuzzerConfig(target_method=target_method, coverage_map_size=MAP_SIZE, output_dir=str(tmp_path / "out"),
+                          resume=resume, use_dictionary=False, seed_count=0)
+    return FuzzerEngine(config)
+
+
+def add_entry(engine, input_data, hits):
+    """模拟一次发现新覆盖的执行：合并位图并写出语料库条目"""
+    run_map = bytearray(MAP_SIZE)
+    for slot, count in hits.items():
+        run_map[slot] = count
+    tracker = engine.coverage_tracker
+    assert tracker.evaluate_run_map(run_map, blocks=[11])
+    engine.corpus_manager.add(input_data, exec_time_ms=1.0, bitmap_size=tracker.last_bitmap_size(),
+                              signature=tracker.last_signature(), edges=tracker.last_edges())
+    engine.total_execs += 1
+    engine.store.append_entry(len(engine.corpus_manager.entries) - 1, engine.corpus_manager.entries[-1])
+
+
+@pytest.fixture
+def campaign(tmp_path, monkeypatch):
+    """写出检查点后又加入一个条目（检查点之后崩溃）的测试活动"""
+    monkeypatch.chdir(tmp_path)
+    with open("bytescribe-map.csv", "w", encoding="utf-8") as f:
+        f.write('class:method:sourceLine:blockId\n"jpamb/cases/Simple":"divideByN":10:11\n')
+    engine = make_engine(tmp_path)
+    engine.store.reset()
+    engine.stats.reset()
+    add_entry(engine, 1, {3: 1, 4: 2})
+    add_entry(engine, 2, {3: 1, 5: 1})
+    engine.stats.write(engine)
+    engine.store.checkpoint(engine, background=True)
+    engine.store.wait()
+    add_entry(engine, 3, {3: 1, 6: 1, 7: 4})
+    engine.total_execs += 10
+    engine.stats.write(engine)
+    return engine
+
+
+def test_checkpoint_contents(campaign):
+    state = campaign.store.load_checkpoint()
+    assert state["target_method"] == METHOD
+    assert state["queue_len"] == 2
+    assert state["covered_edge_count"] == 3
+    assert state["global_map"][4] == 2
+    assert state["start_time"] == campaign.stats.start_time
+
+
+def test_resume_round_trip(campaign, tmp_path):
+    resumed = make_engine(tmp_path, resume=True)
+    resumed.initialize()
+    tracker = resumed.coverage_tracker
+    assert resumed.corpus_manager.size() == 3
+    assert resumed.total_execs == 2  # 检查点之后的执行数无法恢复
+    # 检查点之后才写出的条目的边补记进位图
+    assert tracker.covered_edge_count == 5
+    assert tracker.global_coverage_map[6] == 1 and tracker.global_coverage_map[7] == 1
+    assert tracker.covered_blocks == {11}
+    repeat = bytearray(MAP_SIZE)
+    repeat[3] = repeat[6] = repeat[7] = 1
+    assert not tracker.evaluate_run_map(repeat)
+    assert resumed.stats.start_time == campaign.stats.start_time
+    assert resumed.source_coverage is not None
+
+
+def test_resume_keeps_plot_history(campaign, tmp_path):
+    plot_path = os.path.join(campaign.config.output_dir, "plot_data")
+    with open(plot_path, encoding="utf-8") as f:
+        before = f.readlines()
+    resumed = make_engine(tmp_path, resume=True)
+    resumed.initialize()
+    resumed.stats.write(resumed)
+    with open(plot_path, encoding="utf-8") as f:
+        after = f.readlines()
+    assert after[:len(before)] == before
+    assert len(after) == len(before) + 1
+    assert sum(line.startswith("#") for line in after) == 1
+
+
+def test_resume_rejects_other_target(campaign, tmp_path):
+    with pytest.raises(ValueError):
+        make_engine(tmp_path, resume=True, target_method="jpamb.cases.Simple.other:(I)I").initialize()
+
+
+def test_resume_rejects_other_map_size(campaign, tmp_path):
+    engine = make_engine(tmp_path, resume=True)
+    engine.config.coverage_map_size = MAP_SIZE * 2
+    with pytest.raises(ValueError):
+        engine.initialize()
@@ -0,0 +1,93 @@
+# fuzzer/tests/test_coverage_tracker.py
+# 整图位运算实现与逐字节循环的参照实现比较
+import random
+
+import pytest
+
+from config import FuzzerConfig
+from coverage_tracker import CoverageTracker
+
+MAP_SIZE = 256
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return CoverageTracker(FuzzerConfig(coverage_map_size=MAP_SIZE, output_dir=str(tmp_path)))
+
+
+def random_maps(count, seed=1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        run_map = bytearray(MAP_SIZE)
+        for i in rng.sample(range(MAP_SIZE), rng.randint(0, 12)):
+            run_map[i] = rng.choice([1, 1, 2, 3, 5, 9, 20, 100, 255])
+        yield run_map
+
+
+class ReferenceTracker:
+    """逐字节循环：每个槽位记下见过的桶，出现没见过的(边, 桶)即为新行为"""
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.seen = [set() for _ in range(MAP_SIZE)]
+        self.global_map = bytearray(MAP_SIZE)
+
+    def evaluate(self, run_map) -> bool:
+        new = False
+        for i, count in enumerate(run_map):
+            if count and self.buckets[count] not in self.seen[i]:
+                self.seen[i].add(self.buckets[count])
+                new = True
+                self.global_map[i] = max(self.global_map[i], count)
+        return new
+
+
+def old_loop_is_new(buckets, global_map, run_map) -> bool:
+    """优化之前的语义：某槽位的桶大于全局位图中该槽位的桶"""
+    return any(buckets[count] > buckets[global_map[i]] for i, count in enumerate(run_map) if count)
+
+
+def test_matches_reference_loop(tracker):
+    reference = ReferenceTracker(tracker.hit_count_buckets)
+    for run_map in random_maps(300):
+        old_new = old_loop_is_new(tracker.hit_count_buckets, reference.global_map, run_map)
+        new = tracker.evaluate_run_map(run_map)
+        assert new == reference.evaluate(run_map)
+        # 旧语义判为新行为的执行，现在同样是新行为（现在还包括首次出现的较小的桶）
+        assert new or not old_new
+        assert bytes(tracker.global_coverage_map) == bytes(reference.global_map)
+        assert tracker.covered_edge_count == sum(1 for seen in reference.seen if seen)
+
+
+def test_memoryview_input(tracker):
+    run_map = bytearray(MAP_SIZE)
+    run_map[3] = 4
+    assert tracker.evaluate_run_map(memoryview(run_map))
+    assert not tracker.evaluate_run_map(memoryview(run_map))
+    assert tracker.last_edges() == (3,)
+
+
+def test_new_edges_and_blocks(tracker):
+    run_map = bytearray(MAP_SIZE)
+    run_map[5] = 1
+    run_map[9] = 2
+    assert tracker.evaluate_run_map(run_map, blocks=[11, 101])
+    assert sorted(tracker.last_new_edges) == [5, 9]
+    assert tracker.covered_blocks == {11, 101}
+    run_map[9] = 50
+    assert tracker.evaluate_run_map(run_map, blocks=[11, 101, 200])
+    assert tracker.last_new_edges == []  # 只是桶变化，没有新边
+    assert tracker.last_new_blocks == [200]
+
+
+def test_merge_edges(tracker):
+    tracker.merge_edges([7, 8])
+    assert tracker.covered_edge_count == 2
+    assert tracker.global_coverage_map[7] == 1
+    single = bytearray(MAP_SIZE)
+    single[7] = single[8] = 1
+    assert not tracker.evaluate_run_map(single)
+    # 条目文件不记录命中次数：更高的桶之后出现时仍是新行为，但不是新边
+    single[7] = 6
+    assert tracker.evaluate_run_map(single)
+    assert tracker.last_new_edges == []
+    assert tracker.covered_edge_count == 2
@@ -0,0 +1,91 @@
+# fuzzer/tests/test_exchange_format.py
+import io
+from array import array
+
+import pytest
+
+from common.exchange_format import ExecutionRecord, to_trace_array
+
+
+@pytest.mark.parametrize("trace, typecode", [
+    ([], "H"),
+    ([0, 1, 0xFFFF], "H"),
+    ([0, 0x10000], "i"),
+    ([-1, 5], "i"),
+    ([(1 << 31) - 1, -(1 << 31)], "i"),
+    ([1 << 31], "q"),
+    ([-(1 << 63), (1 << 63) - 1], "q"),
+])
+def test_narrowest_typecode(trace, typecode):
+    result = to_trace_array(trace)
+    assert result.typecode == typecode
+    assert result.tolist() == trace
+
+
+def test_trace_out_of_range():
+    with pytest.raises(OverflowError):
+        to_trace_array([1 << 63])
+
+
+@pytest.mark.parametrize("encoding", ["json", "b64"])
+@pytest.mark.parametrize("trace", [[], [3, 1, 2], [70000, 1], [-5, 1 << 40]])
+def test_dict_round_trip(encoding, trace):
+    record = ExecutionRecord(method="a.B.m:(I)I", inputs=[1, "x", [2, 3]], trace=array("q", trace))
+    restored = ExecutionRecord.from_json(record.to_json(encoding))
+    assert restored.method == record.method
+    assert restored.inputs == record.inputs
+    assert list(restored.trace) == trace
+
+
+def test_json_encoding_is_plain_list():
+    data = ExecutionRecord(method="m", inputs=[1], trace=array("q", [4, 5])).to_dict("json")
+    assert data["trace"] == [4, 5]
+    assert "trace_encoding" not in data
+
+
+@pytest.mark.parametrize("trace, typecode", [
+    ([1, 2, 0xFFFF], "H"),
+    ([0x10000, -7], "i"),
+    ([1 << 40, -(1 << 50)], "q"),
+])
+def test_binary_round_trip(trace, typecode):
+    record = ExecutionRecord(method="jpamb.cases.Simple.divideByN:(I)I", inputs=[7], trace=trace)
+    data = record.to_bytes()
+    restored = ExecutionRecord.from_bytes(data)
+    assert restored.trace.typecode == typecode
+    assert restored.trace.tolist() == trace
+    assert (restored.method, restored.inputs) == (record.method, record.inputs)
+    assert record.write_to(io.BytesIO()) == len(data)
+
+
+def test_binary_stream_of_frames():
+    records = [ExecutionRecord(method=f"m{i}", inputs=[i], trace=list(range(i))) for i in range(3)]
+    stream = io.BytesIO(b"".join(record.to_bytes() for record in records))
+    restored = []
+    while True:
+        record = ExecutionRecord.read_from(stream)
+        if record is None:
+            break
+        restored.append(record)
+    assert [(r.method, r.inputs, r.trace.tolist()) for r in restored] == \
+        [(r.method, r.inputs, list(r.trace)) for r in records]
+
+
+def test_bad_magic():
+    data = bytearray(ExecutionRecord(method="m", inputs=[], trace=[1]).to_bytes())
+    data[:3] = b"XXX"
+    with pytest.raises(ValueError):
+        ExecutionRecord.from_bytes(bytes(data))
+
+
+def test_truncated_header():
+    data = ExecutionRecord(method="m", inputs=[], trace=[1]).to_bytes()
+    with pytest.raises(EOFError):
+        ExecutionRecord.from_bytes(data[:5])
+
+
+@pytest.mark.parametrize("cut", [1, 4, 9])
+def test_truncated_body(cut):
+    data = ExecutionRecord(method="method", inputs=[1, 2], trace=[1, 2, 3]).to_bytes()
+    with pytest.raises(EOFError):
+        ExecutionRecord.from_bytes(data[:-cut])
@@ -0,0 +1,51 @@
+# fuzzer/timeout_calibrator.py
+from typing import List
+
+
+class TimeoutCalibrator:
+    """
+    自适应超时：先用种子的执行耗时校准，再在测试过程中随正常执行的耗时（指数滑动平均）调整。
+    超时 = 平均耗时 * multiplier，限制在 [min_timeout, max_timeout] 之间；
+    max_timeout 即 FuzzerConfig.timeout，复核疑似挂起时也使用它。
+    """
+    def __init__(self, max_timeout: float, min_timeout: float = 0.1, multiplier: float = 5.0,
+                 alpha: float = 0.05, update_every: int = 100):
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.multiplier = multiplier
+        self.alpha = alpha                # 滑动平均的权重
+        self.update_every = update_every  # 每多少次正常执行重新计算一次超时
+        self.avg_exec_s = None
+        self.timeout = max_timeout
+        self._since_update = 0
+
+    def calibrate(self, exec_times_s: List[float]) -> float:
+        """用种子的执行耗时（秒）确定初始超时"""
+        if exec_times_s:
+            self.avg_exec_s = sum(exec_times_s) / len(exec_times_s)
+            # 以最慢的种子为下限，避免正常种子在校准后就超时
+            self.timeout = self._clamp(max(self.avg_exec_s * self.multiplier, max(exec_times_s) * 2))
+        return self.timeout
+
+    def observe(self, exec_time_s: float) -> bool:
+        """
+        记录一次正常（未超时）执行的耗时。
+        :return: 超时是否被调整
+        """
+        if self.avg_exec_s is None:
+            self.avg_exec_s = exec_time_s
+        else:
+            self.avg_exec_s += self.alpha * (exec_time_s - self.avg_exec_s)
+        self._since_update += 1
+        if self._since_update < self.update_every:
+            return False
+        self._since_update = 0
+        new_timeout = self._clamp(self.avg_exec_s * self.multiplier)
+        # 变化不足10%时不调整，避免频繁抖动
+        if abs(new_timeout - self.timeout) < self.timeout * 0.1:
+            return False
+        self.timeout = new_timeout
+        return True
+
+    def _clamp(self, value: float) -> float:
+        return min(self.max_timeout, max(self.min_timeout, value))